@@ -1,21 +1,16 @@
-import boto3
+import sys
 from datetime import datetime
 from uuid import uuid4
+from boto3.dynamodb.conditions import Attr
+from backend.storage import repository, UnitOfWork
 
-dynamodb = boto3.resource('dynamodb')
-user_memory_table = dynamodb.Table('UserMemory')
-user_goals_table = dynamodb.Table('UserGoals')  # You need to create this
+user_memory_repo = repository('UserMemory')
+user_goals_repo = repository('UserGoals')  # You need to create this
 
 def fetch_latest_memory(user_id: str, type_filter: str):
     """Fetch the latest memory summary of a given type."""
-    response = user_memory_table.scan()
-    items = [
-        item for item in response.get("Items", [])
-        if item.get("user_id") == user_id and item.get("type") == type_filter
-    ]
-    if not items:
-        return None
-    return sorted(items, key=lambda x: x["date"], reverse=True)[0]
+    items = user_memory_repo.query_all(user_id, filter=Attr("type").eq(type_filter), descending=True)
+    return items[0] if items else None
 
 def check_stress_from_journal(memory):
     """Detect emotion streaks like 3+ 'sad' days in a row."""
@@ -35,41 +30,53 @@ def check_stress_from_chat(chat_summary):
 
 def goal_exists(user_id: str, goal_type: str) -> bool:
     """Check if a goal is already active."""
-    response = user_goals_table.scan()
-    for item in response.get("Items", []):
-        if (
-            item.get("user_id") == user_id
-            and item.get("goal_type") == goal_type
-            and item.get("status") == "active"
-        ):
-            return True
-    return False
+    goals = user_goals_repo.query_all(
+        user_id,
+        filter=Attr("goal_type").eq(goal_type) & Attr("status").eq("active"),
+        attributes=["goal_id"]
+    )
+    return bool(goals)
 
-def create_goal(user_id: str, goal_type: str, reason: str):
-    """Create a new goal entry."""
-    user_goals_table.put_item(Item={
+def create_goal(user_id: str, goal_type: str, reason: str, uow: UnitOfWork = None):
+    """Create a new goal entry (queued on uow when one is given)."""
+    goal = {
         "user_id": user_id,
         "goal_id": str(uuid4()),
         "goal_type": goal_type,
         "status": "active",
         "created_at": datetime.utcnow().isoformat(),
         "reason": reason
-    })
+    }
+    if uow is not None:
+        uow.put(user_goals_repo.name, goal)
+    else:
+        user_goals_repo.put(goal)
     print(f"✅ Goal '{goal_type}' triggered for {user_id} → Reason: {reason}")
 
-def run_agent_brain(user_id: str):
+def run_agent_brain(user_id: str, uow: UnitOfWork = None):
     journal_summary = fetch_latest_memory(user_id, "memory")
     chat_summary = fetch_latest_memory(user_id, "chat_summary")
 
+    reasons = []
     if journal_summary:
-        reason = check_stress_from_journal(journal_summary)
-        if reason and not goal_exists(user_id, "reduce_stress"):
-            create_goal(user_id, "reduce_stress", reason)
-
+        reasons.append(check_stress_from_journal(journal_summary))
     if chat_summary:
-        reason = check_stress_from_chat(chat_summary)
-        if reason and not goal_exists(user_id, "reduce_stress"):
-            create_goal(user_id, "reduce_stress", reason)
+        reasons.append(check_stress_from_chat(chat_summary))
+    reason = next((r for r in reasons if r), None)
+
+    # Goals created here may still be queued on uow, so this run only ever adds one
+    if reason and not goal_exists(user_id, "reduce_stress"):
+        create_goal(user_id, "reduce_stress", reason, uow)
+
+
+def run_agent_brain_for(user_ids):
+    """One unit of work for the whole run: every new goal goes out in batch writes."""
+    with UnitOfWork() as uow:
+        for user_id in user_ids:
+            run_agent_brain(user_id, uow)
+    return uow.stats
+
 
+# python -m backend.agent_brain [user_id ...]
 if __name__ == "__main__":
-    run_agent_brain("demo_user")
+    print(run_agent_brain_for(sys.argv[1:] or ["demo_user"]))
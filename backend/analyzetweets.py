@@ -1,62 +1,77 @@
 import os
-import torch
 import re
 import json
-import requests
-from ibm_watsonx_ai.foundation_models import ModelInference
-from ibm_watsonx_ai.credentials import Credentials
-from ibm_watsonx_ai import APIClient
 from fastapi import APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from collections import defaultdict, Counter
-from dotenv import dotenv_values
-import boto3
-from apscheduler.schedulers.background import BackgroundScheduler
+from collections import defaultdict, Counter, OrderedDict
+from dotenv import load_dotenv
+import threading
+from backend.util import services
+from backend.storage import repository, ConditionFailed, UnitOfWork
+from backend.util.monitor_scheduler import MonitorScheduler
+from backend.util.alert_hub import alert_hub
+from backend.util.pagination import encode_cursor, decode_cursor
+from backend.util.session_tokens import session_user, verify_token, SessionTokenError
+from backend.util.twitter_client import TwitterClient, TwitterRateLimited
+from backend.util.risk_prescreen import prescreen_texts, prescreened_result, record_llm_outcome, get_cascade_stats
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Body
-from typing import List
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from typing import List, Optional
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key, Attr
+from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
 
-popup_state = {
-    "show_popup": False,
-    "support_message": None,
-    "last_checked": None
-}
+# Per-user alert state lives in alert_hub (util/alert_hub.py)
+ALERT_KEEPALIVE_SECONDS = 25
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-south-1')
-scheduler =BackgroundScheduler()
-print("📅 Starting APScheduler...")  # <-- Add this
+# Tweet monitor: every handle is checked once per window, spread out with jitter
+MONITOR_TABLE = "MonitoredHandles"
+DEFAULT_MONITORED_HANDLE = "GauthamSalian31"
+CHECK_INTERVAL_MINUTES = 17
+handle_owners = None  # user_id -> twitter_handle, from the MonitoredHandles "user_id" attribute
 
-# Step 1: Load env values from file
-env_vars = dotenv_values(r"C:\Users\ASUS\Desktop\MoodMate\Moodmate\backend\.env")
+# Incremental fetching: since_id watermarks + cached username lookups
+WATERMARK_TABLE = "TweetWatermarks"
+USER_ID_TTL = timedelta(days=int(os.getenv("TWITTER_USER_ID_TTL_DAYS", "7")))
+TIMELINE_PAGE_SIZE = 100   # users/:id/tweets max_results limit
+TIMELINE_MAX_PAGES = 32    # the timeline endpoint only reaches back 3200 tweets anyway
+user_id_cache = {}  # username -> (user_id, expires_at, resolved_at)
 
-# Step 2: Inject them into os.environ
-for key, value in env_vars.items():
-    os.environ[key] = value
-
-# Step 3: Now retrieve using os.getenv()
+load_dotenv()
 BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
-print("BEARER_TOKEN:", "Loaded" if BEARER_TOKEN else "Missing or Empty")
+
+# Pooled, rate-limit-aware client for every Twitter call (TWITTER_API_BASE for a stub)
+twitter = TwitterClient(BEARER_TOKEN)
 
 
 
 safe_token = "No"
 risky_token = "Yes"
 
-credentials = Credentials(
-    url="https://eu-de.ml.cloud.ibm.com",  # or regional Watsonx URL
-    api_key=os.getenv("WATSONX_API_KEY")
-)
-client = APIClient(credentials)
+# Bounded pool for per-tweet guardian calls (each one blocks on Watsonx)
+ANALYSIS_WORKERS = int(os.getenv("TWEET_ANALYSIS_WORKERS", "8"))
+analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="tweet-analysis")
 
-guardian_model = ModelInference(
-    model_id="ibm/granite-3-3-8b-instruct",  # ⚠️ A supported model with long-term viability
-    credentials=credentials,
-    project_id="1cb8c38f-d650-41fe-9836-86659006c090",
-    params={"decoding_method": "greedy", "max_new_tokens": 100}
-)
+# Cached analyses: LRU in front of TweetRiskAnalysis
+TWEET_TABLE = "TweetRiskAnalysis"
+TWEET_USER_INDEX = "user_id-created_at-index"  # GSI: user_id (HASH), created_at (RANGE)
+READ_PAGE_MAX = 200
+READ_SCAN_FACTOR = int(os.getenv("TWEET_READ_SCAN_FACTOR", "4"))  # evaluated items per call <= limit * factor
+ANALYSIS_CACHE_SIZE = int(os.getenv("TWEET_ANALYSIS_CACHE_SIZE", "2048"))
+TRANSACT_CHUNK = 100    # DynamoDB transact_write_items limit
+analysis_cache = OrderedDict()
+analysis_cache_lock = threading.Lock()
+
+tweet_repo = repository(TWEET_TABLE)
+watermark_repo = repository(WATERMARK_TABLE)
+monitor_repo = repository(MONITOR_TABLE)
+
+# Built on first use by the shared registry (util/services.py)
+guardian_model = services.lazy_model("ibm/granite-3-3-8b-instruct", max_new_tokens=100)  # ⚠️ A supported model with long-term viability
 
 def send_supportive_message(tweet_text):
     support_prompt = f"""
@@ -80,12 +95,16 @@ def send_supportive_message(tweet_text):
 def scheduled_check(username):
     print(f"⏰ scheduled_check triggered at {datetime.utcnow()} for user: {username}")
     try:
-        user_id = get_user_id(username)
-        tweets = get_user_tweets(user_id, max_results=10)
+        watermark = get_watermark(username)
+        user_id = resolve_user_id(username, watermark)
+        since_id = watermark.get("newest_tweet_id")
+        # Every tweet newer than the watermark (all pages); just the latest 10 on a first check
+        tweets = get_tweets_since(user_id, since_id) if since_id else get_user_tweets(user_id, max_results=10)
 
         now = datetime.utcnow()
         cutoff = now - timedelta(hours=24)
 
+        recent_tweets = []
         for tweet in tweets:
             created_at_str = tweet.get("created_at")
             if not created_at_str:
@@ -95,94 +114,243 @@ def scheduled_check(username):
             if created_at < cutoff:
                 continue
 
-            result = analyze_tweet(tweet['id'], tweet['text'], created_at_str)
-
-            if result['probability_of_risk'] > 0.85:
-                popup_state["show_popup"] = True
-                popup_state["support_message"] = send_supportive_message(result["text"])
-                popup_state["last_checked"] = now
-                popup_state["risky_tweet_text"] = result["text"]
-                return  # We found one, no need to check more
+            recent_tweets.append({"id": tweet["id"], "text": tweet["text"], "date": created_at_str})
+
+        # New analyses and the watermark go out together in one batch write. The watermark
+        # stops short of any tweet whose analysis failed, so the next check retries it.
+        failed_ids = set()
+        with UnitOfWork() as uow:
+            results = analyze_tweet_batch(recent_tweets, owner=username, uow=uow, failed_ids=failed_ids)
+            risky = next((r for r in results if r['probability_of_risk'] > 0.85), None)
+            save_watermark(username, user_id, next_watermark(tweets, since_id, failed_ids), now, uow)
+
+        if not tweets:
+            # Nothing new since the last check: keep whatever alert is showing
+            alert_hub.publish(username, last_checked=now)
+            return
+
+        if risky:
+            # Wakes every client waiting on this user's alert stream
+            alert_hub.publish(
+                username,
+                show_popup=True,
+                support_message=send_supportive_message(risky["text"]),
+                risky_tweet_text=risky["text"],
+                last_checked=now
+            )
+            return  # We found one, no need to check more
 
         # If loop ends without finding one
-        popup_state["show_popup"] = False
-        popup_state["support_message"] = None
-        popup_state["last_checked"] = now
-        popup_state["risky_tweet_text"] = None  # 🔐 Preserve the tweet text
+        alert_hub.publish(username, show_popup=False, support_message=None, risky_tweet_text=None, last_checked=now)
 
+    except TwitterRateLimited as e:
+        # Out of budget: skip this round, the watermark picks up where we left off
+        print("⏳ Scheduler skipped:", str(e))
     except Exception as e:
         print("Scheduler error:", str(e))
-        popup_state["show_popup"] = False
+        alert_hub.publish(username, show_popup=False)
+
+
+# 🔖 Per-user watermarks: resolved user id, newest seen tweet id, last check time
+def get_watermark(username):
+    try:
+        return watermark_repo.get({"username": username}) or {}
+    except Exception as e:
+        print("⚠️ Could not read tweet watermark:", str(e))
+        return {}
+
+
+def save_watermark(username, user_id, newest_id, checked_at, uow: UnitOfWork = None):
+    _, _, resolved_at = user_id_cache.get(username, (user_id, None, checked_at))
+    item = {
+        "username": username,
+        "user_id": user_id,
+        "resolved_at": resolved_at.isoformat(),
+        "last_checked": checked_at.isoformat()
+    }
+    if newest_id:
+        item["newest_tweet_id"] = newest_id
+    if uow is not None:
+        uow.put(WATERMARK_TABLE, item)
+        return
+    try:
+        watermark_repo.put(item)
+    except Exception as e:
+        print("⚠️ Could not save tweet watermark:", str(e))
+
+
+def newest_tweet_id(tweets, current=None):
+    ids = [t["id"] for t in tweets if t.get("id")]
+    if current:
+        ids.append(current)
+    return max(ids, key=int) if ids else None
+
+
+def next_watermark(tweets, current=None, failed_ids=()):
+    """Newest tweet id seen, or just below the oldest failed one (since_id is exclusive)."""
+    if not failed_ids:
+        return newest_tweet_id(tweets, current)
+    before_failed = str(min(int(i) for i in failed_ids) - 1)
+    return max([before_failed, current] if current else [before_failed], key=int)
+
+
+# 🪪 username → id, cached in-process and on the watermark item for USER_ID_TTL
+def resolve_user_id(username, watermark=None):
+    now = datetime.utcnow()
+    cached = user_id_cache.get(username)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    if watermark and watermark.get("user_id") and watermark.get("resolved_at"):
+        resolved_at = datetime.fromisoformat(watermark["resolved_at"])
+        if resolved_at + USER_ID_TTL > now:
+            user_id_cache[username] = (watermark["user_id"], resolved_at + USER_ID_TTL, resolved_at)
+            return watermark["user_id"]
+
+    user_id = get_user_id(username)
+    user_id_cache[username] = (user_id, now + USER_ID_TTL, now)
+    return user_id
 
 
 def get_user_id(username):
-    url = f"https://api.twitter.com/2/users/by/username/{username}"
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
-    response = requests.get(url, headers=headers)
-    resp_json = response.json()
-    if "data" in resp_json:
-        return resp_json["data"]["id"]
+    resolved = twitter.users_by_usernames([username])
+    user_id = resolved.get(username.lstrip("@").lower())
+    if user_id:
+        return user_id
     else:
-        raise Exception(f"User not found or API error: {resp_json}")
+        raise Exception(f"User not found or API error: {username}")
 
-def store_analysis(tweet_id, text, created_at, harm, confidence, comment):
-    table = dynamodb.Table('TweetRiskAnalysis')
 
-    existing_item = table.get_item(Key={'tweet_id': tweet_id})
-    if 'Item' in existing_item:
-        print(f"⚠️ Tweet {tweet_id} already exists in DB. Skipping.")
-        return {"status": "skipped", "reason": "already exists"}
-    
-    response = table.put_item(Item={
+# 👥 Resolve every uncached handle with batched users/by?usernames= lookups
+def prefetch_user_ids(usernames):
+    now = datetime.utcnow()
+    missing = [u for u in usernames if not (user_id_cache.get(u) and user_id_cache[u][1] > now)]
+    if not missing:
+        return
+    try:
+        resolved = twitter.users_by_usernames(missing)
+    except Exception as e:
+        print("⚠️ Batched user lookup failed:", str(e))
+        return
+    for username in missing:
+        user_id = resolved.get(username.lstrip("@").lower())
+        if user_id:
+            user_id_cache[username] = (user_id, now + USER_ID_TTL, now)
+
+def _analysis_item(tweet_id, text, created_at, harm, confidence, comment):
+    try:
+        risk_score = Decimal(str(float(confidence)))
+    except ValueError:
+        risk_score = Decimal("0")
+    return {
         'tweet_id': tweet_id,
         'text': text,
         'created_at': created_at,
         'risk_detected': harm,
         'confidence_score': confidence,
+        'risk_score': risk_score,  # numeric copy for min_risk filtering
         'explanation': comment
-    })
-    return response
+    }
 
 
-def get_user_tweets(user_id, max_results=5):
-    url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
-    params = {
-        "max_results": max_results,
-        "tweet.fields": "created_at,text",
-    }
-    response = requests.get(url, headers=headers, params=params)
-    resp_json = response.json()
+def store_analysis(tweet_id, text, created_at, harm, confidence, comment):
+    return store_analyses([_analysis_item(tweet_id, text, created_at, harm, confidence, comment)])
+
+
+# 💾 Write new analyses without a read first: conditional puts, 100 per transaction
+def store_analyses(items):
+    if not items:
+        return {"status": "ok", "written": 0}
+
+    written = 0
+    for i in range(0, len(items), TRANSACT_CHUNK):
+        chunk = items[i:i + TRANSACT_CHUNK]
+        try:
+            tweet_repo.transact([{"put": item, "condition": Attr("tweet_id").not_exists()} for item in chunk])
+            written += len(chunk)
+        except ConditionFailed:
+            # Someone else stored part of this chunk first; keep the rest one by one
+            for item in chunk:
+                try:
+                    tweet_repo.put(item, condition=Attr("tweet_id").not_exists())
+                    written += 1
+                except ConditionFailed:
+                    print(f"⚠️ Tweet {item['tweet_id']} already exists in DB. Skipping.")
+    return {"status": "ok", "written": written}
+
+
+def get_user_tweets(user_id, max_results=5, since_id=None):
+    resp_json = twitter.user_tweets(user_id, max_results=max_results, since_id=since_id)
     print("Response JSON:", json.dumps(resp_json, indent=2))  # Debugging line
     if "data" in resp_json:
         return resp_json["data"]
     else:
         return []
 
-def analyze_tweet(tweet_id, text, created_at: str):
+
+# 📜 Follows next_token until every tweet newer than since_id has been read (newest first)
+def get_tweets_since(user_id, since_id):
+    tweets, token = [], None
+    for _ in range(TIMELINE_MAX_PAGES):
+        resp_json = twitter.user_tweets(user_id, max_results=TIMELINE_PAGE_SIZE, since_id=since_id, pagination_token=token)
+        tweets.extend(resp_json.get("data", []))
+        token = resp_json.get("meta", {}).get("next_token")
+        if not token:
+            break
+    return tweets
+
+def _item_to_result(item):
     try:
-            # 🗃️ Step 1: Check if analysis already exists in DB
-            table = dynamodb.Table('TweetRiskAnalysis')
-            existing_item = table.get_item(Key={'tweet_id': tweet_id})
-            if 'Item' in existing_item:
-                print(f"🔁 Found existing analysis for tweet {tweet_id}")
-                return {
-                    "text": existing_item['Item']['text'],
-                    "risk_detected": existing_item['Item']['risk_detected'],
-                    "created_at": existing_item['Item']['created_at'],
-                    "confidence": existing_item['Item']['confidence_score'],
-                    "probability_of_risk": float(existing_item['Item']['confidence_score']),
-                    "explanation": existing_item['Item']['explanation'],
-                }
-    except Exception as e:
-        print("🛑 Analyze error:", str(e))
-        return {
-            "text": text,
-            "risk_detected": "Unknown",
-            "confidence": "Unknown",
-            "probability_of_risk": 0.0,
-        }
+        probability_of_risk = float(item['confidence_score'])
+    except (TypeError, ValueError):
+        probability_of_risk = 0.0
+    return {
+        "text": item['text'],
+        "risk_detected": item['risk_detected'],
+        "created_at": item['created_at'],
+        "confidence": item['confidence_score'],
+        "probability_of_risk": probability_of_risk,
+        "explanation": item['explanation'],
+    }
+
 
+def _cache_get(tweet_id):
+    with analysis_cache_lock:
+        result = analysis_cache.get(tweet_id)
+        if result is not None:
+            analysis_cache.move_to_end(tweet_id)
+        return result
+
+
+def _cache_put(tweet_id, result):
+    with analysis_cache_lock:
+        analysis_cache[tweet_id] = result
+        analysis_cache.move_to_end(tweet_id)
+        while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+            analysis_cache.popitem(last=False)
+
+
+# 🗃️ Resolve cached analyses: in-process LRU first, then one batch get for the rest
+def fetch_cached_analyses(tweet_ids):
+    found = {}
+    missing = []
+    for tweet_id in dict.fromkeys(tweet_ids):
+        cached = _cache_get(tweet_id)
+        if cached is not None:
+            found[tweet_id] = cached
+        else:
+            missing.append(tweet_id)
+
+    for item in tweet_repo.get_many([{"tweet_id": tweet_id} for tweet_id in missing]):
+        result = _item_to_result(item)
+        _cache_put(item['tweet_id'], result)
+        found[item['tweet_id']] = result
+
+    return found
+
+
+def _evaluate_tweet(tweet_id, text, created_at: str):
+    """Run the guardian model on one tweet. Returns (result, item to store or None)."""
     try:
         prompt = f"""
             <risk_evaluation>
@@ -215,16 +383,15 @@ def analyze_tweet(tweet_id, text, created_at: str):
             probability_of_risk = float(confidence_str)
         except ValueError:
             probability_of_risk = 0.0
-        tweet_id = str(tweet_id) if tweet_id else "unknown_id"
-        store_analysis(tweet_id, text, created_at, label, confidence_str, explanation)
 
-        return {
+        result = {
             "text": text,
             "risk_detected": label,
             "confidence": confidence_str,
             "probability_of_risk": probability_of_risk,
             "explanation": explanation
         }
+        return result, _analysis_item(tweet_id, text, created_at, label, confidence_str, explanation)
 
     except Exception as e:
         return {
@@ -232,42 +399,171 @@ def analyze_tweet(tweet_id, text, created_at: str):
             "risk_detected": "Unknown",
             "confidence": "Unknown",
             "probability_of_risk": 0.0,
-        }
-scheduled_check("GauthamSalian31")
-scheduler.add_job(
-    scheduled_check,
-    'interval',
-    minutes = 17,
-    args=["GauthamSalian31"],
-    id='risk_check_job',
-    replace_existing=True
-)       
-scheduler.start()
-print("✅ Job added to scheduler")
-print("📅 Scheduler jobs:")
-for job in scheduler.get_jobs():
-    print(f"🕒 Job '{job.id}' next run: {job.next_run_time}")
+        }, None
+
+
+def analyze_tweet(tweet_id, text, created_at: str):
+    return analyze_tweet_batch([{"id": tweet_id, "text": text, "date": created_at}])[0]
+
+
+# 🚀 One batch read for cached results, guardian calls fanned out over the pool for the
+# misses, one batched conditional write for the new analyses. Output keeps tweet order.
+# With a unit of work the analyses are queued as plain puts instead (the batch read just
+# showed they are missing) and flushed with the caller's other writes. failed_ids, when
+# given, collects the tweets whose guardian call failed.
+def analyze_tweet_batch(tweet_data, owner=None, uow: UnitOfWork = None, failed_ids: set = None):
+    tweet_ids = [str(t["id"]) if t["id"] else "unknown_id" for t in tweet_data]
+
+    try:
+        cached = fetch_cached_analyses(tweet_ids)
+    except Exception as e:
+        print("🛑 Analyze error:", str(e))
+        cached = {}
+    for tweet_id in cached:
+        print(f"🔁 Found existing analysis for tweet {tweet_id}")
+
+    pending = [(tweet_id, t) for tweet_id, t in zip(tweet_ids, tweet_data) if tweet_id not in cached]
+
+    # 🧮 Stage 1: local VADER pre-screen; only likely-risky tweets (or shadow samples) hit the LLM
+    decisions = prescreen_texts([t["text"] for _, t in pending])
+    fresh = {}
+    to_llm = []
+    for (tweet_id, t), decision in zip(pending, decisions):
+        if decision["escalate"] or decision["shadow"]:
+            to_llm.append((tweet_id, t, decision))
+        else:
+            fresh[tweet_id] = prescreened_result(t["text"], decision)
+
+    # 🛡️ Stage 2: guardian model for the escalated tweets
+    evaluate = lambda entry: _evaluate_tweet(entry[0], entry[1]["text"], entry[1]["date"])
+    if len(to_llm) <= 1:
+        evaluated = [evaluate(entry) for entry in to_llm]
+    else:
+        evaluated = list(analysis_pool.map(evaluate, to_llm))
+
+    new_items = []
+    for (tweet_id, _, decision), (result, item) in zip(to_llm, evaluated):
+        record_llm_outcome(decision, result["probability_of_risk"] > 0.85 or result["risk_detected"] == risky_token)
+        if item is None and failed_ids is not None:
+            failed_ids.add(tweet_id)  # guardian call failed: nothing stored, not analyzed
+        if item is not None and tweet_id not in fresh:
+            if owner:
+                item["user_id"] = owner  # partition key of the user/created_at index
+            new_items.append(item)
+        fresh[tweet_id] = result
+
+    def cache_new():
+        for item in new_items:
+            _cache_put(item['tweet_id'], fresh[item['tweet_id']])
+
+    if uow is not None:
+        for item in new_items:
+            uow.put(TWEET_TABLE, item)
+        uow.after_flush(cache_new)
+    else:
+        try:
+            store_analyses(new_items)
+            cache_new()
+        except Exception as e:
+            print("🛑 Error storing tweet analyses:", str(e))
+
+    return [cached.get(tweet_id) or fresh[tweet_id] for tweet_id in tweet_ids]
+
+
+# 👥 Monitored handles: MonitoredHandles table (+ MONITORED_TWITTER_HANDLES env override)
+def load_monitored_handles():
+    global handle_owners
+    handles = {h.strip() for h in os.getenv("MONITORED_TWITTER_HANDLES", "").split(",") if h.strip()}
+    try:
+        items = [item for item in monitor_repo.scan_all(attributes=["twitter_handle", "user_id"]) if item.get("twitter_handle")]
+        handles.update(item["twitter_handle"] for item in items)
+        handle_owners = {item["user_id"]: item["twitter_handle"] for item in items if item.get("user_id")}
+    except Exception as e:
+        print("⚠️ Could not load monitored handles:", str(e))
+    return sorted(handles or {DEFAULT_MONITORED_HANDLE})
+
+
+tweet_monitor = MonitorScheduler(
+    check_fn=scheduled_check,
+    load_handles_fn=load_monitored_handles,
+    on_reload=prefetch_user_ids,
+    interval_seconds=CHECK_INTERVAL_MINUTES * 60,
+    jitter_seconds=float(os.getenv("TWEET_MONITOR_JITTER_SECONDS", "30")),
+    max_workers=int(os.getenv("TWEET_MONITOR_WORKERS", "8")),
+    shard_index=int(os.getenv("TWEET_MONITOR_SHARD_INDEX", "0")),
+    shard_count=int(os.getenv("TWEET_MONITOR_SHARD_COUNT", "1")),
+)
+# Started from the app lifespan (ENABLE_SCHEDULED_JOBS=1), never at import
+
+
+# 🔐 Alerts are only ever served for the handle the session's user registered.
+# EventSource cannot set headers, so the token may also come as ?token=...
+def alert_handle(token: Optional[str] = None, authorization: Optional[str] = Header(None)) -> str:
+    if token:
+        try:
+            user_id = verify_token(token)
+        except SessionTokenError as e:
+            raise HTTPException(status_code=401, detail=str(e))
+    else:
+        user_id = session_user(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Session token required", headers={"WWW-Authenticate": "Bearer"})
+
+    if handle_owners is None:
+        load_monitored_handles()  # scheduler not running (ENABLE_SCHEDULED_JOBS=0)
+    handle = (handle_owners or {}).get(user_id)
+    if not handle:
+        raise HTTPException(status_code=404, detail="No monitored Twitter handle for this user")
+    return handle
 
 
 @router.get("/api/trigger_check")
-def trigger_check():
+def trigger_check(handle: str = Depends(alert_handle)):
+    _, state = alert_hub.get(handle)
     return {
-        "show_popup": popup_state["show_popup"],
-        "support_message": popup_state["support_message"],
-        "last_checked": popup_state["last_checked"],
-        "risky_tweet_text": popup_state.get("risky_tweet_text")  # 👈 Now accessible to frontend
+        "show_popup": state["show_popup"],
+        "support_message": state["support_message"],
+        "last_checked": state["last_checked"],
+        "risky_tweet_text": state.get("risky_tweet_text")  # 👈 Now accessible to frontend
     }
 
 
+# ⏳ Long-poll: returns as soon as the alert changes past `since`, or after `timeout`
+@router.get("/api/alerts/wait")
+async def wait_for_alert(handle: str = Depends(alert_handle), since: int = 0, timeout: float = ALERT_KEEPALIVE_SECONDS):
+    version, state = await alert_hub.wait(handle, since, min(max(timeout, 0.0), 60.0))
+    return {"version": version, **state}
+
+
+# 📡 Server-sent events: current state on connect, then one event per alert change.
+# A reconnect carries Last-Event-ID, so a state the client already showed is not replayed.
+@router.get("/api/alerts/stream")
+async def alert_stream(request: Request, handle: str = Depends(alert_handle), last_event_id: Optional[str] = Header(None)):
+    seen = -1
+    if last_event_id and last_event_id.isdigit() and int(last_event_id) <= alert_hub.get(handle)[0]:
+        seen = int(last_event_id)  # a higher id predates a server restart: send the current state
+
+    async def events():
+        nonlocal seen
+        while not await request.is_disconnected():
+            version, state = await alert_hub.wait(handle, seen, ALERT_KEEPALIVE_SECONDS)
+            if version > seen:
+                seen = version
+                yield f"id: {version}\ndata: {json.dumps(state, default=str)}\n\n"
+            else:
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @router.get("/analyze_tweets/{username}")
 def analyze_tweets(username: str, max_results: int = 5):
     try:
-        user_id = get_user_id(username)
+        user_id = resolve_user_id(username)
         tweets = get_user_tweets(user_id, max_results=max_results)
         tweet_data = [{"id": tweet["id"], "date": tweet["created_at"], "text": tweet["text"]} for tweet in tweets]
         results = []
-        for tweet in tweet_data:
-            result = analyze_tweet(tweet["id"], tweet["text"], tweet["date"])
+        for tweet, result in zip(tweet_data, analyze_tweet_batch(tweet_data, owner=username)):
             results.append({
                 "date": tweet["date"],
                 "text": tweet["text"],
@@ -283,14 +579,13 @@ def analyze_tweets(username: str, max_results: int = 5):
 @router.get("/analyze_all/{username}")
 def analyze_all(username: str, max_results: int = 5):
     try:
-        user_id = get_user_id(username)
+        user_id = resolve_user_id(username)
         tweets = get_user_tweets(user_id, max_results=max_results)
 
         tweet_data = [{"id": tweet["id"], "date": tweet["created_at"], "text": tweet["text"]} for tweet in tweets]
 
         results = []
-        for tweet in tweet_data:
-            result = analyze_tweet(tweet["id"], tweet["text"], tweet["date"])
+        for tweet, result in zip(tweet_data, analyze_tweet_batch(tweet_data, owner=username)):
             results.append({
                 "date": tweet["date"],
                 "text": tweet["text"],
@@ -304,38 +599,113 @@ def analyze_all(username: str, max_results: int = 5):
     except Exception as e:
         return {"error": str(e)}
 
-@router.get("/api/read_analysis")
-def read_analyzed_tweets():
+def _tweet_to_row(tweet):
     try:
-        table = dynamodb.Table('TweetRiskAnalysis') 
-        response = table.scan()
-        print(f"🔎 Raw scan response: {response}")
-        items = response.get("Items", [])
+        probability_of_risk = float(tweet.get("confidence_score", "0.0"))
+    except ValueError:
+        probability_of_risk = 0.0
+    return {
+        "date": tweet.get("created_at", "Unknown"),
+        "text": tweet.get("text", ""),
+        "risk_detected": tweet.get("risk_detected", "Unknown"),
+        "confidence": tweet.get("confidence_score", "Unknown"),
+        "probability_of_risk": probability_of_risk,
+        "explanation": tweet.get("explanation", "Not provided"),
+        "tweet_id": tweet.get("tweet_id", "")
+    }
 
-        results = []
-        for tweet in items:
-            result = {
-                "date": tweet.get("created_at", "Unknown"),
-                "text": tweet.get("text", ""),
-                "risk_detected": tweet.get("risk_detected", "Unknown"),
-                "confidence": tweet.get("confidence_score", "Unknown"),
-                "probability_of_risk": float(tweet.get("confidence_score", "0.0")),
-                "explanation": tweet.get("explanation", "Not provided"),
-                "tweet_id": tweet.get("tweet_id", "")
-            }
-            results.append(result)
 
-        return {
-            "risk_analysis": results
-        }
+# 📄 Yields one page of a user's analyses, newest first, straight off the GSI
+def _read_analysis_pages(user_id, min_risk, from_date, to_date, limit, cursor):
+    range_condition = None
+    if from_date and to_date:
+        range_condition = Key("created_at").between(from_date, to_date)
+    elif from_date:
+        range_condition = Key("created_at").gte(from_date)
+    elif to_date:
+        range_condition = Key("created_at").lte(to_date)
+    risk_filter = Attr("risk_score").gte(Decimal(str(min_risk))) if min_risk is not None else None
+
+    remaining = limit
+    budget = limit * READ_SCAN_FACTOR
+    last_key = decode_cursor(cursor) if cursor else None
+    while remaining > 0 and budget > 0:
+        # Limit counts evaluated items, so a filtered page may need a few rounds; the
+        # budget caps them, and a short page still carries a cursor for the rest
+        round_limit = min(remaining, budget)
+        page = tweet_repo.query(
+            user_id,
+            range_condition=range_condition,
+            index=TWEET_USER_INDEX,
+            filter=risk_filter,
+            descending=True,
+            limit=round_limit,
+            start_key=last_key
+        )
+        for tweet in page.items:
+            yield _tweet_to_row(tweet)
+        remaining -= len(page.items)
+        budget -= round_limit
+        last_key = page.last_key
+        if not last_key:
+            break
+
+    yield {"next_cursor": encode_cursor(last_key)}
+
 
+@router.get("/api/read_analysis")
+def read_analyzed_tweets(
+    user_id: str = DEFAULT_MONITORED_HANDLE,
+    min_risk: Optional[float] = None,
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    limit = max(1, min(limit, READ_PAGE_MAX))
+    if to_date and len(to_date) == 10:
+        to_date += "T23:59:59.999Z"  # make a plain date inclusive
+
+    try:
+        pages = _read_analysis_pages(user_id, min_risk, from_date, to_date, limit, cursor)
+        first = next(pages)
     except Exception as e:
         print("🛑 Error reading tweet analysis:", str(e))
         return {
             "risk_analysis": [],
             "error": str(e)
         }
+
+    # Stream rows as DynamoDB pages arrive: {"risk_analysis": [...], "next_cursor": ...}
+    # A read failing mid-stream ends the list with {"next_cursor": null, "error": ...} so
+    # a partial page is never mistaken for the last one
+    def stream():
+        row = first
+        sep = ""
+        yield '{"risk_analysis": ['
+        while "next_cursor" not in row:
+            yield sep + json.dumps(row, default=str)
+            sep = ", "
+            try:
+                row = next(pages)
+            except Exception as e:
+                print("🛑 Error reading tweet analysis:", str(e))
+                row = {"next_cursor": None, "error": str(e)}
+        tail = '], "next_cursor": ' + json.dumps(row["next_cursor"])
+        if "error" in row:
+            tail += ', "error": ' + json.dumps(row["error"])
+        yield tail + "}"
+
+    return StreamingResponse(stream(), media_type="application/json")
     
+@router.get("/api/monitor/stats")
+def monitor_stats():
+    return {**tweet_monitor.stats(), "alert_stream_clients": alert_hub.waiting_clients()}
+
+@router.get("/api/risk_cascade/stats")
+def risk_cascade_stats():
+    return get_cascade_stats()
+
 @router.get("/ping")
 def ping():
     return {"status": "OK", "time": datetime.utcnow()}
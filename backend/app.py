@@ -2,14 +2,19 @@ import requests
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from datetime import datetime
-import json
 import os
 from dotenv import load_dotenv
+from util.chat_log_writer import ChatLogWriter
+from routes.twitter_analyzer import twitter_analyzer
 
 load_dotenv()  # Load variables from .env
 
+# Own log file: the FastAPI app rotates chat_log.json, and rotation isn't coordinated across processes
+chat_log_writer = ChatLogWriter(os.getenv("FLASK_CHAT_LOG_PATH", "chat_log.flask.json"))
+
 app = Flask(__name__)
 CORS(app)
+app.register_blueprint(twitter_analyzer)
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")  # Get API key from .env
 
@@ -52,15 +57,14 @@ def chat():
         )
         reply = res.json()["choices"][0]["message"]["content"]
 
-        # Optional: Log chat
-        with open("chat_log.json", "a") as f:
-            f.write(json.dumps({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": user_message,
-                "stress_score": stress.get("voice", 0),
-                "input_scores": {},
-                "reply": reply
-            }) + "\n")
+        # Optional: Log chat (buffered, flushed in batches off the request path)
+        chat_log_writer.write({
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": user_message,
+            "stress_score": stress.get("voice", 0),
+            "input_scores": {},
+            "reply": reply
+        })
 
         return jsonify({"reply": reply})
 
@@ -0,0 +1,51 @@
+# auth_email_backfill.py
+#
+# Indexes existing UserAuth users into UserAuthEmails so /login can find them without
+# a scan. Safe to re-run: every put is conditional on the email being unindexed.
+# When several users share an email, the oldest (created_at) keeps it and the rest
+# are listed so they can be merged or contacted by hand.
+#
+#   python -m backend.auth_email_backfill            # write the index
+#   python -m backend.auth_email_backfill --dry-run  # only report
+
+import sys
+from collections import defaultdict
+from boto3.dynamodb.conditions import Attr
+from backend.storage import ConditionFailed
+from backend.util.auth_emails import user_repo, email_repo, normalize_email
+
+
+def scan_users():
+    return user_repo.scan_all(attributes=["username", "email", "created_at"])
+
+
+def run_backfill(dry_run: bool = False):
+    by_email = defaultdict(list)
+    for user in scan_users():
+        if user.get("email"):
+            by_email[normalize_email(user["email"])].append(user)
+
+    stats = {"emails": len(by_email), "indexed": 0, "already_indexed": 0, "conflicts": 0}
+    for email, users in by_email.items():
+        users.sort(key=lambda u: u.get("created_at", ""))
+        owner, duplicates = users[0], users[1:]
+        for dup in duplicates:
+            stats["conflicts"] += 1
+            print(f"⚠️ {email}: user {dup['username']} duplicates {owner['username']}")
+        if dry_run:
+            continue
+        try:
+            email_repo.put(
+                {"email": email, "username": owner["username"]},
+                condition=Attr("email").not_exists()
+            )
+            stats["indexed"] += 1
+        except ConditionFailed:
+            stats["already_indexed"] += 1
+
+    print(f"✅ Email backfill {'(dry run) ' if dry_run else ''}done:", stats)
+    return stats
+
+
+if __name__ == "__main__":
+    run_backfill(dry_run="--dry-run" in sys.argv[1:])
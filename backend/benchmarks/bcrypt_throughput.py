@@ -0,0 +1,71 @@
+# bcrypt_throughput.py
+#
+# Hashes/sec for each bcrypt cost, single-threaded and through the PasswordHasher pool.
+#   python -m backend.benchmarks.bcrypt_throughput --rounds 10 11 12 --seconds 3
+# Use it to pick BCRYPT_ROUNDS / BCRYPT_WORKERS for a host; prints a JSON report.
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from backend.util.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def single_thread(rounds: int, seconds: float):
+    hasher = PasswordHasher(rounds=rounds, max_workers=1, max_queue=0)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.hash_sync("benchmark-password")
+        count += 1
+    hasher.shutdown()
+    return count / (time.perf_counter() - start)
+
+
+async def pooled(rounds: int, seconds: float, workers: int):
+    hasher = PasswordHasher(rounds=rounds, max_workers=workers, max_queue=workers)
+    count, rejected = 0, 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal count, rejected
+        while time.perf_counter() < deadline:
+            try:
+                await hasher.hash("benchmark-password")
+                count += 1
+            except PasswordHasherBusy:
+                rejected += 1
+                await asyncio.sleep(0.001)
+
+    start = time.perf_counter()
+    # Twice as many clients as slots so the queue limit is exercised too
+    await asyncio.gather(*(client() for _ in range(2 * (hasher.max_workers + hasher.max_queue))))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return count / elapsed, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    results = []
+    for rounds in args.rounds:
+        single = single_thread(rounds, args.seconds)
+        pool_rate, rejected = asyncio.run(pooled(rounds, args.seconds, args.workers))
+        results.append({
+            "rounds": rounds,
+            "single_thread_hashes_per_sec": round(single, 2),
+            "ms_per_hash": round(1000 / single, 1) if single else None,
+            "pool_hashes_per_sec": round(pool_rate, 2),
+            "pool_hashes_per_sec_per_core": round(pool_rate / args.workers, 2),
+            "pool_rejected": rejected,
+        })
+    print(json.dumps({"cpu_count": os.cpu_count(), "workers": args.workers, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
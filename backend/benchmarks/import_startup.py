@@ -0,0 +1,79 @@
+# import_startup.py
+#
+# Measures the cold-start cost of importing the FastAPI app.
+#   python -m backend.benchmarks.import_startup --runs 5 --module backend.main
+# Each run is a fresh interpreter with -X importtime; prints a JSON report.
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)")
+
+
+def run_once(module: str):
+    env = {**os.environ, "ENABLE_SCHEDULED_JOBS": "0", "WARM_SERVICES": "0"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env
+    )
+    wall = time.perf_counter() - start
+
+    # Cumulative time of top-level imports (one space after the pipe = not nested)
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            root = name.split(".")[0]
+            top_level[root] = top_level.get(root, 0) + cumulative_us
+    return {
+        "ok": proc.returncode == 0,
+        "wall_seconds": wall,
+        "top_level_us": top_level,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the MoodMate backend")
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    walls = [r["wall_seconds"] for r in runs]
+
+    totals = {}
+    for r in runs:
+        for name, us in r["top_level_us"].items():
+            totals.setdefault(name, []).append(us)
+    slowest = sorted(((name, statistics.median(v)) for name, v in totals.items()), key=lambda x: -x[1])
+
+    report = {
+        "module": args.module,
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "ok": all(r["ok"] for r in runs),
+        "error": next((r["error"] for r in runs if r["error"]), None),
+        "wall_seconds": {
+            "median": round(statistics.median(walls), 4),
+            "min": round(min(walls), 4),
+            "max": round(max(walls), 4),
+        },
+        "slowest_imports_ms": {name: round(us / 1000, 2) for name, us in slowest[:args.top]},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
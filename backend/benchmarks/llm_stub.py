@@ -0,0 +1,149 @@
+# llm_stub.py
+#
+# Deterministic local stand-in for Watsonx text generation and the Colab RAG server.
+#   python -m backend.benchmarks.llm_stub --port 8766 --latency-ms 300 --jitter-ms 100
+#   LLM_STUB_URL=http://127.0.0.1:8766 RAG_SERVER_URL=http://127.0.0.1:8766 uvicorn backend.main:app
+# POST /generate {"model_id", "prompt", "max_new_tokens"} -> {"results": [{"generated_text": ...}]}
+# POST /query    {"past_info", "user_input", "chat_memory"} -> {"answer": {"response", "chat_memory"}}
+# Replies are picked from the prompt (journal JSON, habit suggestions, guardian XML, support
+# message) and delayed by latency +- jitter, where the jitter is a hash of the prompt, so
+# the same workload sees the same delays on every run.
+# The app talks to it through util/llm_http_client.py (services.model() with LLM_STUB_URL).
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RISKY_WORDS = ("hopeless", "overwhelmed", "hurt", "alone")
+
+JOURNAL_REPLY = {
+    "overall_risk_level": "LOW",
+    "action_required": "PASS",
+    "confidence_score": "0.12",
+    "self_harm_flag": "No",
+    "violence_flag": "No",
+    "safety_comment": "Everyday stress without signs of risk.",
+    "historical_pattern": "No clear pattern detected.",
+    "essence_theme": "Balancing a busy day with small moments of rest.",
+    "identified_strengths": ["Reflecting on the day", "Reaching out to friends"],
+    "reappraisal_message": "A hard day does not undo your progress. You noticed what drained you, and that is the first step.",
+    "coping_suggestions": [
+        "When I feel rushed in the morning, I will take three slow breaths.",
+        "When work piles up, I will write down the next small step.",
+        "When I feel alone in the evening, I will message a friend.",
+    ],
+    "chatbot_context": [
+        {"Q": "What drained you today?", "A": "A long list of deadlines."},
+        {"Q": "What helped?", "A": "A short walk after lunch."},
+    ],
+}
+
+
+def reply_for(prompt: str) -> str:
+    lowered = prompt.lower()
+    if "<supportive_response>" in prompt:
+        return "<response>I'm sorry things feel heavy right now. You don't have to carry it alone - I'm here if you want to talk.</response>"
+    if "<risk_evaluation>" in prompt:
+        risky = any(word in lowered for word in RISKY_WORDS)
+        return (f"<harm>{'Yes' if risky else 'No'}</harm>"
+                f"<confidence>{0.82 if risky else 0.08}</confidence>"
+                f"<comment>{'Expresses distress' if risky else 'Neutral everyday update'}</comment>")
+    if "'suggestions'" in prompt:
+        return json.dumps({"suggestions": ["Drink a glass of water", "Take a short walk", "Stretch for two minutes"]})
+    if "moodmate unified agent" in lowered:
+        return json.dumps(JOURNAL_REPLY)
+    return "OK"
+
+
+class StubState:
+    def __init__(self, latency_ms: float, jitter_ms: float):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = {"generate": 0, "query": 0}
+        self.lock = threading.Lock()
+
+    def delay(self, text: str):
+        if not self.latency_ms and not self.jitter_ms:
+            return
+        # Deterministic offset in [-jitter, +jitter]
+        offset = (zlib.crc32(text.encode()) % 2001 - 1000) / 1000 * self.jitter_ms
+        time.sleep(max(self.latency_ms + offset, 0) / 1000)
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.requests[endpoint] += 1
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive for pooled clients
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "invalid JSON"})
+                return
+
+            if self.path.rstrip("/") == "/generate":
+                state.count("generate")
+                prompt = body.get("prompt", "")
+                state.delay(prompt)
+                self._send(200, {"model_id": body.get("model_id"), "results": [{"generated_text": reply_for(prompt)}]})
+            elif self.path.rstrip("/") == "/query":
+                state.count("query")
+                user_input = body.get("user_input", "")
+                state.delay(user_input)
+                memory = (body.get("chat_memory") or "") + f" | user said: {user_input[:40]}"
+                self._send(200, {"answer": {
+                    "response": "That sounds like a lot. What would make the next hour a little easier?",
+                    "chat_memory": memory[-500:],
+                }})
+            else:
+                self._send(404, {"error": "not found"})
+
+    return Handler
+
+
+def serve(port: int = 8766, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+    """Start the stub in a background thread. Returns (server, state)."""
+    state = StubState(latency_ms, jitter_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic local Watsonx / RAG stub")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean added delay per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="deterministic +- spread around the mean")
+    args = parser.parse_args()
+
+    server, _ = serve(args.port, args.latency_ms, args.jitter_ms)
+    print(f"🤖 LLM stub on http://127.0.0.1:{args.port} ({args.latency_ms:.0f} ± {args.jitter_ms:.0f} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+# load_test.py
+#
+# End-to-end load test of backend.main:app against a local store and stubbed services.
+#   python -m backend.benchmarks.load_test --concurrency 32 --duration 30 --llm-latency-ms 300
+#   python -m backend.benchmarks.load_test --output after.json --compare before.json --max-regression 10
+# Boots uvicorn in a subprocess (STORAGE_BACKEND=sqlite on a fresh temp file, Watsonx / RAG
+# from llm_stub.py, Twitter from twitter_stub.py), seeds users and habits, then drives a
+# weighted mix of journal writes, chat turns, habit check-ins, tweet checks and logins.
+# Prints a JSON report with throughput and p50/p95/p99 per endpoint, the mean time each
+# route spent per dependency (from /metrics), the git commit and the config. Each client
+# follows a seeded request sequence and the stubs' delays are a hash of the prompt, so
+# two runs with the same flags differ only by the code under test.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from backend.benchmarks import llm_stub, twitter_stub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_MIX = "journal=2,chat=4,checkin=4,tweets=1,login=1"
+PASSWORD = "benchmark-password"
+
+JOURNAL_TEXTS = [
+    "Work was busy today but I managed a short walk at lunch.",
+    "Felt anxious before the presentation, it went better than expected.",
+    "Slept badly and everything felt heavier than it should.",
+    "Had dinner with my sister and laughed a lot.",
+]
+CHAT_TEXTS = [
+    "I can't stop thinking about tomorrow's exam.",
+    "Today was actually a good day.",
+    "How do I calm down before bed?",
+    "I feel a bit lonely this week.",
+]
+
+
+def parse_mix(spec: str):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return {"commit": commit or None, "dirty": bool(dirty)}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return round(sorted_values[index], 2)
+
+
+# 🚀 Server ##########################################
+def start_server(args, workdir, llm_url, twitter_url):
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+        "STORAGE_BACKEND": "sqlite",
+        "STORE_DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'store.db')}",
+        "LLM_STUB_URL": llm_url,
+        "RAG_SERVER_URL": llm_url,
+        "TWITTER_API_BASE": twitter_url,
+        "SESSION_SECRET": "load-test-secret",
+        "ENABLE_SCHEDULED_JOBS": "0",
+        "WARM_HABIT_SUGGESTIONS": "0",
+    }
+    if args.bcrypt_rounds:
+        env["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    log = open(os.path.join(workdir, "server.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    return proc, f"http://127.0.0.1:{port}", log
+
+
+async def wait_ready(client, base_url, proc, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            if (await client.get(f"{base_url}/openapi.json")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+# 🌱 Seed data ##########################################
+async def seed(client, base_url, users: int, habits: int):
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    seeded = []
+    for i in range(users):
+        email = f"loadtest{i}@example.com"
+        r = await client.post(f"{base_url}/signup", json={"email": email, "password": PASSWORD, "consent": True})
+        if r.status_code not in (200, 409):
+            raise RuntimeError(f"Signup failed ({r.status_code}): {r.text}")
+        r = await client.post(f"{base_url}/login", json={"email": email, "password": PASSWORD})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['token']}"}
+        for h in range(habits):
+            await client.post(f"{base_url}/habitflow/save-progress", headers=headers, json={
+                "habit_id": "", "habit_name": f"habit {h}", "replacement_habit": "walk",
+                "streak": 3, "level": 1, "last_completed": yesterday,
+            })
+        r = await client.get(f"{base_url}/habitflow/get-progress", headers=headers, params={"limit": habits})
+        habit_ids = [item["habit_id"] for item in r.json().get("habits", [])]
+        seeded.append({"email": email, "headers": headers, "habit_ids": habit_ids})
+    return seeded
+
+
+# 🎯 Scenarios: (endpoint label, coroutine issuing one request) #################
+def journal(client, base_url, user, rng, args):
+    return "POST /journal-entry", client.post(f"{base_url}/journal-entry", headers=user["headers"],
+                                              json={"text": rng.choice(JOURNAL_TEXTS)})
+
+
+def chat(client, base_url, user, rng, args):
+    return "POST /chat", client.post(f"{base_url}/chat", headers=user["headers"],
+                                     json={"user_input": rng.choice(CHAT_TEXTS)})
+
+
+def checkin(client, base_url, user, rng, args):
+    # First check-in per habit and day bumps the streak; the rest hit the condition
+    habit_id = rng.choice(user["habit_ids"]) if user["habit_ids"] else "missing"
+    return "POST /habitflow/increment-streak", client.post(f"{base_url}/habitflow/increment-streak",
+                                                           headers=user["headers"], json={"habit_id": habit_id})
+
+
+def tweets(client, base_url, user, rng, args):
+    handle = f"loadtest_handle_{rng.randrange(args.handles)}"
+    return "GET /analyze_tweets/{username}", client.get(f"{base_url}/analyze_tweets/{handle}")
+
+
+def login(client, base_url, user, rng, args):
+    return "POST /login", client.post(f"{base_url}/login", json={"email": user["email"], "password": PASSWORD})
+
+
+SCENARIOS = {"journal": journal, "chat": chat, "checkin": checkin, "tweets": tweets, "login": login}
+
+
+def _failed(response):
+    if response.status_code >= 400:
+        return True
+    # Some routes report failures as {"error": ...} with a 200
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "error" in body
+
+
+async def drive(client, base_url, users, mix, args):
+    names, weights = list(mix), list(mix.values())
+    samples = {}   # endpoint -> [ms]
+    errors = {}    # endpoint -> count
+    statuses = {}  # endpoint -> {status: count}
+    started = time.perf_counter()
+    record_from = started + args.warmup
+    deadline = record_from + args.duration
+
+    async def worker(worker_id):
+        rng = random.Random(args.seed * 100_003 + worker_id)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            scenario = rng.choices(names, weights)[0]
+            user = users[rng.randrange(len(users))]
+            endpoint, request = SCENARIOS[scenario](client, base_url, user, rng, args)
+            t0 = time.perf_counter()
+            try:
+                response = await request
+                failed, status = _failed(response), str(response.status_code)
+            except Exception as e:
+                failed, status = True, type(e).__name__
+            elapsed = (time.perf_counter() - t0) * 1000
+            if t0 < record_from:
+                continue
+            samples.setdefault(endpoint, []).append(elapsed)
+            errors[endpoint] = errors.get(endpoint, 0) + failed
+            statuses.setdefault(endpoint, {})
+            statuses[endpoint][status] = statuses[endpoint].get(status, 0) + 1
+
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    measured = time.perf_counter() - record_from
+    return samples, errors, statuses, measured
+
+
+# /metrics: per-route dependency time (util/metrics.py), read before and after the run
+DEPENDENCY_LINE = re.compile(r'^moodmate_http_request_dependency_seconds_(sum|count)\{route="([^"]*)",dependency="([^"]*)"\} (\S+)$')
+
+
+async def dependency_totals(client, base_url):
+    totals = {}
+    response = await client.get(f"{base_url}/metrics")
+    for line in response.text.splitlines():
+        match = DEPENDENCY_LINE.match(line)
+        if match:
+            kind, route, dependency, value = match.groups()
+            totals.setdefault((route, dependency), {"sum": 0.0, "count": 0.0})[kind] = float(value)
+    return totals
+
+
+def dependency_breakdown(before, after):
+    """{route: {dependency: mean ms per request that used it}} for the measured window."""
+    breakdown = {}
+    for (route, dependency), totals in sorted(after.items()):
+        old = before.get((route, dependency), {"sum": 0.0, "count": 0.0})
+        count = totals["count"] - old["count"]
+        if count > 0:
+            breakdown.setdefault(route, {})[dependency] = round((totals["sum"] - old["sum"]) / count * 1000, 2)
+    return breakdown
+
+
+def summarize(samples, errors, statuses, seconds):
+    endpoints = {}
+    everything = []
+    for endpoint in sorted(samples):
+        values = sorted(samples[endpoint])
+        everything.extend(values)
+        endpoints[endpoint] = {
+            "count": len(values),
+            "errors": errors.get(endpoint, 0),
+            "rps": round(len(values) / seconds, 2),
+            "mean_ms": round(sum(values) / len(values), 2),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": round(values[-1], 2),
+            "statuses": statuses.get(endpoint, {}),
+        }
+    everything.sort()
+    overall = {
+        "count": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / seconds, 2) if seconds else 0,
+        "p50_ms": percentile(everything, 50),
+        "p95_ms": percentile(everything, 95),
+        "p99_ms": percentile(everything, 99),
+    }
+    return overall, endpoints
+
+
+# 📊 Compare with a previous report ##########################################
+def compare(report, baseline, max_regression):
+    """Percent change per endpoint; positive latency change = slower."""
+    def change(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    rows, regressions = {}, []
+    for endpoint, stats in {"overall": report["overall"], **report["endpoints"]}.items():
+        old = baseline["overall"] if endpoint == "overall" else baseline.get("endpoints", {}).get(endpoint)
+        if not old:
+            continue
+        row = {key: change(stats.get(key), old.get(key)) for key in ("rps", "p50_ms", "p95_ms", "p99_ms")}
+        rows[endpoint] = row
+        if max_regression is not None and row["p95_ms"] is not None and row["p95_ms"] > max_regression:
+            regressions.append(endpoint)
+    return {
+        "baseline_commit": baseline.get("meta", {}).get("commit"),
+        "change_pct": rows,
+        "p95_regressions": regressions,
+    }
+
+
+async def run(args, mix):
+    import httpx
+
+    llm_server, llm_state = llm_stub.serve(free_port(), args.llm_latency_ms, args.llm_jitter_ms)
+    # Rate limits are not what this measures: give the Twitter stub an effectively unlimited budget
+    twitter_server, twitter_state = twitter_stub.serve(free_port(), limit=10 ** 9, window=60,
+                                                       latency=args.twitter_latency_ms / 1000)
+    llm_url = f"http://127.0.0.1:{llm_server.server_address[1]}"
+    twitter_url = f"http://127.0.0.1:{twitter_server.server_address[1]}/2"
+
+    with tempfile.TemporaryDirectory(prefix="moodmate-load-") as workdir:
+        proc, base_url, log = start_server(args, workdir, llm_url, twitter_url)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+                await wait_ready(client, base_url, proc)
+                users = await seed(client, base_url, args.users, args.habits)
+                print(f"🌱 Seeded {len(users)} users x {args.habits} habits; running {args.warmup:.0f}s warmup "
+                      f"+ {args.duration:.0f}s at concurrency {args.concurrency}", file=sys.stderr)
+                before = await dependency_totals(client, base_url)
+                samples, errors, statuses, seconds = await drive(client, base_url, users, mix, args)
+                # With --workers > 1 this is whichever worker answers the scrape
+                dependencies = dependency_breakdown(before, await dependency_totals(client, base_url))
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            log.close()
+            if args.keep_log:
+                with open(os.path.join(workdir, "server.log")) as f, open(args.keep_log, "w") as out:
+                    out.write(f.read())
+            llm_server.shutdown()
+            twitter_server.shutdown()
+
+    overall, endpoints = summarize(samples, errors, statuses, seconds)
+    return {
+        "meta": {
+            **git_commit(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": mix,
+            "users": args.users,
+            "habits_per_user": args.habits,
+            "handles": args.handles,
+            "workers": args.workers,
+            "seed": args.seed,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "twitter_latency_ms": args.twitter_latency_ms,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "storage_backend": "sqlite",
+        },
+        "overall": overall,
+        "endpoints": endpoints,
+        "dependency_ms": dependencies,
+        "stub_calls": {**llm_state.requests, "twitter": twitter_state.requests},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test with stubbed LLM / RAG / Twitter")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before that")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--habits", type=int, default=3, help="habits seeded per user")
+    parser.add_argument("--handles", type=int, default=10, help="distinct Twitter handles checked")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--twitter-latency-ms", type=float, default=50.0)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="BCRYPT_ROUNDS for the server (default: app default)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request client timeout in seconds")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="previous report to diff against")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="with --compare: exit 1 if any p95 got slower by more than this percent")
+    parser.add_argument("--keep-log", help="copy the server log here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args, parse_mix(args.mix)))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f), args.max_regression)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if report.get("comparison", {}).get("p95_regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# twitter_stub.py
+#
+# Minimal local stand-in for the Twitter v2 endpoints used by util/twitter_client.py.
+#   python -m backend.benchmarks.twitter_stub --port 8765 --limit 15 --window 60
+#   TWITTER_API_BASE=http://127.0.0.1:8765/2 uvicorn backend.main:app
+# Sends real x-rate-limit-* headers and answers 429 once an endpoint's budget is spent.
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SAMPLE_TEXTS = [
+    "Had a great walk in the park today",
+    "Feeling a bit overwhelmed with exams",
+    "Coffee and coding, perfect morning",
+    "I feel so hopeless lately, nothing helps",
+    "Weekend plans with friends!",
+]
+
+
+def user_id_for(username: str) -> str:
+    return str(10_000_000 + zlib.crc32(username.lower().encode()) % 90_000_000)
+
+
+class RateWindow:
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.reset_at = time.time() + window
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.used = 0
+                self.reset_at = now + self.window
+            allowed = self.used < self.limit
+            if allowed:
+                self.used += 1
+            return allowed, self.limit, self.limit - self.used, int(self.reset_at)
+
+
+class StubState:
+    def __init__(self, limit: int, window: float, latency: float, tweets_per_user: int):
+        self.latency = latency
+        self.tweets_per_user = tweets_per_user
+        self.windows = {
+            "users/by": RateWindow(limit, window),
+            "users/:id/tweets": RateWindow(limit, window),
+            "tweets/search/recent": RateWindow(limit, window),
+        }
+        self.requests = 0
+        self.rejected = 0
+
+    # Tweet ids grow with time so since_id behaves like the real API
+    def tweets_for(self, user_id: str, max_results: int, since_id: str = None):
+        now = datetime.utcnow()
+        base = int(now.timestamp()) // 60 * 1000
+        tweets = []
+        for i in range(self.tweets_per_user):
+            tweet_id = str(base - i * 1000 + int(user_id) % 1000)
+            if since_id and int(tweet_id) <= int(since_id):
+                continue
+            tweets.append({
+                "id": tweet_id,
+                "text": SAMPLE_TEXTS[(int(user_id) + i) % len(SAMPLE_TEXTS)],
+                "created_at": (now - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            })
+        return tweets[:max_results]
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, window):
+            _, limit, remaining, reset = window
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("x-rate-limit-limit", str(limit))
+            self.send_header("x-rate-limit-remaining", str(max(remaining, 0)))
+            self.send_header("x-rate-limit-reset", str(reset))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = [p for p in url.path.split("/") if p]
+            state.requests += 1
+            if state.latency:
+                time.sleep(state.latency)
+
+            if parts[-2:] == ["users", "by"]:
+                endpoint = "users/by"
+            elif len(parts) >= 3 and parts[-1] == "tweets" and parts[-3] == "users":
+                endpoint = "users/:id/tweets"
+            elif parts[-3:] == ["tweets", "search", "recent"]:
+                endpoint = "tweets/search/recent"
+            else:
+                self.send_error(404)
+                return
+
+            window = state.windows[endpoint].take()
+            if not window[0]:
+                state.rejected += 1
+                self._send(429, {"title": "Too Many Requests"}, window)
+                return
+
+            if endpoint == "users/by":
+                names = query.get("usernames", [""])[0].split(",")
+                data = [{"id": user_id_for(n), "username": n, "name": n} for n in names if n]
+                self._send(200, {"data": data}, window)
+            else:
+                max_results = int(query.get("max_results", ["10"])[0])
+                since_id = query.get("since_id", [None])[0]
+                if endpoint == "tweets/search/recent":
+                    # only "from:<handle>" queries are supported
+                    user_id = user_id_for(query.get("query", [""])[0].split("from:", 1)[-1])
+                else:
+                    user_id = parts[-2]
+                tweets = state.tweets_for(user_id, max_results, since_id)
+                body = {"data": tweets, "meta": {"result_count": len(tweets)}} if tweets else {"meta": {"result_count": 0}}
+                self._send(200, body, window)
+
+    return Handler
+
+
+def serve(port: int = 8765, limit: int = 15, window: float = 15 * 60, latency: float = 0.0, tweets_per_user: int = 5):
+    """Start the stub in a background thread. Returns (server, state)."""
+    state = StubState(limit, window, latency, tweets_per_user)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Twitter v2 stub with rate limits")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--limit", type=int, default=15, help="requests per window per endpoint")
+    parser.add_argument("--window", type=float, default=15 * 60, help="window length in seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="added seconds per request")
+    args = parser.parse_args()
+
+    server, _ = serve(args.port, args.limit, args.window, args.latency)
+    print(f"🐦 Twitter stub on http://127.0.0.1:{args.port}/2 ({args.limit} req / {args.window:.0f}s per endpoint)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
-import boto3
 from datetime import datetime, timedelta
 from collections import Counter
 import re
+from boto3.dynamodb.conditions import Key, Attr
+from backend.storage import repository
 
-dynamodb = boto3.resource('dynamodb')
-chat_table = dynamodb.Table('ChatMemory')
-user_memory_table = dynamodb.Table('UserMemory')
+chat_repo = repository('ChatMemory')
+user_memory_repo = repository('UserMemory')
 
 STRESS_KEYWORDS = [
     "tired", "burnout", "exhausted", "anxious", "panic",
@@ -14,12 +14,15 @@ STRESS_KEYWORDS = [
 
 def fetch_recent_chats(user_id, days=7):
     start = datetime.utcnow() - timedelta(days=days)
-    response = chat_table.scan()
+    # Key condition narrows to the right days; the exact cutoff is checked below
+    items = chat_repo.query_all(
+        user_id,
+        range_condition=Key("timestamp").gte(start.strftime("%Y-%m-%d")),
+        filter=Attr("role").eq("user")
+    )
     return [
-        item for item in response.get("Items", [])
-        if item.get("user_id") == user_id
-        and item.get("role") == "user"
-        and datetime.fromisoformat(item["timestamp"].replace("Z", "+00:00")) >= start
+        item for item in items
+        if datetime.fromisoformat(item["timestamp"].replace("Z", "+00:00")).replace(tzinfo=None) >= start
     ]
 
 def detect_stress_mentions(messages):
@@ -36,7 +39,7 @@ def detect_stress_mentions(messages):
 
 def store_chat_summary(user_id, keyword_summary, matched_messages):
     today = datetime.utcnow().strftime("%Y-%m-%d")
-    user_memory_table.put_item(Item={
+    user_memory_repo.put({
         "user_id": user_id,
         "date": today,
         "type": "chat_summary",
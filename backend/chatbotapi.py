@@ -1,19 +1,21 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import httpx, os, difflib
 from dotenv import load_dotenv
-import boto3
 from uuid import uuid4
 from datetime import datetime
 import json
+from backend.util import metrics
+from backend.util.chat_log_writer import chat_log_writer
+from backend.storage import repository
+from backend.util.session_tokens import current_user_id
 
 load_dotenv()
 router = APIRouter()
 
-# DynamoDB setup
-dynamodb = boto3.resource("dynamodb", region_name="ap-south-1")
-journal_table = dynamodb.Table("JournalEntries") # Table for journal entries
+# Storage setup
+journal_repo = repository("JournalEntries") # Table for journal entries
 
 # Base prompt
 BASE_PROMPT = """
@@ -23,18 +25,16 @@ Always encourage users to reach out to licensed therapists or mental health hotl
 Keep your responses warm, empathetic, and supportive. Keep the responses concise and to the point preferrably not more than 2 sentences.
 """
 
-# Save concise chat memory
-chat_memory = ""
+# Colab RAG server (benchmarks/llm_stub.py also answers /query)
+RAG_SERVER_URL = os.getenv("RAG_SERVER_URL", "https://braydon-unjudgable-lelia.ngrok-free.dev")
+
+# Concise chat memory per user
+chat_memories = {}
 
 # Get info from the last journal entry in the table
 def get_last_journal_info(user_id: str):
     try:
-        response = journal_table.query(
-            KeyConditionExpression = boto3.dynamodb.conditions.Key('user_id').eq(user_id),
-            ScanIndexForward = False,
-            Limit = 1
-        )
-        item = response.get('Items', [])[0]
+        item = journal_repo.query(user_id, descending=True, limit=1).items[0]
 
         current_mood = f"""
             Overall Risk Level: {item['overall_risk_level']},
@@ -54,10 +54,10 @@ class Message(BaseModel):
 
 # Main chat route
 @router.post("/chat")
-async def chat(message: Message, request: Request):
-    global chat_memory
+async def chat(message: Message, request: Request, user_id: str = Depends(current_user_id)):
     user_input = message.user_input.strip()
-    past_info = get_last_journal_info("demo_user")
+    chat_memory = chat_memories.get(user_id, "")
+    past_info = get_last_journal_info(user_id)
 
     print(f"🧠 User Input: {user_input} ")
     print(f"🧠 Chat Memory: {chat_memory}")
@@ -66,7 +66,7 @@ async def chat(message: Message, request: Request):
     # Note: The RAG server on Colab expects 'query' in the JSON body
     full_prompt = f"{BASE_PROMPT.strip()}\n\nPast Info: {past_info}\n\nUser: {user_input}\n\n Chat Memory:{chat_memory}"
     # Make sure NOT to include a trailing slash (e.g., NO "/" at the end)
-    COLAB_NGROK_URL = "https://braydon-unjudgable-lelia.ngrok-free.dev" 
+    COLAB_NGROK_URL = RAG_SERVER_URL
     
     # Remove trailing slash if accidentally added
     if COLAB_NGROK_URL.endswith("/"):
@@ -79,11 +79,12 @@ async def chat(message: Message, request: Request):
             
             print(f"🚀 Sending request to: {target_url}")
             
-            response = await client.post(
-                target_url, 
-                json={"past_info": past_info, "user_input": user_input, "chat_memory": chat_memory}, 
-                timeout=90.0  # Generous timeout for RAG + Generation
-            )
+            with metrics.span("rag", "POST", "/query"):
+                response = await client.post(
+                    target_url, 
+                    json={"past_info": past_info, "user_input": user_input, "chat_memory": chat_memory}, 
+                    timeout=90.0  # Generous timeout for RAG + Generation
+                )
 
             if response.status_code != 200:
                 print(f"❌ RAG Server Error ({response.status_code}):", response.text)
@@ -105,9 +106,17 @@ async def chat(message: Message, request: Request):
             # Update chat memory only when present and valid
             new_chat_memory = reply_obj.get("chat_memory")
             if isinstance(new_chat_memory, str) and new_chat_memory:
-                chat_memory = new_chat_memory
+                chat_memories[user_id] = new_chat_memory
 
             answer_text = reply_obj.get("response") or reply_obj.get("answer") or json.dumps(reply_obj)
+
+            # Buffered chat log (same writer as the Flask /chat)
+            chat_log_writer.write({
+                "timestamp": datetime.utcnow().isoformat(),
+                "user_id": user_id,
+                "message": user_input,
+                "reply": answer_text.strip()
+            })
             return {"response": answer_text.strip()}
 
     except Exception as e:
@@ -122,7 +131,6 @@ async def chat(message: Message, request: Request):
 # Endpoint to reset chat memory (for testing purposes)
 #########################################################
 @router.post("/reset-memory")
-async def reset_memory():
-    global chat_memory
-    chat_memory = ""
+async def reset_memory(user_id: str = Depends(current_user_id)):
+    chat_memories.pop(user_id, None)
     print("🧠 Chat memory reset.")
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = "sqlite:///./journal.db"  # local SQLite file
@@ -9,3 +10,21 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Local key-value store for the repository layer (backend/storage, STORAGE_BACKEND=sqlite).
+# WAL lets readers run alongside the single writer; transactions are issued explicitly
+# (BEGIN IMMEDIATE) by storage/sqlite.py, so the driver is left in autocommit mode.
+STORE_DATABASE_URL = os.getenv("STORE_DATABASE_URL", "sqlite:///./moodmate_store.db")
+
+store_engine = create_engine(
+    STORE_DATABASE_URL, connect_args={"check_same_thread": False, "isolation_level": None}
+)
+
+
+@event.listens_for(store_engine, "connect")
+def _configure_store_connection(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
@@ -1,34 +1,118 @@
 # Example using FastAPI
-from fastapi import APIRouter, Request
-from pydantic import BaseModel
-import boto3
+from fastapi import APIRouter, Depends, Request, HTTPException
+from pydantic import BaseModel, ValidationError, field_validator
 from datetime import datetime
 from decimal import Decimal
+from typing import List, Optional
+import math
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from backend.storage import repository
+from backend import insights
+from backend.util.session_tokens import session_user, resolve_user_id
 
 
 router = APIRouter()
 
 
 
-dynamodb = boto3.resource("dynamodb", region_name="ap-south-1")  # change region if needed
-table = dynamodb.Table("UserHealthData")  # make sure this exists
+health_repo = repository("UserHealthData")  # make sure this exists
 
+MAX_BATCH_RECORDS = 5000
+
+# user_id is ignored when the request carries a session token
 class HealthData(BaseModel):
-    user_id: str
+    user_id: Optional[str] = None
     date: str  # e.g., "2025-07-20"
     sleep: float
     hrv: float
 
+class HealthRecord(BaseModel):
+    date: str
+    sleep: float
+    hrv: float
+
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value):
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+
+    @field_validator("sleep")
+    @classmethod
+    def check_sleep(cls, value):
+        if not math.isfinite(value) or not 0 <= value <= 24:
+            raise ValueError("sleep must be between 0 and 24 hours")
+        return value
+
+    @field_validator("hrv")
+    @classmethod
+    def check_hrv(cls, value):
+        if not math.isfinite(value) or not 0 <= value <= 500:
+            raise ValueError("hrv must be between 0 and 500 ms")
+        return value
+
+class HealthDataBatch(BaseModel):
+    user_id: Optional[str] = None
+    records: List[dict]
+
+
+def _health_item(user_id: str, date: str, sleep: float, hrv: float):
+    return {
+        "user_id": user_id,
+        "date": date,
+        "sleep": Decimal(str(sleep)),  # 👈 convert to Decimal
+        "hrv": Decimal(str(hrv))       # 👈 convert to Decimal
+    }
+
+
+def _write_health_items(items):
+    health_repo.put_many(items)
+
+
 @router.post("/save-health-data")
-async def save_health_data(data: HealthData):
-    table.put_item(
-        Item={
-            "user_id": data.user_id,
-            "date": data.date,
-            "sleep": Decimal(str(data.sleep)),  # 👈 convert to Decimal
-            "hrv": Decimal(str(data.hrv))       # 👈 convert to Decimal
-        }
-    )
+async def save_health_data(data: HealthData, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, data.user_id)
+    await run_in_threadpool(health_repo.put, _health_item(user_id, data.date, data.sleep, data.hrv))
+    insights.invalidate(user_id)
     return {"message": "✅ Health data saved to DynamoDB!"}
 
+
+# 📦 Bulk sync: validate + dedupe by (user_id, date), then one batch_writer off the event loop
+@router.post("/save-health-data/batch")
+async def save_health_data_batch(data: HealthDataBatch, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, data.user_id)
+    if len(data.records) > MAX_BATCH_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_RECORDS} records per batch")
+
+    statuses = [None] * len(data.records)
+    latest_by_date = {}   # date -> index of the record that wins (last one in the payload)
+    for i, raw in enumerate(data.records):
+        try:
+            record = HealthRecord.model_validate(raw)
+        except ValidationError as e:
+            statuses[i] = {"index": i, "date": raw.get("date") if isinstance(raw, dict) else None,
+                           "status": "invalid", "error": e.errors()[0]["msg"]}
+            continue
+        if record.date in latest_by_date:
+            prev = latest_by_date[record.date][0]
+            statuses[prev] = {"index": prev, "date": record.date, "status": "duplicate"}
+        latest_by_date[record.date] = (i, record)
+
+    items = [_health_item(user_id, r.date, r.sleep, r.hrv) for _, r in latest_by_date.values()]
+    try:
+        await run_in_threadpool(_write_health_items, items)
+        write_status = {"status": "saved"}
+        insights.invalidate(user_id)
+    except Exception as e:
+        print("❌ Health batch write error:", str(e))
+        write_status = {"status": "error", "error": str(e)}
+
+    for date, (i, _) in latest_by_date.items():
+        statuses[i] = {"index": i, "date": date, **write_status}
+
+    return {
+        "saved": len(items) if write_status["status"] == "saved" else 0,
+        "duplicates": sum(1 for s in statuses if s["status"] == "duplicate"),
+        "invalid": sum(1 for s in statuses if s["status"] == "invalid"),
+        "results": statuses
+    }
@@ -1,23 +1,27 @@
-import boto3
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, field_validator
 from dotenv import load_dotenv
 import os
 import requests
 from fastapi.middleware.cors import CORSMiddleware
-from ibm_watsonx_ai.credentials import Credentials
-from ibm_watsonx_ai import APIClient
-from ibm_watsonx_ai.foundation_models import ModelInference
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr
 from uuid import uuid4
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from uuid import UUID
 import json
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from backend.util import services
+from backend.storage import repository, ConditionFailed, UnitOfWork
+from backend.util.pagination import encode_cursor, decode_cursor
+from backend.util.suggestion_cache import SuggestionCache, normalize_habit
+from backend.util.session_tokens import session_user, resolve_user_id
 
 
+# user_id is ignored when the request carries a session token
 class HabitProgressInput(BaseModel):
-    user_id: str
+    user_id: Optional[str] = None
     habit_id: str
     habit_name: str
     replacement_habit: str
@@ -25,75 +29,174 @@ class HabitProgressInput(BaseModel):
     level: int
     last_completed: str  # "YYYY-MM-DD"
 
+    @field_validator("streak", "level")
+    @classmethod
+    def check_count(cls, value):
+        if value < 0:
+            raise ValueError("must not be negative")
+        return value
+
+    # Stored as an ISO date: the rollover index compares these strings
+    @field_validator("last_completed")
+    @classmethod
+    def check_last_completed(cls, value):
+        day = datetime.fromisoformat(value.strip()).date()
+        if day > date.today() + timedelta(days=1):  # a day of slack for client time zones
+            raise ValueError("last_completed is in the future")
+        return day.isoformat()
+
 class StreakUpdateInput(BaseModel):
-    user_id: str
+    user_id: Optional[str] = None
     habit_id: str
 
+class CheckInBatchInput(BaseModel):
+    user_id: Optional[str] = None
+    habit_ids: List[str]
+
 
 router = APIRouter()
 
-dynamodb = boto3.resource("dynamodb", region_name="ap-south-1")  # change region if needed
-table = dynamodb.Table("HabitFlowProgress")  # make sure this exists
+habit_repo = repository("HabitFlowProgress")  # make sure this exists
+# streak_due mirrors last_completed while a streak is alive; the nightly rollover
+# (habit_rollover.py) finds lapsed habits through the sparse streak_due-index GSI
+summary_repo = repository("HabitFlowSummary")  # user_id (HASH)
+checkpoint_repo = repository("JobCheckpoints")  # job (HASH)
+ROLLOVER_JOB = "habit_rollover"
+
+MAX_BATCH_CHECK_INS = 100
+LEVEL_EVERY = 5          # streak days per level
+CHECK_IN_ATTEMPTS = 3
+MAX_PROGRESS_PAGE = 100
+check_in_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="habit-check-in")
 
 
 load_dotenv()
 
 
 
-API_KEY = os.getenv("WATSONX_API_KEY")
-credentials = Credentials(
-    url="https://eu-de.ml.cloud.ibm.com",  # or regional Watsonx URL
-    api_key=os.getenv("WATSONX_API_KEY")
-)
-client = APIClient(credentials)
+mistral_model = services.lazy_model("mistralai/mistral-medium-2505", max_new_tokens=100)  # ⚠️ A supported model with long-term viability
 
-mistral_model = ModelInference(
-    model_id="mistralai/mistral-medium-2505",  # ⚠️ A supported model with long-term viability
-    credentials=credentials,
-    project_id="1cb8c38f-d650-41fe-9836-86659006c090",
-    params={"decoding_method": "greedy", "max_new_tokens": 100}
+# Normalized-key cache in front of the LLM; warmed from the app lifespan
+suggestion_cache = SuggestionCache(
+    maxsize=int(os.getenv("HABIT_SUGGESTION_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("HABIT_SUGGESTION_TTL_HOURS", "168")) * 3600,
+    refresh_after=float(os.getenv("HABIT_SUGGESTION_REFRESH_HOURS", "24")) * 3600,
 )
 
 class HabitInput(BaseModel):
     bad_habit: str
 
+def generate_replacements(bad_habit: str):
+    prompt = (
+    f"Suggest 3 healthy replacement habits for the bad habit: \"{bad_habit}\".\n"
+    "Make each suggestion concise (max 5 words).\n"
+    "Output the response as a JSON object with a single key 'suggestions' which contains a list of 3 strings."
+)
+
+    response = mistral_model.generate(prompt)
+    print(response)
+    raw = response["results"][0]["generated_text"]
+
+    start_index = raw.find('{')
+    end_index = raw.rfind('}')
+
+    if start_index != -1 and end_index != -1:
+    # Extract the pure JSON substring
+        clean_json_text = raw[start_index : end_index + 1]
+    else:
+    # If brackets aren't found, try to strip markdown fences if they exist
+        clean_json_text = raw.replace("```json", "").replace("```", "").strip()
+
+    data = json.loads(clean_json_text)
+
+    suggestions = data.get("suggestions", [])[:3]
+    if not suggestions:
+        raise ValueError("LLM returned no suggestions")
+    return suggestions
+
+
 @router.post("/suggest_replacements")
 def suggest_replacements(data: HabitInput):
+    key = normalize_habit(data.bad_habit)
+    cached = suggestion_cache.get(key, generate_replacements)
+    if cached is not None:
+        return {"suggestions": cached}
+
     try:
-        prompt = (
-        f"Suggest 3 healthy replacement habits for the bad habit: \"{data.bad_habit}\".\n"
-        "Make each suggestion concise (max 5 words).\n"
-        "Output the response as a JSON object with a single key 'suggestions' which contains a list of 3 strings."
-    )
+        suggestions = generate_replacements(data.bad_habit)
+        suggestion_cache.put(key, suggestions)
+        return {"suggestions": suggestions}
+    except Exception as e:
+        print("🧨 Granite LLM Error:", str(e))
+        return {"suggestions": ["Take a short walk", "Drink water", "Stretch mindfully"]}
 
-        response = mistral_model.generate(prompt)
-        print(response)
-        raw = response["results"][0]["generated_text"]
+# --- Summary Schema (HabitFlowSummary, one item per user) ---
+# {
+#   "user_id": "demo_user",
+#   "active_habits": 4,
+#   "total_streak": 23,       # sum of current streak_days
+#   "longest_streak": 12,     # best streak ever reached
+#   "level_0": 1, "level_2": 3
+# }
+# Kept current with ADD deltas from save-progress / check-ins instead of re-reading habits.
+# With a unit of work the deltas are queued and merged into one update per user.
+
+def update_habit_summary(user_id: str, active: int = 0, streak: int = 0, level_deltas: dict = None, streak_reached: int = None, uow: UnitOfWork = None):
+    adds = {
+        attr: Decimal(str(delta))
+        for attr, delta in [("active_habits", active), ("total_streak", streak)] +
+                           [(f"level_{lvl}", d) for lvl, d in (level_deltas or {}).items()]
+        if delta
+    }
+    if adds and uow is not None:
+        uow.update(summary_repo.name, {"user_id": user_id}, add=adds)
+    elif adds:
+        summary_repo.update({"user_id": user_id}, add=adds, return_values="NONE")
+
+    if streak_reached:
+        longest = Decimal(str(streak_reached))
+        try:
+            summary_repo.update(
+                {"user_id": user_id},
+                set={"longest_streak": longest},
+                condition=Attr("longest_streak").not_exists() | Attr("longest_streak").lt(longest),
+                return_values="NONE"
+            )
+        except ConditionFailed:
+            pass
 
-        start_index = raw.find('{')
-        end_index = raw.rfind('}')
 
-        if start_index != -1 and end_index != -1:
-        # Extract the pure JSON substring
-            clean_json_text = raw[start_index : end_index + 1]
-        else:
-        # If brackets aren't found, try to strip markdown fences if they exist
-            clean_json_text = raw.replace("```json", "").replace("```", "").strip()
-        
-        data = json.loads(clean_json_text)
+def days_to_level(streak) -> Decimal:
+    return Decimal(LEVEL_EVERY - int(streak) % LEVEL_EVERY)
 
 
-        suggestions = data.get("suggestions", [])
-        return {"suggestions": suggestions[:3]}
+def _safe_update_summary(user_id: str, **deltas):
+    try:
+        update_habit_summary(user_id, **deltas)
     except Exception as e:
-        print("🧨 Granite LLM Error:", str(e))
-        return {"suggestions": ["Take a short walk", "Drink water", "Stretch mindfully"]}
+        print("⚠️ Habit summary update failed:", str(e))
+
+
+# 📅 streak_due for a saved habit. The rollover only visits due dates after its checkpoint,
+# so an older last_completed is moved to the first day it has not processed yet;
+# otherwise that streak would never lapse.
+def first_streak_due(last_completed: str) -> str:
+    try:
+        processed = checkpoint_repo.get({"job": ROLLOVER_JOB}) or {}
+    except Exception as e:
+        print("⚠️ Could not read the rollover checkpoint:", str(e))
+        processed = {}
+    if processed.get("last_date") and last_completed <= processed["last_date"]:
+        return (date.fromisoformat(processed["last_date"]) + timedelta(days=1)).isoformat()
+    return last_completed
+
 
 @router.post("/habitflow/save-progress")
-def save_progress(data: HabitProgressInput):
+def save_progress(data: HabitProgressInput, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, data.user_id)
     habit_id = str(uuid4())
-    table.put_item(Item={
-        "user_id": data.user_id,
+    habit_repo.put({
+        "user_id": user_id,
         "habit_id": habit_id,
         "habit_name": data.habit_name,
         "replacement_habit": data.replacement_habit,
@@ -101,50 +204,151 @@ def save_progress(data: HabitProgressInput):
         "level": Decimal(str(data.level)),
         "started_on": datetime.now().date().isoformat(),
         "last_completed": data.last_completed,
-        "is_active": True
+        "is_active": True,
+        "days_to_level": days_to_level(data.streak),
+        **({"streak_due": first_streak_due(data.last_completed)} if data.streak > 0 else {})
     })
+    _safe_update_summary(user_id, active=1, streak=data.streak, level_deltas={data.level: 1}, streak_reached=data.streak)
     return {"message": "✅ Habit progress saved separately!"}
 
-@router.get("/habitflow/get-progress")
-def get_habit_progress(user_id: str = None):
+
+@router.get("/habitflow/summary")
+def get_habit_summary(user_id: Optional[str] = None, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, user_id)
     try:
-        if user_id:
-            response = table.query(
-                KeyConditionExpression=Key("user_id").eq(user_id)
-            )
-        else:
-            response = table.scan()
+        item = summary_repo.get({"user_id": user_id}) or {}
+    except Exception as e:
+        return {"error": str(e)}
+    return {
+        "user_id": user_id,
+        "active_habits": int(item.get("active_habits", 0)),
+        "total_streak": int(item.get("total_streak", 0)),
+        "longest_streak": int(item.get("longest_streak", 0)),
+        "level_distribution": {
+            k[len("level_"):]: int(v) for k, v in sorted(item.items()) if k.startswith("level_") and v
+        }
+    }
 
-        items = response.get("Items", [])
-        return {"habits": items}
+@router.get("/habitflow/suggestion-cache/stats")
+def suggestion_cache_stats():
+    return suggestion_cache.stats()
+
+@router.get("/habitflow/get-progress")
+def get_habit_progress(user_id: Optional[str] = None, limit: int = 50, cursor: str = None, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, user_id)
+    try:
+        page = habit_repo.query(
+            user_id,
+            limit=max(1, min(limit, MAX_PROGRESS_PAGE)),
+            start_key=decode_cursor(cursor) if cursor else None
+        )
+        return {"habits": page.items, "next_cursor": encode_cursor(page.last_key)}
     except Exception as e:
         return {"error": str(e), "habits": []}
     
 
+# ✅ A check-in is one conditional update: the streak is bumped in place with an ADD
+# (missing counts as 0), and the condition rejects a second check-in on the same
+# day (and habits that don't exist). days_to_level counts down to the next level
+# (every LEVEL_EVERY streak days). On an ordinary day it is just decremented; when it
+# would reach 0 the same single write raises the level and resets the countdown,
+# guarded by the streak it read, so a level-up can never be lost between two writes.
+def check_in_habit(user_id: str, habit_id: str, today: str = None, summary_uow: UnitOfWork = None):
+    today = today or datetime.now().date().isoformat()
+    key = {"user_id": user_id, "habit_id": habit_id}
+    not_today = Attr("last_completed").not_exists() | Attr("last_completed").ne(today)
+    leveled_up = False
+
+    for _ in range(CHECK_IN_ATTEMPTS):
+        try:
+            item = habit_repo.update(
+                key,
+                add={"streak_days": Decimal("1"), "days_to_level": Decimal("-1")},
+                set={"last_completed": today, "streak_due": today},
+                condition=Attr("habit_id").exists() & not_today & Attr("days_to_level").gt(Decimal("1"))
+            )
+            break
+        except ConditionFailed as e:
+            current = e.item
+        if not current:
+            return {"habit_id": habit_id, "status": "not_found"}
+        if current.get("last_completed") == today:
+            return {"habit_id": habit_id, "status": "already_checked_in"}
+
+        # Level-up day, or a habit saved before the countdown existed
+        old_streak = current.get("streak_days", Decimal("0"))
+        remaining = current.get("days_to_level", days_to_level(old_streak))
+        adds = {"streak_days": Decimal("1")}
+        if remaining <= 1:
+            adds["level"] = Decimal("1")
+        try:
+            item = habit_repo.update(
+                key,
+                add=adds,
+                set={"last_completed": today, "streak_due": today,
+                     "days_to_level": Decimal(LEVEL_EVERY) if remaining <= 1 else remaining - 1},
+                condition=Attr("streak_days").eq(old_streak) & not_today
+            )
+            leveled_up = remaining <= 1
+            break
+        except ConditionFailed:
+            continue  # a concurrent check-in moved the habit: re-read through the fast path
+    else:
+        raise RuntimeError(f"Check-in for {habit_id} kept conflicting")
+
+    new_streak = item.get("streak_days", Decimal("0"))
+    new_level = item.get("level", Decimal("0"))
+    _safe_update_summary(
+        user_id,
+        streak=1,
+        level_deltas={int(new_level) - 1: -1, int(new_level): 1} if leveled_up else None,
+        streak_reached=None if summary_uow else int(new_streak),  # batch callers record the max once
+        uow=summary_uow
+    )
+    return {"habit_id": habit_id, "status": "updated", "streak_days": new_streak, "level": new_level}
+
+
 @router.post("/habitflow/increment-streak")
-def increment_streak(data: StreakUpdateInput):
+def increment_streak(data: StreakUpdateInput, session_user_id: Optional[str] = Depends(session_user)):
     try:
-        response = table.get_item(Key={"user_id": data.user_id, "habit_id": data.habit_id})
-        item = response.get("Item")
-        if not item:
+        result = check_in_habit(resolve_user_id(session_user_id, data.user_id), data.habit_id)
+        if result["status"] == "not_found":
             return {"error": "Habit not found"}
-
-        new_streak = item.get("streak_days", 0) + 1
-        new_level = item.get("level", 0)
-        if new_streak % 5 == 0:
-            new_level += 1
-
-        table.update_item(
-            Key={"user_id": data.user_id, "habit_id": data.habit_id},
-            UpdateExpression="SET streak_days = :sd, last_completed = :lc, #lvl = :lv",
-            ExpressionAttributeNames={"#lvl": "level"},
-            ExpressionAttributeValues={
-                ":sd": Decimal(str(new_streak)),
-                ":lc": datetime.now().date().isoformat(),
-                ":lv": Decimal(str(new_level))
-            }
-        )
+        if result["status"] == "already_checked_in":
+            return {"message": "✅ Already checked in today!"}
         return {"message": "✅ Day added, streak updated!"}
     except Exception as e:
         print("❌ Increment streak error:", str(e))
         return {"error": str(e)}
+
+
+# 📦 Check in many habits with one request; updates run in parallel on a small pool and
+# their summary deltas are merged into a single summary update at the end
+@router.post("/habitflow/check-in-batch")
+def check_in_batch(data: CheckInBatchInput, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, data.user_id)
+    habit_ids = list(dict.fromkeys(data.habit_ids))
+    if len(habit_ids) > MAX_BATCH_CHECK_INS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_CHECK_INS} habits per batch")
+    today = datetime.now().date().isoformat()
+    summary_uow = UnitOfWork()
+
+    def run(habit_id):
+        try:
+            return check_in_habit(user_id, habit_id, today, summary_uow)
+        except Exception as e:
+            print("❌ Check-in error:", str(e))
+            return {"habit_id": habit_id, "status": "error", "error": str(e)}
+
+    results = list(check_in_pool.map(run, habit_ids))
+    longest = max((int(r["streak_days"]) for r in results if r["status"] == "updated"), default=0)
+    try:
+        summary_uow.flush()
+    except Exception as e:
+        print("⚠️ Habit summary update failed:", str(e))
+    if longest:
+        _safe_update_summary(user_id, streak_reached=longest)
+    return {
+        "results": results,
+        "updated": sum(1 for r in results if r["status"] == "updated")
+    }
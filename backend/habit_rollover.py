@@ -0,0 +1,146 @@
+# habit_rollover.py
+#
+# Nightly streak rollover. A habit whose streak_due (= last_completed) is older than
+# yesterday missed a day: its streak is reset (or halved with HABIT_ROLLOVER_MODE=decay)
+# and streak_due is removed, which drops it out of the sparse index until the next
+# check-in. Only lapsed habits are ever read.
+#
+#   python -m backend.habit_rollover            # process everything up to today
+#   python -m backend.habit_rollover 2025-07-21 # pretend "today" is 2025-07-21
+
+import os
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr
+from backend.storage import repository, ConditionFailed
+from backend.habit import update_habit_summary, days_to_level, ROLLOVER_JOB
+
+HABIT_TABLE = "HabitFlowProgress"
+STREAK_DUE_INDEX = "streak_due-index"   # GSI: streak_due (HASH), projects streak_days
+JOB_NAME = ROLLOVER_JOB  # habit.py reads the checkpoint too
+ROLLOVER_MODE = os.getenv("HABIT_ROLLOVER_MODE", "reset")
+MAX_CATCHUP_DAYS = int(os.getenv("HABIT_ROLLOVER_MAX_CATCHUP_DAYS", "30"))
+TRANSACT_CHUNK = 25
+
+habit_repo = repository(HABIT_TABLE)
+checkpoint_repo = repository("JobCheckpoints")  # job (HASH)
+
+
+def rolled_streak(streak: Decimal) -> Decimal:
+    if ROLLOVER_MODE == "decay":
+        return Decimal(int(streak) // 2)
+    return Decimal("0")
+
+
+# --- Checkpoint: {"job": "habit_rollover", "last_date": "...", "last_key": {...}} ---
+def load_checkpoint():
+    return checkpoint_repo.get({"job": JOB_NAME}) or {}
+
+
+def save_checkpoint(last_date: str, last_key=None):
+    item = {"job": JOB_NAME, "last_date": last_date, "updated_at": datetime.utcnow().isoformat()}
+    if last_key:
+        item["last_key"] = last_key
+    checkpoint_repo.put(item)
+
+
+def _update_for(habit):
+    old = habit.get("streak_days", Decimal("0"))
+    new = rolled_streak(old)
+    return {
+        "update": {"user_id": habit["user_id"], "habit_id": habit["habit_id"]},
+        "set": {"streak_days": new, "days_to_level": days_to_level(new)},
+        "remove": ["streak_due"],
+        # Fails if the habit was checked in (streak_due moved) or already rolled over
+        "condition": Attr("streak_due").eq(habit["streak_due"]) & Attr("streak_days").eq(old),
+    }
+
+
+# 📦 Conditional updates, 25 per transaction; a cancelled chunk is retried one by one
+def apply_rollover(habits):
+    applied = []
+    for i in range(0, len(habits), TRANSACT_CHUNK):
+        chunk = habits[i:i + TRANSACT_CHUNK]
+        try:
+            habit_repo.transact([_update_for(h) for h in chunk])
+            applied.extend(chunk)
+        except ConditionFailed:
+            for habit in chunk:
+                update = _update_for(habit)
+                try:
+                    habit_repo.update(
+                        update["update"],
+                        set=update["set"],
+                        remove=update["remove"],
+                        condition=update["condition"],
+                        return_values="NONE"
+                    )
+                    applied.append(habit)
+                except ConditionFailed:
+                    pass
+    return applied
+
+
+def _record_summaries(applied):
+    lost = defaultdict(int)
+    for habit in applied:
+        old = habit.get("streak_days", Decimal("0"))
+        lost[habit["user_id"]] += int(old - rolled_streak(old))
+    for user_id, delta in lost.items():
+        if delta:
+            try:
+                update_habit_summary(user_id, streak=-delta)
+            except Exception as e:
+                print(f"⚠️ Summary update failed for {user_id}:", e)
+
+
+def rollover_date(due_date: str, start_key=None):
+    """Roll over every habit whose streak_due is due_date. Resumes from start_key."""
+    total = 0
+    while True:
+        page = habit_repo.query(due_date, index=STREAK_DUE_INDEX, start_key=start_key)
+        applied = apply_rollover(page.items)
+        _record_summaries(applied)
+        total += len(applied)
+
+        # Page-level checkpoint: a crash re-reads at most one page, and the
+        # conditions make re-applying it a no-op
+        save_checkpoint(_previous_day(due_date), page.last_key)
+        if not page.last_key:
+            break
+        start_key = page.last_key
+    return total
+
+
+def _previous_day(day: str) -> str:
+    return (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+
+
+def run_rollover(today: date = None):
+    today = today or datetime.now().date()
+    # A habit last completed before yesterday missed yesterday
+    newest_due = today - timedelta(days=2)
+
+    checkpoint = load_checkpoint()
+    if checkpoint.get("last_date"):
+        day = date.fromisoformat(checkpoint["last_date"]) + timedelta(days=1)
+    else:
+        day = newest_due - timedelta(days=MAX_CATCHUP_DAYS)
+    start_key = checkpoint.get("last_key")
+
+    summary = {}
+    while day <= newest_due:
+        due = day.isoformat()
+        summary[due] = rollover_date(due, start_key)
+        start_key = None
+        save_checkpoint(due)
+        day += timedelta(days=1)
+
+    print(f"🌙 Habit rollover ({ROLLOVER_MODE}) up to {newest_due}: {sum(summary.values())} streaks lapsed")
+    return summary
+
+
+if __name__ == "__main__":
+    run_rollover(date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None)
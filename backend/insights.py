@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from starlette.concurrency import run_in_threadpool
+from backend.storage import repository
+from backend.util.health_analytics import compute_health_mood_insights
+from backend.util.session_tokens import session_user, resolve_user_id
+
+router = APIRouter()
+
+#Storage#############################################
+health_repo = repository("UserHealthData")
+journal_repo = repository("JournalEntries")
+####################################################
+
+# Per-user cache: the raw series (the slow DynamoDB part) plus one result per
+# (max_lag, window). Writers in googlefit.py / journal.py call invalidate(); the TTL
+# only covers writes made by other processes.
+INSIGHTS_CACHE_TTL = 6 * 3600
+MAX_LAG_DAYS = 14
+
+insights_cache = {}   # user_id -> {"series": (health, mood), "results": {...}, "loaded_at": ts}
+cache_generation = {}  # user_id -> bumped on every invalidate()
+cache_lock = threading.Lock()
+
+
+def invalidate(user_id: str):
+    with cache_lock:
+        insights_cache.pop(user_id, None)
+        cache_generation[user_id] = cache_generation.get(user_id, 0) + 1
+
+
+def _as_float(value):
+    return float(value) if value is not None else float("nan")
+
+
+def load_series(user_id: str):
+    # 📥 Projected queries so only the numeric columns come back
+    health_items = health_repo.query_all(user_id, attributes=["date", "sleep", "hrv"])
+    journal_items = journal_repo.query_all(user_id, attributes=["timestamp_utc", "confidence_score"])
+
+    health = {
+        "dates": [item["date"] for item in health_items],
+        "sleep": [_as_float(item.get("sleep")) for item in health_items],
+        "hrv": [_as_float(item.get("hrv")) for item in health_items],
+    }
+    mood = {
+        "dates": [item["timestamp_utc"][:10] for item in journal_items],
+        "risk": [_as_float(item.get("confidence_score")) for item in journal_items],
+    }
+    return health, mood
+
+
+def get_insights(user_id: str, max_lag: int, window: int):
+    now = time.time()
+    with cache_lock:
+        entry = insights_cache.get(user_id)
+        if entry and now - entry["loaded_at"] > INSIGHTS_CACHE_TTL:
+            entry = None
+        if entry and (max_lag, window) in entry["results"]:
+            return entry["results"][(max_lag, window)], True
+        generation = cache_generation.get(user_id, 0)
+
+    if entry is None:
+        entry = {"series": load_series(user_id), "results": {}, "loaded_at": now}
+    result = compute_health_mood_insights(*entry["series"], max_lag=max_lag, window=window)
+
+    with cache_lock:
+        # Don't cache a result if new data arrived while we were loading
+        if cache_generation.get(user_id, 0) == generation:
+            entry["results"][(max_lag, window)] = result
+            insights_cache[user_id] = entry
+    return result, False
+
+
+# 📊 Sleep / HRV vs journal risk score: weekly + monthly rollups, rolling means, lagged r
+@router.get("/insights/health-mood")
+async def health_mood_insights(
+    user_id: Optional[str] = None,
+    max_lag: int = Query(7, ge=0, le=MAX_LAG_DAYS),
+    window: int = Query(7, ge=2, le=90),
+    session_user_id: Optional[str] = Depends(session_user),
+):
+    user_id = resolve_user_id(session_user_id, user_id)
+    try:
+        result, cached = await run_in_threadpool(get_insights, user_id, max_lag, window)
+        return {"user_id": user_id, "cached": cached, **result}
+    except Exception as e:
+        print("❌ Health/mood insights error:", str(e))
+        return {"error": str(e)}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
@@ -6,14 +6,15 @@ from typing import List
 import os
 from dotenv import load_dotenv
 from uuid import uuid4
-import boto3
+from boto3.dynamodb.conditions import Key
 import datetime
 from decimal import Decimal
 load_dotenv()
-from ibm_watsonx_ai.foundation_models import ModelInference
-from ibm_watsonx_ai import Credentials
-from ibm_watsonx_ai import APIClient
 import json
+from backend.util import services
+from backend.storage import repository, UnitOfWork, unit_of_work
+from backend import insights, proactive_prompt
+from backend.util.session_tokens import current_user_id
 
 ###development stage(switch with router after creation)
 router = APIRouter()
@@ -22,35 +23,22 @@ router = APIRouter()
 
 
 #IBM WatsonX######################################
-credentials = Credentials(
-    url = "https://eu-de.ml.cloud.ibm.com",
-    api_key = os.getenv("WATSONX_API_KEY")
-)
-client = APIClient(credentials)
-
-reframing_model = ModelInference(
-    model_id="mistralai/mistral-medium-2505",
-    credentials=credentials,
-    project_id="1cb8c38f-d650-41fe-9836-86659006c090",
-    params={"decoding_method": "greedy", "max_new_tokens": 500}
-)
+reframing_model = services.lazy_model("mistralai/mistral-medium-2505", max_new_tokens=500)
 ####################################################
 
-#AWS DynamoDB#######################################
-AWS_REGION = "ap-south-1"
+#Storage (DynamoDB, or SQLite with STORAGE_BACKEND=sqlite)##########
 DYNAMO_TABLE = "JournalEntries"
 DYNAMO_CUE_TABLE = "JournalCueSchedule"
 FIXED_USER_ID = "demo_user"
 
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-dynamo_table = dynamodb.Table(DYNAMO_TABLE)
-dynamo_cue_table = dynamodb.Table(DYNAMO_CUE_TABLE)
+journal_repo = repository(DYNAMO_TABLE)
+cue_repo = repository(DYNAMO_CUE_TABLE)
 ####################################################
 
 ######ANALYZE JOURNAL ENTRY FUNCTION####################
-def analyze_journal_entry(entry):
+def analyze_journal_entry(entry, user_id: str = FIXED_USER_ID):
     try:
-        history_data = analyze_last_five_entries()
+        history_data = analyze_last_five_entries(user_id)
         prompt = f"""You are the 'Moodmate Unified Agent.' Your task is two-fold:
         1.  **Safety Check:** Analyze the user's current entry for psychological risk.
         2.  **Therapeutic Analysis:** Analyze the current entry and synthesize a **Pattern Analysis** using the provided historical context.
@@ -126,35 +114,41 @@ def analyze_journal_entry(entry):
 ######################################################
 
 #####SAVE TO DYNAMODB###############################
-def save_journal_entry(item: dict):
-    item["user_id"] = FIXED_USER_ID
+# With a unit of work the entry, its cues and the prompt decision go out in one batch write
+def save_journal_entry(item: dict, user_id: str = FIXED_USER_ID, uow: UnitOfWork = None):
+    item["user_id"] = user_id
     item["entry_id"] = str(uuid4())
     item["timestamp_utc"] = datetime.datetime.utcnow().isoformat()
+    if uow is not None:
+        uow.put(DYNAMO_TABLE, item)
+        proactive_prompt.record_journal_entry(user_id, item["timestamp_utc"], item.get("confidence_score"), uow)
+        uow.after_flush(lambda: insights.invalidate(user_id))
+        return
     try:
-        dynamo_table.put_item(Item=item)
+        journal_repo.put(item)
+        insights.invalidate(item["user_id"])
+        proactive_prompt.record_journal_entry(item["user_id"], item["timestamp_utc"], item.get("confidence_score"))
         print("Journal entry saved successfully.")
     except Exception as e:
         print("Error saving journal entry:", e)
 ###################################################
 
-def save_cue_schedule(cue_item: dict):
-    cue_item["user_id"] = FIXED_USER_ID
+def save_cue_schedule(cue_item: dict, user_id: str = FIXED_USER_ID, uow: UnitOfWork = None):
+    cue_item["user_id"] = user_id
     cue_item["journal_timestamp"] = datetime.datetime.utcnow().isoformat()
+    if uow is not None:
+        uow.put(DYNAMO_CUE_TABLE, cue_item)
+        return
     try:
-        dynamo_cue_table.put_item(Item = cue_item)
+        cue_repo.put(cue_item)
         print("Cues saved successfully")
     except Exception as e:
         print("Error saving cues:", e)
 
 ###############ANALYZE LAST 5 ENTRIES###################
-def analyze_last_five_entries():
+def analyze_last_five_entries(user_id: str = FIXED_USER_ID):
     try:
-        response = dynamo_table.query(
-            KeyConditionExpression = boto3.dynamodb.conditions.Key('user_id').eq(FIXED_USER_ID),
-            ScanIndexForward = False,
-            Limit = 5
-        )
-        items = response.get('Items', [])
+        items = journal_repo.query(user_id, descending=True, limit=5).items
         
         formatted_entries = []
         for item in items:
@@ -201,8 +195,8 @@ class JournalEntryResponse(BaseModel):
 #.........................................................#
 ####CREATE JOURNAL ENTRY ENDPOINT###################
 @router.post("/journal-entry", response_model=JournalEntryResponse)
-def create_journal_entry(entry: JournalEntry):
-    analysis = analyze_journal_entry(entry.text)
+def create_journal_entry(entry: JournalEntry, user_id: str = Depends(current_user_id), uow: UnitOfWork = Depends(unit_of_work)):
+    analysis = analyze_journal_entry(entry.text, user_id)
 
     item = {
         "text": entry.text,
@@ -219,12 +213,13 @@ def create_journal_entry(entry: JournalEntry):
         "chatbot_context": analysis["chatbot_context"]
     }
 
-    save_journal_entry(item)
+    save_journal_entry(item, user_id, uow)
     save_cue_schedule({
         "cue_1": analysis["coping_suggestions"][0],
         "cue_2": analysis["coping_suggestions"][1],
         "cue_3": analysis["coping_suggestions"][2]
-    })
+    }, user_id, uow)
+    uow.flush()  # before answering: a failed write must fail the request
 
     return JournalEntryResponse(
         entry_text=entry.text,
@@ -244,13 +239,9 @@ def create_journal_entry(entry: JournalEntry):
 
 ##GET JOURNAL BY DATE########################################
 @router.get("/journal-entry/by-date", response_model=JournalEntryResponse)
-def get_journal_entry_by_date(date: str):
+def get_journal_entry_by_date(date: str, user_id: str = Depends(current_user_id)):
     try:
-        response = dynamo_table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('user_id').eq(FIXED_USER_ID) & 
-                                   boto3.dynamodb.conditions.Key('timestamp_utc').begins_with(date)
-        )
-        items = response.get('Items', [])
+        items = journal_repo.query_all(user_id, range_condition=Key('timestamp_utc').begins_with(date))
         if not items:
             return {"message": "No journal entries found for the specified date."}
         
@@ -276,12 +267,9 @@ def get_journal_entry_by_date(date: str):
 
 #GET ALL JOURNALS####################################
 @router.get("/journal-entries", response_model=List[JournalEntryResponse])
-def get_all_journal_entries():
+def get_all_journal_entries(user_id: str = Depends(current_user_id)):
     try:
-        response = dynamo_table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('user_id').eq(FIXED_USER_ID)
-        )
-        items = response.get('Items', [])
+        items = journal_repo.query_all(user_id)
         
         journal_entries = []
         for item in items:
@@ -0,0 +1,48 @@
+# journal_latest_backfill.py
+#
+# Writes a JournalLatest marker for every user whose journal entries predate the
+# marker table, so the nightly prompt batch (proactive_prompt.py) sees them. Safe to
+# re-run: a marker is only written when it is missing or older than the user's newest
+# entry, so markers from entries saved meanwhile are kept.
+#
+#   python -m backend.journal_latest_backfill            # write the markers
+#   python -m backend.journal_latest_backfill --dry-run  # only report
+
+import sys
+from boto3.dynamodb.conditions import Attr
+from backend.storage import ConditionFailed
+from backend.proactive_prompt import journal_repo, latest_repo, latest_marker
+
+
+def scan_latest_entries():
+    latest = {}
+    for item in journal_repo.scan_all(attributes=["user_id", "timestamp_utc", "confidence_score"]):
+        current = latest.get(item["user_id"])
+        if current is None or item["timestamp_utc"] > current["timestamp_utc"]:
+            latest[item["user_id"]] = item
+    return latest
+
+
+def run_backfill(dry_run: bool = False):
+    latest = scan_latest_entries()
+    stats = {"users": len(latest), "written": 0, "up_to_date": 0}
+    if dry_run:
+        print("✅ JournalLatest backfill (dry run) done:", stats)
+        return stats
+
+    for user_id, entry in latest.items():
+        try:
+            latest_repo.put(
+                latest_marker(user_id, entry["timestamp_utc"], entry.get("confidence_score")),
+                condition=Attr("user_id").not_exists() | Attr("timestamp_utc").lt(entry["timestamp_utc"])
+            )
+            stats["written"] += 1
+        except ConditionFailed:
+            stats["up_to_date"] += 1
+
+    print("✅ JournalLatest backfill done:", stats)
+    return stats
+
+
+if __name__ == "__main__":
+    run_backfill(dry_run="--dry-run" in sys.argv[1:])
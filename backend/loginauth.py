@@ -1,39 +1,80 @@
-import bcrypt
-import boto3
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr
+from starlette.concurrency import run_in_threadpool
+from backend.storage import ConditionFailed
+from backend.util.auth_emails import user_repo, lookup_username
+from backend.util.password_hasher import password_hasher, PasswordHasherBusy
+from backend.util.session_tokens import issue_token, SESSION_TTL_SECONDS
 
 router = APIRouter()
 
 # ✅ Add CORS middleware
 
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserAuth')
-
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
-@router.post("/login")
-def login(payload: LoginRequest):
+
+# 🔁 Upgrade a hash made with an old BCRYPT_ROUNDS; skipped if the password changed meanwhile
+async def rehash_password(username: str, password: str, old_hash: str):
     try:
-        response = table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr("email").eq(payload.email)
+        new_hash = await password_hasher.hash(password)
+        await run_in_threadpool(
+            user_repo.update,
+            {"username": username},
+            set={"hashed_pw": new_hash},
+            condition=Attr("hashed_pw").eq(old_hash),
+            return_values="NONE"
         )
-        items = response.get("Items", [])
-        if not items:
+        print(f"🔁 Rehashed password for {username} at cost {password_hasher.rounds}")
+    except (PasswordHasherBusy, ConditionFailed):
+        pass  # try again on the next login / password changed meanwhile
+    except ClientError as e:
+        print("⚠️ Rehash failed:", e.response["Error"]["Message"])
+
+
+def _get_user(email: str):
+    # 🔑 Two key lookups (email -> username -> user) instead of scanning UserAuth
+    username = lookup_username(email)
+    if not username:
+        return None
+    return user_repo.get({"username": username})
+
+
+@router.post("/login")
+async def login(payload: LoginRequest, background_tasks: BackgroundTasks):
+    try:
+        user = await run_in_threadpool(_get_user, payload.email)
+        if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        user = items[0]
-        if bcrypt.checkpw(payload.password.encode(), user["hashed_pw"].encode()):
-            return {"message": "Login successful", "username": user["username"]}
+        if await password_hasher.verify(payload.password, user["hashed_pw"]):
+            if password_hasher.needs_rehash(user["hashed_pw"]):
+                background_tasks.add_task(rehash_password, user["username"], payload.password, user["hashed_pw"])
+            return {
+                "message": "Login successful",
+                "username": user["username"],
+                "token": issue_token(user["username"]),
+                "token_type": "bearer",
+                "expires_in": SESSION_TTL_SECONDS
+            }
         else:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    except HTTPException:
+        raise
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Too many login attempts, try again shortly", headers={"Retry-After": "1"})
     except ClientError as e:
         raise HTTPException(status_code=500, detail=f"DynamoDB error: {e.response['Error']['Message']}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/auth/hasher/stats")
+def hasher_stats():
+    return password_hasher.stats()
@@ -1,14 +1,60 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from backend.util import metrics, services
 from backend.chatbotapi import router as chatbot_router
 from backend.loginauth import router as auth_router
 from backend.signupauth import router as signup_router
-from backend.analyzetweets import router as analyze_router
+from backend.analyzetweets import router as analyze_router, tweet_monitor, analysis_pool
 from backend.googlefit import router as googlefit_router
-from backend.habit import router as habit_router
+from backend.habit import router as habit_router, suggestion_cache, generate_replacements, check_in_pool
 from backend.journal import router as journal_router
+from backend.insights import router as insights_router
+from backend.proactive_prompt import router as proactive_router, run_prompt_decisions
+from backend.habit_rollover import run_rollover
+from backend.util.password_hasher import password_hasher
+from apscheduler.schedulers.background import BackgroundScheduler
 
-app = FastAPI()
+# Opt-in startup work: nothing below runs at import time
+ENABLE_SCHEDULED_JOBS = os.getenv("ENABLE_SCHEDULED_JOBS", "0") == "1"
+WARM_SERVICES = os.getenv("WARM_SERVICES", "0") == "1"
+WARM_HABIT_SUGGESTIONS = os.getenv("WARM_HABIT_SUGGESTIONS", "0") == "1"
+ROLLOVER_HOUR = int(os.getenv("HABIT_ROLLOVER_HOUR", "0"))
+PROMPT_DECISION_HOUR = int(os.getenv("PROMPT_DECISION_HOUR", "0"))  # UTC: prompt dates are UTC days
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler = None
+    try:
+        if WARM_SERVICES:
+            services.warm_up()
+        # Precomputed catalog is served at once; WARM_HABIT_SUGGESTIONS=1 also regenerates
+        # it with the LLM in the background
+        suggestion_cache.warm(generate_replacements if WARM_HABIT_SUGGESTIONS else None)
+        if ENABLE_SCHEDULED_JOBS:
+            tweet_monitor.start()
+            scheduler = BackgroundScheduler()
+            scheduler.add_job(run_rollover, "cron", hour=ROLLOVER_HOUR, minute=15, id="habit_rollover_job", replace_existing=True)
+            scheduler.add_job(run_prompt_decisions, "cron", hour=PROMPT_DECISION_HOUR, minute=5, timezone="UTC", id="proactive_prompt_job", replace_existing=True)
+            scheduler.start()
+        yield
+    finally:
+        # Runs even if startup failed half-way; queued work is dropped so a slow LLM
+        # call can't hold the process open on exit
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+        if ENABLE_SCHEDULED_JOBS:
+            tweet_monitor.shutdown()
+        for pool in (analysis_pool, check_in_pool):
+            pool.shutdown(wait=False, cancel_futures=True)
+        suggestion_cache.shutdown()
+        password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.add_middleware(
@@ -19,10 +65,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ⏱️ Outermost, so the timings include CORS handling; scrape at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 app.include_router(chatbot_router)
 app.include_router(auth_router)
 app.include_router(signup_router)
 app.include_router(analyze_router)
 app.include_router(googlefit_router)
 app.include_router(habit_router)
-app.include_router(journal_router)
\ No newline at end of file
+app.include_router(journal_router)
+app.include_router(insights_router)
+app.include_router(proactive_router)
@@ -1,24 +1,21 @@
-import boto3
 from datetime import datetime, timedelta
 from collections import Counter
+from boto3.dynamodb.conditions import Key, Attr
+from backend.storage import repository
 
-dynamodb = boto3.resource('dynamodb')
-memory_table = dynamodb.Table('UserMemory')
+memory_repo = repository('UserMemory')
 
 def fetch_recent_journals(user_id, days=14):
     """Fetch journal entries of type 'journal' from the past `days`."""
     today = datetime.utcnow().date()
     start_date = today - timedelta(days=days)
 
-    response = memory_table.scan()
-    items = response.get("Items", [])
-    
-    return sorted([
-        i for i in items
-        if i.get("user_id") == user_id
-        and i.get("type") == "journal"
-        and datetime.strptime(i['date'], "%Y-%m-%d").date() >= start_date
-    ], key=lambda x: x['date'])
+    # Query returns the user's items already sorted by date
+    return memory_repo.query_all(
+        user_id,
+        range_condition=Key("date").gte(start_date.isoformat()),
+        filter=Attr("type").eq("journal")
+    )
 
 def detect_emotion_streaks(entries):
     streaks = []
@@ -46,7 +43,7 @@ def summarize_emotions(entries):
 
 def store_memory_summary(user_id, streaks, summary):
     today = datetime.utcnow().strftime("%Y-%m-%d")
-    memory_table.put_item(Item={
+    memory_repo.put({
         "user_id": user_id,
         "date": today,
         "type": "memory",
@@ -1,85 +1,234 @@
-from fastapi import APIRouter
-from datetime import datetime, timedelta
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+# proactive_prompt.py
+#
+# The "you seemed stressed yesterday" prompt. Decisions are precomputed into
+# ProactivePrompts (one item per user per day) by:
+#   * run_prompt_decisions(): nightly batch over JournalLatest, one marker per user with
+#     the newest entry's timestamp_utc and confidence_score (never the full history)
+#   * record_journal_entry(): called from journal.py when an entry is saved; it also
+#     rewrites that user's JournalLatest marker
+# /check_proactive_prompt then answers with a single conditional update that both reads
+# the decision and marks it shown. Dates are UTC days, the same clock as timestamp_utc.
+# Computed decisions never overwrite an existing item (a claimed prompt or a
+# journal_exists marker); only record_journal_entry replaces today's decision.
+#
+#   python -m backend.proactive_prompt            # compute today's decisions
+#   python -m backend.proactive_prompt 2025-07-21 # ... for another day
+#
+# Users whose entries predate JournalLatest get a marker from journal_latest_backfill.py.
 
-router = APIRouter()
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from boto3.dynamodb.conditions import Attr
+from starlette.concurrency import run_in_threadpool
+from backend.storage import repository, ConditionFailed, UnitOfWork
+from backend.util.session_tokens import session_user, resolve_user_id
 
-# Connect to DynamoDB
-dynamodb = boto3.resource("dynamodb", region_name="ap-south-1")  # use your region
+router = APIRouter()
 
 # Tables
-journal_table = dynamodb.Table("JournalEntries")
-prompt_table = dynamodb.Table("ProactivePrompts")
-user_table = dynamodb.Table("UserData")  # optional
+journal_repo = repository("JournalEntries")
+latest_repo = repository("JournalLatest")  # user_id (HASH): newest entry's timestamp_utc, confidence_score
+prompt_repo = repository("ProactivePrompts")  # user_id (HASH), date (RANGE)
+user_repo = repository("UserData")  # optional
+
+PROMPT_TYPE = "stress_alert"
+TRANSACT_CHUNK = 100
+RISK_THRESHOLD = float(os.getenv("PROACTIVE_RISK_THRESHOLD", "0.7"))
+NAME_CACHE_TTL = 6 * 3600
+
+name_cache = {}   # user_id -> (name, expires_at)
+name_cache_lock = threading.Lock()
 
 # Utils
 def today_str():
-    return datetime.now().strftime("%Y-%m-%d")
+    return datetime.utcnow().strftime("%Y-%m-%d")
 
-def yesterday_str():
-    return (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
 
-def get_user_name(user_id: str) -> str:
+# 🪪 Display names: in-process TTL cache, misses fetched in one batch get
+def get_user_names(user_ids) -> dict:
+    now = time.time()
+    names, missing = {}, []
+    with name_cache_lock:
+        for user_id in dict.fromkeys(user_ids):
+            cached = name_cache.get(user_id)
+            if cached and cached[1] > now:
+                names[user_id] = cached[0]
+            else:
+                missing.append(user_id)
+
+    if not missing:
+        return names
+    found = {}
     try:
-        res = user_table.get_item(Key={"user_id": user_id})
-        return res.get("Item", {}).get("name", "there")
-    except:
-        return "there"
-
-def was_prompt_already_shown(user_id: str, date: str, prompt_type: str = "stress_alert") -> bool:
-    res = prompt_table.get_item(Key={"user_id": user_id, "date": date})
-    item = res.get("Item")
-    return item and item.get("prompt_type") == prompt_type and item.get("shown") == True
-
-def mark_prompt_as_shown(user_id: str, date: str, prompt_type: str = "stress_alert"):
-    prompt_table.put_item(
-        Item={
-            "user_id": user_id,
-            "date": date,
-            "prompt_type": prompt_type,
-            "shown": True
-        }
-    )
+        for item in user_repo.get_many([{"user_id": u} for u in missing], attributes=["user_id", "name"]):
+            found[item["user_id"]] = item.get("name")
+    except Exception as e:
+        print("⚠️ User name lookup failed:", e)
+    with name_cache_lock:
+        for user_id in missing:
+            name = found.get(user_id) or "there"
+            name_cache[user_id] = (name, now + NAME_CACHE_TTL)
+            names[user_id] = name
+    return names
 
-# Main route
-@router.get("/check_proactive_prompt")
-def check_proactive_prompt(user_id: str):
-    today = today_str()
-    yesterday = yesterday_str()
 
-    # Step 1: Don't repeat prompt
-    if was_prompt_already_shown(user_id, today):
-        return {"show_prompt": False, "reason": "already_shown"}
+def get_user_name(user_id: str) -> str:
+    return get_user_names([user_id])[user_id]
 
-    # Step 2: Check if today's journal exists
-    today_journal = journal_table.query(
-        KeyConditionExpression=Key("user_id").eq(user_id) & Key("date").eq(today)
-    )
-    if today_journal.get("Items"):
-        return {"show_prompt": False, "reason": "journal_exists"}
 
-    # Step 3: Get latest journal entry (to extract most recent risk_score)
-    latest_journal = journal_table.query(
-        KeyConditionExpression=Key("user_id").eq(user_id),
-        ScanIndexForward=False,
-        Limit=1
-    )
-    items = latest_journal.get("Items", [])
-    if not items:
-        return {"show_prompt": False, "reason": "no_journal_found"}
+def _risk(entry) -> float:
+    value = entry.get("confidence_score", entry.get("risk_score"))
+    return float(value) if value is not None else 0.0
 
-    latest_entry = items[0]
-    risk_score = float(latest_entry.get("risk_score", 0.0))
 
-    if risk_score > 0.7:
-        name = get_user_name(user_id)
-        mark_prompt_as_shown(user_id, today)
+# 🧮 Pure decision from the user's latest journal entry (None = no entries)
+def decide(latest_entry, today: str, name: str = None) -> dict:
+    if latest_entry is None:
+        return {"show_prompt": False, "reason": "no_journal_found"}
+    if latest_entry["timestamp_utc"][:10] >= today:
+        return {"show_prompt": False, "reason": "journal_exists"}
+    if _risk(latest_entry) > RISK_THRESHOLD:
         return {
             "show_prompt": True,
-            "message": f"Hey {name}, you seemed stressed yesterday. Want to talk or do a quick breathing exercise?",
+            "message": f"Hey {name or 'there'}, you seemed stressed yesterday. Want to talk or do a quick breathing exercise?",
             "suggestions": ["Chat with me", "Start breathing exercise"]
         }
-
     return {"show_prompt": False, "reason": "low_stress"}
+
+
+def _decision_item(user_id: str, today: str, decision: dict) -> dict:
+    return {
+        "user_id": user_id,
+        "date": today,
+        "prompt_type": PROMPT_TYPE,
+        "shown": False,
+        "computed_at": datetime.utcnow().isoformat(),
+        **decision
+    }
+
+
+def latest_entry_for(user_id: str):
+    marker = latest_repo.get({"user_id": user_id})
+    if marker is not None:
+        return marker
+    items = journal_repo.query(user_id, attributes=["timestamp_utc", "confidence_score"], descending=True, limit=1).items
+    return items[0] if items else None
+
+
+def latest_marker(user_id: str, timestamp_utc: str, confidence_score=None) -> dict:
+    marker = {"user_id": user_id, "timestamp_utc": timestamp_utc}
+    if confidence_score is not None:
+        marker["confidence_score"] = confidence_score
+    return marker
+
+
+def evaluate_user(user_id: str, today: str = None) -> dict:
+    today = today or today_str()
+    latest = latest_entry_for(user_id)
+    name = get_user_name(user_id) if latest and _risk(latest) > RISK_THRESHOLD else None
+    item = _decision_item(user_id, today, decide(latest, today, name))
+    try:
+        prompt_repo.put(item, condition=Attr("user_id").not_exists())
+    except ConditionFailed as e:
+        return e.item  # written meanwhile (journal entry, nightly batch)
+    return item
+
+
+# ✍️ Hook for journal.py: a fresh entry means no prompt today, and it is the user's newest
+# (entries are stamped with the current time, so the marker is simply overwritten)
+def record_journal_entry(user_id: str, timestamp_utc: str, confidence_score=None, uow: UnitOfWork = None):
+    item = _decision_item(user_id, timestamp_utc[:10], {"show_prompt": False, "reason": "journal_exists"})
+    marker = latest_marker(user_id, timestamp_utc, confidence_score)
+    if uow is not None:
+        uow.put(prompt_repo.name, item)
+        uow.put(latest_repo.name, marker)
+        return
+    try:
+        prompt_repo.put(item)
+        latest_repo.put(marker)
+    except Exception as e:
+        print("⚠️ Could not update prompt decision:", e)
+
+
+# 📦 Nightly batch: one scan of the per-user markers (one item per user), one batch write
+def run_prompt_decisions(today: str = None):
+    today = today or today_str()
+    started = time.perf_counter()
+
+    latest = {item["user_id"]: item for item in latest_repo.scan_all()}
+
+    stressed = [u for u, entry in latest.items() if _risk(entry) > RISK_THRESHOLD]
+    names = get_user_names(stressed)
+
+    decisions = [_decision_item(user_id, today, decide(entry, today, names.get(user_id))) for user_id, entry in latest.items()]
+    written = put_new_decisions(decisions, today)
+    shown = sum(d["show_prompt"] for d in written)
+
+    stats = {"date": today, "users": len(latest), "written": len(written), "prompts": shown,
+             "seconds": round(time.perf_counter() - started, 2)}
+    print("🗓️ Proactive prompt decisions computed:", stats)
+    return stats
+
+
+# 📦 Only for users without an item for that day: one batch get drops the ones already
+# decided, then conditional puts, 100 per transaction; a cancelled chunk goes one by one
+def put_new_decisions(decisions, day: str):
+    existing = {item["user_id"] for item in prompt_repo.get_many([{"user_id": d["user_id"], "date": day} for d in decisions], attributes=["user_id"])}
+    decisions = [d for d in decisions if d["user_id"] not in existing]
+
+    written = []
+    not_exists = Attr("user_id").not_exists()
+    for i in range(0, len(decisions), TRANSACT_CHUNK):
+        chunk = decisions[i:i + TRANSACT_CHUNK]
+        try:
+            prompt_repo.transact([{"put": d, "condition": not_exists} for d in chunk])
+            written.extend(chunk)
+        except ConditionFailed:
+            for decision in chunk:
+                try:
+                    prompt_repo.put(decision, condition=not_exists)
+                    written.append(decision)
+                except ConditionFailed:
+                    pass
+    return written
+
+
+def _claim_decision(user_id: str, today: str):
+    """Mark today's prompt shown and return it; returns (item, claimed)."""
+    try:
+        item = prompt_repo.update(
+            {"user_id": user_id, "date": today},
+            set={"shown": True},
+            condition=Attr("show_prompt").eq(True) & Attr("shown").eq(False)
+        )
+        return item, True
+    except ConditionFailed as e:
+        return e.item, False
+
+
+# Main route
+@router.get("/check_proactive_prompt")
+async def check_proactive_prompt(user_id: Optional[str] = None, session_user_id: Optional[str] = Depends(session_user)):
+    user_id = resolve_user_id(session_user_id, user_id)
+    today = today_str()
+
+    item, claimed = await run_in_threadpool(_claim_decision, user_id, today)
+    if item is None:
+        # Not precomputed yet (new user, batch not run): evaluate now, then claim
+        await run_in_threadpool(evaluate_user, user_id, today)
+        item, claimed = await run_in_threadpool(_claim_decision, user_id, today)
+
+    if claimed:
+        return {"show_prompt": True, "message": item["message"], "suggestions": item["suggestions"]}
+    if item and item.get("show_prompt"):
+        return {"show_prompt": False, "reason": "already_shown"}
+    return {"show_prompt": False, "reason": item.get("reason") if item else "no_journal_found"}
+
+
+if __name__ == "__main__":
+    run_prompt_decisions(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,9 +1,32 @@
 from flask import Blueprint, request, jsonify
-import requests
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from util.twitter_client import TwitterClient, TwitterRateLimited
+from util.vader_batch import score_texts, stress_scores, grouped_stress
 
 twitter_analyzer = Blueprint('twitter_analyzer', __name__)
-analyzer = SentimentIntensityAnalyzer()
+
+MAX_BATCH_HANDLES = 50
+FETCH_WORKERS = 8
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="twitter-analyzer")
+
+# One pooled, rate-limited client per bearer token so buckets survive across requests
+clients = {}
+clients_lock = threading.Lock()
+
+
+def get_client(token: str) -> TwitterClient:
+    with clients_lock:
+        client = clients.get(token)
+        if client is None:
+            client = clients[token] = TwitterClient(token, max_wait=5.0)
+        return client
+
+
+def fetch_recent_tweets(client: TwitterClient, handle: str, max_results: int = 10):
+    params = {"query": f"from:{handle}", "max_results": max_results}
+    return client.get("tweets/search/recent", "tweets/search/recent", params=params).get("data", [])
+
 
 @twitter_analyzer.route('/analyze_twitter', methods=['POST'])
 def analyze_twitter():
@@ -14,27 +37,72 @@ def analyze_twitter():
     if not handle or not token:
         return jsonify({"error": "Handle or token missing"}), 400
 
-    url = f"https://api.twitter.com/2/tweets/search/recent?query=from:{handle}&max_results=10"
-    headers = { "Authorization": f"Bearer {token}" }
-
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
+    try:
+        tweets = fetch_recent_tweets(get_client(token), handle)
+    except Exception as e:
+        print("Twitter fetch error:", e)
         return jsonify({"error": "Twitter API fetch failed"}), 500
 
-    tweets = response.json().get("data", [])
     if not tweets:
         return jsonify({"score": 0.1, "message": "No tweets found."})
 
-    stress_scores = []
-    for tweet in tweets:
-        sentiment = analyzer.polarity_scores(tweet["text"])
-        # Score = high when negative sentiment is high and positive is low
-        score = max(0, sentiment['neg'] + (1 - sentiment['pos']) / 2)
-        stress_scores.append(score)
-
-    avg_stress = sum(stress_scores) / len(stress_scores)
+    neg, pos, _ = score_texts([t["text"] for t in tweets])
+    avg_stress = float(stress_scores(neg, pos).mean())
     return jsonify({
         "score": round(avg_stress, 2),
         "tweet_count": len(tweets),
         "tweets": [t["text"] for t in tweets]
     })
+
+
+# 👥 Score a cohort: timelines fetched concurrently, all tweets scored in one batch
+@twitter_analyzer.route('/analyze_twitter/batch', methods=['POST'])
+def analyze_twitter_batch():
+    data = request.get_json() or {}
+    handles = list(dict.fromkeys(h.strip().lstrip("@") for h in data.get('handles', []) if h and h.strip()))
+    token = data.get('token')  # Bearer token
+    include_tweets = bool(data.get('include_tweets', False))
+
+    if not handles or not token:
+        return jsonify({"error": "Handles or token missing"}), 400
+    if len(handles) > MAX_BATCH_HANDLES:
+        return jsonify({"error": f"At most {MAX_BATCH_HANDLES} handles per batch"}), 413
+
+    client = get_client(token)
+
+    def fetch(handle):
+        try:
+            return fetch_recent_tweets(client, handle), None
+        except TwitterRateLimited as e:
+            return None, f"rate_limited (retry in {e.retry_in:.0f}s)"
+        except Exception as e:
+            return None, str(e)
+
+    fetched = list(fetch_pool.map(fetch, handles))
+
+    texts, groups = [], []
+    for i, (tweets, _) in enumerate(fetched):
+        for tweet in tweets or []:
+            texts.append(tweet["text"])
+            groups.append(i)
+    means, counts = grouped_stress(texts, groups, len(handles))
+
+    results = []
+    for i, handle in enumerate(handles):
+        tweets, error = fetched[i]
+        if error:
+            results.append({"handle": handle, "error": error})
+        elif not tweets:
+            results.append({"handle": handle, "score": 0.1, "tweet_count": 0, "message": "No tweets found."})
+        else:
+            result = {"handle": handle, "score": round(float(means[i]), 2), "tweet_count": int(counts[i])}
+            if include_tweets:
+                result["tweets"] = [t["text"] for t in tweets]
+            results.append(result)
+
+    scored = [r["score"] for r in results if r.get("tweet_count")]
+    return jsonify({
+        "results": results,
+        "handles_scored": len(scored),
+        "cohort_score": round(sum(scored) / len(scored), 2) if scored else None
+    })
@@ -1,16 +1,20 @@
 import uuid
-import bcrypt
-import boto3
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from backend.util.password_hasher import password_hasher, PasswordHasherBusy
+from backend.storage import transact, ConditionFailed
+from backend.util.auth_emails import USER_TABLE, EMAIL_TABLE, normalize_email
 
 router = APIRouter()
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserAuth')
+
+class EmailAlreadyRegistered(Exception):
+    pass
 
 class SignupRequest(BaseModel):
     email: EmailStr
@@ -20,32 +24,49 @@ class SignupRequest(BaseModel):
 def generate_uuid() -> str:
     return str(uuid.uuid4())
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
+# 🔒 User + email index item in one transaction; the email put fails if it is taken
 def save_user(email: str, user_id: str, hashed_pw: str, consent: bool) -> bool:
+    user_item = {
+        'username': user_id,
+        'email': email,
+        'hashed_pw': hashed_pw,
+        'consent': consent,
+        'created_at': datetime.utcnow().isoformat()
+    }
+    email_item = {'email': normalize_email(email), 'username': user_id}
     try:
-        table.put_item(Item={
-            'username': user_id,
-            'email': email,
-            'hashed_pw': hashed_pw,
-            'consent': consent,
-            'created_at': datetime.utcnow().isoformat()
-        })
+        transact([
+            {"table": USER_TABLE, "put": user_item, "condition": Attr("username").not_exists()},
+            {"table": EMAIL_TABLE, "put": email_item, "condition": Attr("email").not_exists()}
+        ])
         return True
+    except ConditionFailed as e:
+        if e.reasons and len(e.reasons) > 1 and e.reasons[1] == 'ConditionalCheckFailed':
+            raise EmailAlreadyRegistered(email)
+        print("❌ Signup transaction cancelled:", e.reasons)
+        return False
     except ClientError as e:
         print("❌ DynamoDB error:", e.response['Error']['Message'])
         return False
 
 @router.post("/signup")
-def signup(payload: SignupRequest):
+async def signup(payload: SignupRequest):
     if not payload.consent:
         raise HTTPException(status_code=400, detail="Consent required")
 
     user_id = generate_uuid()
-    hashed_pw = hash_password(payload.password)
+    try:
+        hashed_pw = await hash_password(payload.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Signup is busy, try again shortly", headers={"Retry-After": "1"})
 
-    success = save_user(payload.email, user_id, hashed_pw, payload.consent)
+    try:
+        success = await run_in_threadpool(save_user, payload.email, user_id, hashed_pw, payload.consent)
+    except EmailAlreadyRegistered:
+        raise HTTPException(status_code=409, detail="Email already registered")
     if success:
         return {"message": "Signup successful", "id": user_id}
     else:
@@ -0,0 +1,3 @@
+from backend.storage.base import ConditionFailed, Page, Repository, TableSpec, UnprocessedWrites
+from backend.storage.tables import STORAGE_BACKEND, TABLES, batch_put, repository, transact
+from backend.storage.unit_of_work import UnitOfWork, unit_of_work
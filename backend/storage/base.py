@@ -0,0 +1,150 @@
+# base.py
+
+import functools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from backend.util import metrics
+from backend.util.services import AWS_REGION
+
+# --- Repository interface ---
+# One Repository per table. Conditions are ordinary boto3 condition objects
+# (boto3.dynamodb.conditions.Key / Attr), so call sites read the same as before:
+#   repo.query("demo_user", range_condition=Key("timestamp_utc").begins_with(day))
+#   repo.update(key, add={"streak_days": 1}, condition=Attr("habit_id").exists())
+# DynamoRepository passes them straight to DynamoDB; SQLiteRepository evaluates them.
+
+
+@dataclass
+class TableSpec:
+    name: str
+    hash_key: str
+    range_key: Optional[str] = None
+    region: Optional[str] = AWS_REGION   # None = default boto3 region
+    indexes: Dict[str, Tuple[str, Optional[str]]] = field(default_factory=dict)  # name -> (hash, range)
+
+    def key_of(self, item: dict) -> dict:
+        key = {self.hash_key: item[self.hash_key]}
+        if self.range_key:
+            key[self.range_key] = item[self.range_key]
+        return key
+
+    def index_keys(self, index: Optional[str]) -> Tuple[str, Optional[str]]:
+        if index is None:
+            return self.hash_key, self.range_key
+        return self.indexes[index]
+
+
+@dataclass
+class Page:
+    items: List[dict]
+    last_key: Optional[dict] = None
+
+
+class ConditionFailed(Exception):
+    """A put/update/delete condition (or a transaction) did not hold.
+
+    item: the stored item at the time, when the backend can return it
+    reasons: per-operation cancellation codes for transact()
+    """
+
+    def __init__(self, item: dict = None, reasons: list = None):
+        super().__init__("Condition check failed")
+        self.item = item
+        self.reasons = reasons
+
+
+class UnprocessedWrites(Exception):
+    """A batch write still had unprocessed items after every retry."""
+
+    def __init__(self, items: list):
+        super().__init__(f"{len(items)} writes still unprocessed after retrying")
+        self.items = items
+
+
+def timed(method):
+    """Record a backend call as a metrics span: (backend, method name, table)."""
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # put_items / transact_items are classmethods and may span several tables
+        with metrics.span(self.backend, operation, getattr(self, "name", "")):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class Repository:
+    backend = "none"  # metrics label for the spans of every backend call
+
+    def __init__(self, spec: TableSpec):
+        self.spec = spec
+        self.name = spec.name
+
+    # Single items
+    def get(self, key: dict, attributes: List[str] = None, consistent: bool = False) -> Optional[dict]:
+        raise NotImplementedError
+
+    def put(self, item: dict, condition=None):
+        raise NotImplementedError
+
+    def update(self, key: dict, set: dict = None, add: dict = None, remove: List[str] = None,
+               condition=None, return_values: str = "ALL_NEW") -> Optional[dict]:
+        """SET / ADD (numbers, missing = 0) / REMOVE top-level attributes; creates the item if absent."""
+        raise NotImplementedError
+
+    def delete(self, key: dict, condition=None):
+        raise NotImplementedError
+
+    # Many items
+    def get_many(self, keys: List[dict], attributes: List[str] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def put_many(self, items: List[dict]):
+        """Unconditional overwrite of every item (batch write)."""
+        type(self).put_items([(self, item) for item in items])
+
+    def transact(self, operations: List[dict]):
+        """All-or-nothing writes on this table. Each operation is one of
+        {"put": item, "condition": ...}
+        {"update": key, "set": ..., "add": ..., "remove": ..., "condition": ...}
+        {"delete": key, "condition": ...}
+        Raises ConditionFailed (with reasons) if the transaction is cancelled."""
+        type(self).transact_items([(self, op) for op in operations])
+
+    # Writes spanning several tables of one backend: [(repository, item / operation)]
+    @classmethod
+    def put_items(cls, pairs) -> int:
+        """Batch-write the items; returns the number of backend round trips."""
+        raise NotImplementedError
+
+    @classmethod
+    def transact_items(cls, pairs) -> int:
+        """Same operations as transact(), across tables; returns the number of round trips."""
+        raise NotImplementedError
+
+    # Reads over many items
+    def query(self, hash_value, range_condition=None, index: str = None, filter=None, attributes: List[str] = None,
+              descending: bool = False, limit: int = None, start_key: dict = None) -> Page:
+        """One page. As in DynamoDB, limit counts items read before filter is applied."""
+        raise NotImplementedError
+
+    def scan(self, filter=None, attributes: List[str] = None, limit: int = None, start_key: dict = None) -> Page:
+        raise NotImplementedError
+
+    def query_all(self, hash_value, **kwargs) -> List[dict]:
+        items, start_key = [], None
+        while True:
+            page = self.query(hash_value, start_key=start_key, **kwargs)
+            items.extend(page.items)
+            if not page.last_key:
+                return items
+            start_key = page.last_key
+
+    def scan_all(self, **kwargs):
+        start_key = None
+        while True:
+            page = self.scan(start_key=start_key, **kwargs)
+            yield from page.items
+            if not page.last_key:
+                return
+            start_key = page.last_key
@@ -0,0 +1,255 @@
+# dynamo.py
+
+import os
+import random
+import time
+from collections import defaultdict
+from boto3.dynamodb.conditions import ConditionExpressionBuilder, Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from backend.util import services
+from backend.storage.base import ConditionFailed, Page, Repository, timed, UnprocessedWrites
+
+BATCH_GET_CHUNK = 100   # batch_get_item limit
+BATCH_WRITE_CHUNK = 25  # batch_write_item limit
+TRANSACT_CHUNK = 100    # transact_write_items limit
+BATCH_WRITE_RETRIES = int(os.getenv("DYNAMO_BATCH_WRITE_RETRIES", "8"))
+BATCH_WRITE_BACKOFF = 0.05
+
+_NO_VALUE = object()
+_deserializer = TypeDeserializer()
+
+
+def _deserialize(raw):
+    return {k: _deserializer.deserialize(v) for k, v in raw.items()} if raw else None
+
+
+def _projection(attributes):
+    names = {f"#p{i}": name for i, name in enumerate(attributes)}
+    return ", ".join(names), names
+
+
+def _update_expression(set=None, add=None, remove=None):
+    """Placeholders use #u/:u so they never collide with boto3's generated #n/:v."""
+    names, values, clauses = {}, {}, []
+    counter = 0
+
+    def placeholder(attr, value=_NO_VALUE):
+        nonlocal counter
+        name, val = f"#u{counter}", f":u{counter}"
+        counter += 1
+        names[name] = attr
+        if value is not _NO_VALUE:
+            values[val] = value
+        return name, val
+
+    if set:
+        parts = []
+        for attr, value in set.items():
+            name, val = placeholder(attr, value)
+            parts.append(f"{name} = {val}")
+        clauses.append("SET " + ", ".join(parts))
+    if add:
+        parts = []
+        for attr, value in add.items():
+            name, val = placeholder(attr, value)
+            parts.append(f"{name} {val}")
+        clauses.append("ADD " + ", ".join(parts))
+    if remove:
+        clauses.append("REMOVE " + ", ".join(placeholder(attr)[0] for attr in remove))
+    return " ".join(clauses), names, values
+
+
+class DynamoRepository(Repository):
+    backend = "dynamodb"
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.table = services.lazy_table(spec.name, spec.region)
+
+    @timed
+    def get(self, key, attributes=None, consistent=False):
+        kwargs = {"Key": key}
+        if attributes:
+            kwargs["ProjectionExpression"], kwargs["ExpressionAttributeNames"] = _projection(attributes)
+        if consistent:
+            kwargs["ConsistentRead"] = True
+        return self.table.get_item(**kwargs).get("Item")
+
+    @timed
+    def put(self, item, condition=None):
+        kwargs = {"Item": item}
+        if condition is not None:
+            kwargs["ConditionExpression"] = condition
+            kwargs["ReturnValuesOnConditionCheckFailure"] = "ALL_OLD"
+        try:
+            self.table.put_item(**kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ConditionFailed(item=_deserialize(e.response.get("Item")))
+            raise
+
+    @timed
+    def update(self, key, set=None, add=None, remove=None, condition=None, return_values="ALL_NEW"):
+        expression, names, values = _update_expression(set, add, remove)
+        kwargs = {
+            "Key": key,
+            "UpdateExpression": expression,
+            "ExpressionAttributeNames": names,
+            "ReturnValues": return_values,
+        }
+        if values:
+            kwargs["ExpressionAttributeValues"] = values
+        if condition is not None:
+            kwargs["ConditionExpression"] = condition
+            kwargs["ReturnValuesOnConditionCheckFailure"] = "ALL_OLD"
+        try:
+            return self.table.update_item(**kwargs).get("Attributes")
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ConditionFailed(item=_deserialize(e.response.get("Item")))
+            raise
+
+    @timed
+    def delete(self, key, condition=None):
+        kwargs = {"Key": key}
+        if condition is not None:
+            kwargs["ConditionExpression"] = condition
+        try:
+            self.table.delete_item(**kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ConditionFailed()
+            raise
+
+    @timed
+    def get_many(self, keys, attributes=None):
+        found = []
+        keys = list(keys)
+        for i in range(0, len(keys), BATCH_GET_CHUNK):
+            request = {self.name: {"Keys": keys[i:i + BATCH_GET_CHUNK]}}
+            if attributes:
+                request[self.name]["ProjectionExpression"], request[self.name]["ExpressionAttributeNames"] = _projection(attributes)
+            while request:
+                response = services.dynamodb(self.spec.region).batch_get_item(RequestItems=request)
+                found.extend(response.get("Responses", {}).get(self.name, []))
+                request = response.get("UnprocessedKeys") or None
+        return found
+
+    # The resource's client serializes values itself, but only hoists condition
+    # placeholders to the top level, so each transaction item builds its own strings
+    def _transact_item(self, operation):
+        builder = ConditionExpressionBuilder()
+        names, values, entry = {}, {}, {"TableName": self.name}
+        if "put" in operation:
+            action = "Put"
+            entry["Item"] = operation["put"]
+        elif "update" in operation:
+            action = "Update"
+            entry["Key"] = operation["update"]
+            entry["UpdateExpression"], names, values = _update_expression(
+                operation.get("set"), operation.get("add"), operation.get("remove"))
+        else:
+            action = "Delete"
+            entry["Key"] = operation["delete"]
+
+        if operation.get("condition") is not None:
+            built = builder.build_expression(operation["condition"])
+            entry["ConditionExpression"] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+        if names:
+            entry["ExpressionAttributeNames"] = names
+        if values:
+            entry["ExpressionAttributeValues"] = values
+        return {action: entry}
+
+    # 📦 Multi-table writes. batch_write_item / transact_write_items take any mix of
+    # tables, but only within one region, so the calls are grouped by region.
+    @staticmethod
+    def _by_region(pairs):
+        groups = defaultdict(list)
+        for repo, entry in pairs:
+            groups[repo.spec.region].append((repo, entry))
+        return groups
+
+    @classmethod
+    @timed
+    def put_items(cls, pairs):
+        calls = 0
+        for region, entries in cls._by_region(pairs).items():
+            # A batch may not hold the same key twice; the last put wins, as it would have
+            latest = {}
+            for repo, item in entries:
+                latest[(repo.name, tuple(repo.spec.key_of(item).values()))] = (repo.name, item)
+            entries = list(latest.values())
+
+            for i in range(0, len(entries), BATCH_WRITE_CHUNK):
+                request = defaultdict(list)
+                for name, item in entries[i:i + BATCH_WRITE_CHUNK]:
+                    request[name].append({"PutRequest": {"Item": item}})
+                request = dict(request)
+                for attempt in range(BATCH_WRITE_RETRIES + 1):
+                    response = services.dynamodb(region).batch_write_item(RequestItems=request)
+                    calls += 1
+                    request = response.get("UnprocessedItems")
+                    if not request:
+                        break
+                    if attempt == BATCH_WRITE_RETRIES:
+                        raise UnprocessedWrites([w["PutRequest"]["Item"] for writes in request.values() for w in writes])
+                    time.sleep(BATCH_WRITE_BACKOFF * (2 ** attempt) * (0.5 + random.random() / 2))
+        return calls
+
+    @classmethod
+    @timed
+    def transact_items(cls, pairs):
+        """Atomic per call of up to 100 operations (and per region)."""
+        calls = 0
+        for region, entries in cls._by_region(pairs).items():
+            client = services.dynamodb(region).meta.client
+            for i in range(0, len(entries), TRANSACT_CHUNK):
+                chunk = entries[i:i + TRANSACT_CHUNK]
+                try:
+                    client.transact_write_items(TransactItems=[repo._transact_item(op) for repo, op in chunk])
+                    calls += 1
+                except ClientError as e:
+                    if e.response["Error"]["Code"] == "TransactionCanceledException":
+                        reasons = [r.get("Code") for r in e.response.get("CancellationReasons", [])]
+                        raise ConditionFailed(reasons=reasons)
+                    raise
+        return calls
+
+    @timed
+    def query(self, hash_value, range_condition=None, index=None, filter=None, attributes=None,
+              descending=False, limit=None, start_key=None):
+        hash_key, _ = self.spec.index_keys(index)
+        key_condition = Key(hash_key).eq(hash_value)
+        if range_condition is not None:
+            key_condition &= range_condition
+        kwargs = {"KeyConditionExpression": key_condition, "ScanIndexForward": not descending}
+        if index:
+            kwargs["IndexName"] = index
+        if filter is not None:
+            kwargs["FilterExpression"] = filter
+        if attributes:
+            kwargs["ProjectionExpression"], kwargs["ExpressionAttributeNames"] = _projection(attributes)
+        if limit:
+            kwargs["Limit"] = limit
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = self.table.query(**kwargs)
+        return Page(response.get("Items", []), response.get("LastEvaluatedKey"))
+
+    @timed
+    def scan(self, filter=None, attributes=None, limit=None, start_key=None):
+        kwargs = {}
+        if filter is not None:
+            kwargs["FilterExpression"] = filter
+        if attributes:
+            kwargs["ProjectionExpression"], kwargs["ExpressionAttributeNames"] = _projection(attributes)
+        if limit:
+            kwargs["Limit"] = limit
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = self.table.scan(**kwargs)
+        return Page(response.get("Items", []), response.get("LastEvaluatedKey"))
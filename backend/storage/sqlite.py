@@ -0,0 +1,383 @@
+# sqlite.py
+
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+from boto3.dynamodb.conditions import AttributeBase
+from backend.database import store_engine
+from backend.storage.base import ConditionFailed, Page, Repository, timed
+
+# --- SQLite repository (STORAGE_BACKEND=sqlite) ---
+# Each table is "kv_<TableName>" (pk, sk, item JSON), WITHOUT ROWID, so a key lookup is a
+# single primary-key probe. GSIs become expression indexes over json_extract(). Numbers
+# are stored tagged and come back as Decimal, exactly like boto3 returns them.
+# Writes run in BEGIN IMMEDIATE transactions; conditions are evaluated in Python on the
+# current item inside that transaction.
+
+GET_MANY_CHUNK = 400
+_MISSING = object()
+
+
+# 🔤 JSON with Decimal / set round-tripping ############################
+def _encode_default(value):
+    if isinstance(value, Decimal):
+        return {"$N": str(value)}
+    if isinstance(value, (set, frozenset)):
+        return {"$SET": sorted(value, key=str)}
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _decode_hook(obj):
+    if len(obj) == 1:
+        if "$N" in obj:
+            return Decimal(obj["$N"])
+        if "$SET" in obj:
+            return set(obj["$SET"])
+    return obj
+
+
+def _dumps(item):
+    return json.dumps(item, default=_encode_default, separators=(",", ":"))
+
+
+def _loads(text):
+    return json.loads(text, object_hook=_decode_hook)
+
+
+def _normalize(value):
+    """Numbers become Decimal, as DynamoDB would hand them back."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {_normalize(v) for v in value}
+    return value
+
+
+def _key_value(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+# 🧮 boto3 condition objects, evaluated against a plain item ###########
+def _lookup(item, path):
+    value = item
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _operand(value, item):
+    return _lookup(item, value.name) if isinstance(value, AttributeBase) else value
+
+
+def _comparable(a, b):
+    numbers = (int, float, Decimal)
+    if a is _MISSING or b is _MISSING or isinstance(a, bool) or isinstance(b, bool):
+        return False
+    return (isinstance(a, numbers) and isinstance(b, numbers)) or type(a) == type(b)
+
+
+_TYPE_CHECKS = {
+    "S": lambda v: isinstance(v, str),
+    "N": lambda v: isinstance(v, (int, float, Decimal)) and not isinstance(v, bool),
+    "BOOL": lambda v: isinstance(v, bool),
+    "NULL": lambda v: v is None,
+    "L": lambda v: isinstance(v, list),
+    "M": lambda v: isinstance(v, dict),
+    "SS": lambda v: isinstance(v, set),
+}
+
+
+def evaluate(condition, item) -> bool:
+    expression = condition.get_expression()
+    op, values = expression["operator"], expression["values"]
+    if op == "AND":
+        return evaluate(values[0], item) and evaluate(values[1], item)
+    if op == "OR":
+        return evaluate(values[0], item) or evaluate(values[1], item)
+    if op == "NOT":
+        return not evaluate(values[0], item)
+
+    operands = [_operand(v, item) for v in values]
+    a = operands[0]
+    if op == "attribute_exists":
+        return a is not _MISSING
+    if op == "attribute_not_exists":
+        return a is _MISSING
+    if op == "attribute_type":
+        return a is not _MISSING and _TYPE_CHECKS[operands[1]](a)
+    if op == "=":
+        return a is not _MISSING and a == operands[1]
+    if op == "<>":
+        return a != operands[1]
+    if op in ("<", "<=", ">", ">="):
+        b = operands[1]
+        if not _comparable(a, b):
+            return False
+        return {"<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[op]
+    if op == "BETWEEN":
+        low, high = operands[1], operands[2]
+        return _comparable(a, low) and _comparable(a, high) and low <= a <= high
+    if op == "IN":
+        return a is not _MISSING and a in operands[1]
+    if op == "begins_with":
+        return isinstance(a, str) and a.startswith(operands[1])
+    if op == "contains":
+        return a is not _MISSING and isinstance(a, (str, list, set)) and operands[1] in a
+    raise NotImplementedError(f"Condition operator {op} is not supported by the SQLite store")
+
+
+def _range_sql(condition, column):
+    """Key condition on the sort key -> (sql, params)."""
+    expression = condition.get_expression()
+    op, values = expression["operator"], [_key_value(v) for v in expression["values"][1:]]
+    if op in ("=", "<", "<=", ">", ">="):
+        return f"{column} {op} ?", values
+    if op == "BETWEEN":
+        return f"{column} BETWEEN ? AND ?", values
+    if op == "begins_with":
+        return f"{column} >= ? AND substr({column}, 1, ?) = ?", [values[0], len(values[0]), values[0]]
+    raise NotImplementedError(f"Key condition {op} is not supported by the SQLite store")
+
+
+# 🔌 Connections come from database.store_engine's pool; every table shares it, so one
+# BEGIN IMMEDIATE transaction can cover writes to several tables
+@contextmanager
+def _cursor():
+    connection = store_engine.raw_connection()
+    try:
+        yield connection.cursor()
+    finally:
+        connection.close()
+
+
+@contextmanager
+def _write():
+    with _cursor() as cur:
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            yield cur
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
+
+def _apply_update(item, set_values=None, add_values=None, remove_attrs=None):
+    for attr, value in (set_values or {}).items():
+        item[attr] = _normalize(value)
+    for attr, value in (add_values or {}).items():
+        value = _normalize(value)
+        current = item.get(attr)
+        if isinstance(value, (set, frozenset)):
+            item[attr] = (current or set()) | value
+        else:
+            item[attr] = (current if current is not None else Decimal("0")) + value
+    for attr in remove_attrs or []:
+        item.pop(attr, None)
+    return item
+
+
+class SQLiteRepository(Repository):
+    backend = "sqlite"
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.sql_table = f'"kv_{spec.name}"'
+        self._create()
+
+    def _create(self):
+        with _cursor() as cur:
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.sql_table} "
+                "(pk NOT NULL, sk NOT NULL DEFAULT '', item TEXT NOT NULL, PRIMARY KEY (pk, sk)) WITHOUT ROWID"
+            )
+            for name, (hash_attr, range_attr) in self.spec.indexes.items():
+                columns = ", ".join(self._json_column(a) for a in (hash_attr, range_attr) if a)
+                cur.execute(f'CREATE INDEX IF NOT EXISTS "ix_{self.spec.name}_{name}" ON {self.sql_table} ({columns})')
+
+    @staticmethod
+    def _json_column(attr):
+        return f"json_extract(item, '$.{attr}')"
+
+    def _row_key(self, key):
+        hash_value = _key_value(key[self.spec.hash_key])
+        range_value = _key_value(key[self.spec.range_key]) if self.spec.range_key else ""
+        return hash_value, range_value
+
+    def _read(self, cur, key):
+        row = cur.execute(f"SELECT item FROM {self.sql_table} WHERE pk = ? AND sk = ?", self._row_key(key)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def _store(self, cur, item):
+        cur.execute(f"INSERT OR REPLACE INTO {self.sql_table} (pk, sk, item) VALUES (?, ?, ?)", (*self._row_key(item), _dumps(item)))
+
+    @staticmethod
+    def _project(item, attributes):
+        if not attributes or item is None:
+            return item
+        return {a: item[a] for a in attributes if a in item}
+
+    # Single items ######################################################
+    @timed
+    def get(self, key, attributes=None, consistent=False):
+        with _cursor() as cur:
+            return self._project(self._read(cur, key), attributes)
+
+    @timed
+    def put(self, item, condition=None):
+        item = _normalize(item)
+        with _write() as cur:
+            if condition is not None:
+                current = self._read(cur, item)
+                if not evaluate(condition, current or {}):
+                    raise ConditionFailed(item=current)
+            self._store(cur, item)
+
+    @timed
+    def update(self, key, set=None, add=None, remove=None, condition=None, return_values="ALL_NEW"):
+        with _write() as cur:
+            current = self._read(cur, key)
+            if condition is not None and not evaluate(condition, current or {}):
+                raise ConditionFailed(item=current)
+            updated = _apply_update(dict(current or _normalize(key)), set, add, remove)
+            self._store(cur, updated)
+
+        if return_values == "ALL_NEW":
+            return updated
+        if return_values == "UPDATED_NEW":
+            return {a: updated[a] for a in list(set or {}) + list(add or {}) if a in updated}
+        if return_values == "ALL_OLD":
+            return current
+        return None
+
+    @timed
+    def delete(self, key, condition=None):
+        with _write() as cur:
+            if condition is not None:
+                current = self._read(cur, key)
+                if not evaluate(condition, current or {}):
+                    raise ConditionFailed(item=current)
+            cur.execute(f"DELETE FROM {self.sql_table} WHERE pk = ? AND sk = ?", self._row_key(key))
+
+    # Many items ########################################################
+    @timed
+    def get_many(self, keys, attributes=None):
+        keys = [self._row_key(k) for k in keys]
+        found = []
+        with _cursor() as cur:
+            for i in range(0, len(keys), GET_MANY_CHUNK):
+                chunk = keys[i:i + GET_MANY_CHUNK]
+                placeholders = ", ".join("(?, ?)" for _ in chunk)
+                rows = cur.execute(
+                    f"SELECT item FROM {self.sql_table} WHERE (pk, sk) IN (VALUES {placeholders})",
+                    [v for pair in chunk for v in pair]
+                ).fetchall()
+                found.extend(self._project(_loads(r[0]), attributes) for r in rows)
+        return found
+
+    # Writes across tables: one local transaction each ##################
+    @classmethod
+    @timed
+    def put_items(cls, pairs):
+        rows = defaultdict(list)
+        for repo, item in pairs:
+            item = _normalize(item)
+            rows[repo].append((*repo._row_key(item), _dumps(item)))
+        with _write() as cur:
+            for repo, values in rows.items():
+                cur.executemany(f"INSERT OR REPLACE INTO {repo.sql_table} (pk, sk, item) VALUES (?, ?, ?)", values)
+        return 1
+
+    @classmethod
+    @timed
+    def transact_items(cls, pairs):
+        with _write() as cur:
+            pending, reasons = [], []
+            for repo, op in pairs:
+                key = op.get("update") or op.get("delete") or op.get("put")
+                current = repo._read(cur, key)
+                ok = op.get("condition") is None or evaluate(op["condition"], current or {})
+                reasons.append("None" if ok else "ConditionalCheckFailed")
+                pending.append((repo, op, current))
+            if any(r != "None" for r in reasons):
+                raise ConditionFailed(reasons=reasons)
+
+            for repo, op, current in pending:
+                if "put" in op:
+                    repo._store(cur, _normalize(op["put"]))
+                elif "update" in op:
+                    repo._store(cur, _apply_update(dict(current or _normalize(op["update"])), op.get("set"), op.get("add"), op.get("remove")))
+                else:
+                    cur.execute(f"DELETE FROM {repo.sql_table} WHERE pk = ? AND sk = ?", repo._row_key(op["delete"]))
+        return 1
+
+    # Reads over many items #############################################
+    def _page(self, rows, limit, filter, attributes, index_attrs):
+        more = limit is not None and len(rows) > limit
+        rows = rows[:limit] if limit is not None else rows
+        items = [_loads(r[0]) for r in rows]
+        last_key = None
+        if more and items:
+            last_key = self.spec.key_of(items[-1])
+            for attr in index_attrs:
+                if attr and attr in items[-1]:
+                    last_key[attr] = items[-1][attr]
+        if filter is not None:
+            items = [item for item in items if evaluate(filter, item)]
+        return Page([self._project(item, attributes) for item in items], last_key)
+
+    @timed
+    def query(self, hash_value, range_condition=None, index=None, filter=None, attributes=None,
+              descending=False, limit=None, start_key=None):
+        hash_attr, range_attr = self.spec.index_keys(index)
+        if index is None:
+            hash_col, order_cols = "pk", ["sk"]
+        else:
+            hash_col = self._json_column(hash_attr)
+            order_cols = ([self._json_column(range_attr)] if range_attr else []) + ["pk", "sk"]
+
+        where, params = [f"{hash_col} = ?"], [_key_value(hash_value)]
+        if range_condition is not None:
+            sql, values = _range_sql(range_condition, order_cols[0])
+            where.append(sql)
+            params.extend(values)
+        if start_key:
+            start = ([_key_value(start_key[range_attr])] if index is not None and range_attr else []) + list(self._row_key(start_key))
+            if index is None:
+                start = start[1:]
+            where.append(f"({', '.join(order_cols)}) {'<' if descending else '>'} ({', '.join('?' for _ in start)})")
+            params.extend(start)
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT item FROM {self.sql_table} WHERE {' AND '.join(where)} ORDER BY {', '.join(c + ' ' + direction for c in order_cols)}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        with _cursor() as cur:
+            rows = cur.execute(sql, params).fetchall()
+        return self._page(rows, limit, filter, attributes, (hash_attr, range_attr) if index else ())
+
+    @timed
+    def scan(self, filter=None, attributes=None, limit=None, start_key=None):
+        sql, params = f"SELECT item FROM {self.sql_table}", []
+        if start_key:
+            sql += " WHERE (pk, sk) > (?, ?)"
+            params.extend(self._row_key(start_key))
+        sql += " ORDER BY pk, sk"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        with _cursor() as cur:
+            rows = cur.execute(sql, params).fetchall()
+        return self._page(rows, limit, filter, attributes, ())
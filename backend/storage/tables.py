@@ -0,0 +1,76 @@
+# tables.py
+
+import os
+import threading
+from backend.storage.base import TableSpec
+
+# STORAGE_BACKEND=dynamodb (default) or sqlite (single node / benchmarks, see database.py)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "dynamodb").lower()
+
+TABLES = {spec.name: spec for spec in [
+    # Journal + chat
+    TableSpec("JournalEntries", "user_id", "timestamp_utc"),
+    TableSpec("JournalLatest", "user_id"),
+    TableSpec("JournalCueSchedule", "user_id", "journal_timestamp"),
+    TableSpec("ChatMemory", "user_id", "timestamp", region=None),
+    # Habits
+    TableSpec("HabitFlowProgress", "user_id", "habit_id", indexes={"streak_due-index": ("streak_due", None)}),
+    TableSpec("HabitFlowSummary", "user_id"),
+    TableSpec("JobCheckpoints", "job"),
+    # Health
+    TableSpec("UserHealthData", "user_id", "date"),
+    # Auth (default boto3 region)
+    TableSpec("UserAuth", "username", region=None),
+    TableSpec("UserAuthEmails", "email", region=None),
+    TableSpec("UserData", "user_id"),
+    # Memory / goals scripts (default boto3 region)
+    TableSpec("UserMemory", "user_id", "date", region=None),
+    TableSpec("UserGoals", "user_id", "goal_id", region=None),
+    # Proactive prompts
+    TableSpec("ProactivePrompts", "user_id", "date"),
+    # Tweets
+    TableSpec("TweetRiskAnalysis", "tweet_id", indexes={"user_id-created_at-index": ("user_id", "created_at")}),
+    TableSpec("TweetWatermarks", "username"),
+    TableSpec("MonitoredHandles", "twitter_handle"),
+]}
+
+_repositories = {}
+_lock = threading.Lock()
+
+
+def repository(name: str):
+    """Shared repository for a table, on the configured backend."""
+    repo = _repositories.get(name)
+    if repo is not None:
+        return repo
+    with _lock:
+        repo = _repositories.get(name)
+        if repo is None:
+            spec = TABLES[name]
+            if STORAGE_BACKEND == "sqlite":
+                from backend.storage.sqlite import SQLiteRepository
+                repo = SQLiteRepository(spec)
+            else:
+                from backend.storage.dynamo import DynamoRepository
+                repo = DynamoRepository(spec)
+            _repositories[name] = repo
+        return repo
+
+
+# 🔀 Writes across tables (all on the configured backend) ##############
+def batch_put(items) -> int:
+    """items: [(table name, item)]. Unconditional puts in as few batch calls as possible;
+    returns the number of round trips."""
+    pairs = [(repository(name), item) for name, item in items]
+    if not pairs:
+        return 0
+    return type(pairs[0][0]).put_items(pairs)
+
+
+def transact(operations) -> int:
+    """Atomic writes across tables: repository transact() operations that also name
+    their "table". Raises ConditionFailed with one reason per operation."""
+    pairs = [(repository(op["table"]), op) for op in operations]
+    if not pairs:
+        return 0
+    return type(pairs[0][0]).transact_items(pairs)
@@ -0,0 +1,155 @@
+# unit_of_work.py
+
+import threading
+import time
+from backend.storage.base import ConditionFailed
+from backend.storage.tables import batch_put, repository, transact
+
+# --- Unit of work ---
+# Collects the unconditional puts / updates made while handling one request (or one
+# batch job) and writes them with as few round trips as possible on flush():
+#   * puts    -> batch writes, 25 items per call across tables, unprocessed items retried
+#   * updates -> transactions, 100 per call; a cancelled chunk falls back to single updates
+# Writes to the same item are merged first (a put followed by updates is one put).
+# Conditional writes still go straight to the repository: their caller needs the answer.
+#
+#   def handler(..., uow: UnitOfWork = Depends(unit_of_work)):
+#       ...
+#       uow.flush()                  # handlers flush before returning (see unit_of_work)
+#   with UnitOfWork() as uow: ...    # flushed on a clean exit
+
+TRANSACT_CHUNK = 100
+
+
+def _add(current, delta):
+    """DynamoDB ADD: numbers are summed (missing = 0), sets are unioned."""
+    if isinstance(delta, (set, frozenset)):
+        return (current or set()) | delta
+    return (current if current is not None else 0) + delta
+
+
+class UnitOfWork:
+    def __init__(self):
+        self._puts = {}       # (table, key) -> item
+        self._updates = {}    # (table, key) -> {"table", "update", "set", "add", "remove"}
+        self._after_flush = []
+        self._lock = threading.Lock()  # handlers may queue writes from a thread pool
+        self.stats = {"flushes": 0, "puts": 0, "updates": 0, "round_trips": 0}
+
+    @staticmethod
+    def _slot(table: str, item: dict):
+        return table, tuple(repository(table).spec.key_of(item).values())
+
+    def put(self, table: str, item: dict):
+        slot = self._slot(table, item)
+        with self._lock:
+            self._updates.pop(slot, None)  # overwritten anyway
+            self._puts[slot] = dict(item)
+
+    def update(self, table: str, key: dict, set: dict = None, add: dict = None, remove: list = None):
+        slot = self._slot(table, key)
+        with self._lock:
+            item = self._puts.get(slot)
+            if item is not None:
+                # Still only in memory: apply it to the pending put
+                item.update(set or {})
+                for attr, delta in (add or {}).items():
+                    item[attr] = _add(item.get(attr), delta)
+                for attr in remove or []:
+                    item.pop(attr, None)
+                return
+
+            pending = self._updates.setdefault(slot, {"table": table, "update": dict(key), "set": {}, "add": {}, "remove": []})
+            for attr, value in (set or {}).items():
+                pending["add"].pop(attr, None)
+                if attr in pending["remove"]:
+                    pending["remove"].remove(attr)
+                pending["set"][attr] = value
+            for attr, delta in (add or {}).items():
+                if attr in pending["set"]:
+                    pending["set"][attr] = _add(pending["set"][attr], delta)
+                elif attr in pending["remove"]:
+                    pending["remove"].remove(attr)
+                    pending["set"][attr] = _add(None, delta)
+                else:
+                    pending["add"][attr] = _add(pending["add"].get(attr), delta)
+            for attr in remove or []:
+                pending["set"].pop(attr, None)
+                pending["add"].pop(attr, None)
+                if attr not in pending["remove"]:
+                    pending["remove"].append(attr)
+
+    def after_flush(self, callback):
+        """Run callback() once the queued writes are stored (e.g. cache invalidation)."""
+        with self._lock:
+            self._after_flush.append(callback)
+
+    def __len__(self):
+        return len(self._puts) + len(self._updates)
+
+    def discard(self):
+        with self._lock:
+            self._puts, self._updates, self._after_flush = {}, {}, []
+
+    def flush(self) -> dict:
+        with self._lock:
+            puts, updates, callbacks = self._puts, self._updates, self._after_flush
+            self._puts, self._updates, self._after_flush = {}, {}, []
+
+        started = time.perf_counter()
+        round_trips = batch_put([(table, item) for (table, _), item in puts.items()])
+        round_trips += self._flush_updates([op for op in updates.values() if op["set"] or op["add"] or op["remove"]])
+
+        self.stats["flushes"] += 1
+        self.stats["puts"] += len(puts)
+        self.stats["updates"] += len(updates)
+        self.stats["round_trips"] += round_trips
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print("⚠️ after_flush callback failed:", e)
+        return {"puts": len(puts), "updates": len(updates), "round_trips": round_trips,
+                "ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    @staticmethod
+    def _single_update(op):
+        repository(op["table"]).update(op["update"], set=op["set"], add=op["add"], remove=op["remove"], return_values="NONE")
+
+    def _flush_updates(self, operations):
+        if not operations:
+            return 0
+        if len(operations) == 1:
+            # A one-item transaction costs twice the write capacity of a plain update
+            self._single_update(operations[0])
+            return 1
+        round_trips = 0
+        for i in range(0, len(operations), TRANSACT_CHUNK):
+            chunk = operations[i:i + TRANSACT_CHUNK]
+            try:
+                round_trips += transact(chunk)
+            except ConditionFailed:
+                # Nothing here is conditional, so this was a conflicting write; go one by one
+                for op in chunk:
+                    self._single_update(op)
+                    round_trips += 1
+        return round_trips
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+        return False
+
+
+# FastAPI dependency. Handlers call uow.flush() themselves before returning: when the
+# exit code below runs depends on the FastAPI version (before the response is sent on the
+# pinned 0.115, after it on 0.118+, where a failed flush would go unnoticed by the client).
+# The exit flush only picks up writes queued after that, e.g. by an early return.
+def unit_of_work():
+    with UnitOfWork() as uow:
+        yield uow
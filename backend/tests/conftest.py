@@ -0,0 +1,22 @@
+# conftest.py
+#
+# Behaviour tests for the storage layer and session tokens. They run against the SQLite
+# backend in a throwaway database, so no AWS access is needed:
+#   python -m pytest backend/tests        # from the repository root
+
+import os
+import tempfile
+import uuid
+import pytest
+
+# Read at import time by backend/database.py, backend/storage/tables.py and
+# backend/util/session_tokens.py, so set before any backend module is imported
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["STORE_DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="moodmate-tests-"), "store.db")
+os.environ["SESSION_SECRET"] = "test-secret"
+
+
+@pytest.fixture
+def user_id():
+    """A fresh hash key, so tests sharing a table never see each other's items."""
+    return f"user-{uuid.uuid4().hex[:8]}"
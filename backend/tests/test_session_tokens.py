@@ -0,0 +1,84 @@
+import time
+import pytest
+from fastapi import HTTPException
+from backend.util import session_tokens
+from backend.util.session_tokens import SessionTokenError, issue_token, resolve_user_id, session_user, verify_token
+
+
+def _replace_part(token, index, value):
+    parts = token.split(".")
+    parts[index] = value
+    return ".".join(parts)
+
+
+def test_issued_token_verifies_to_its_user():
+    token = issue_token("alice")
+    assert verify_token(token) == "alice"
+    assert verify_token(token) == "alice"  # second call is served from the cache
+
+
+def test_expired_token_is_rejected():
+    with pytest.raises(SessionTokenError, match="expired"):
+        verify_token(issue_token("alice", ttl=-1))
+
+
+def test_cached_token_is_rejected_once_it_expires(monkeypatch):
+    token = issue_token("alice", ttl=60)
+    assert verify_token(token) == "alice"
+
+    later = time.time() + 120
+    monkeypatch.setattr(session_tokens.time, "time", lambda: later)
+    with pytest.raises(SessionTokenError, match="expired"):
+        verify_token(token)
+
+
+def test_tampered_payload_is_rejected():
+    token = issue_token("alice")
+    forged_payload = issue_token("mallory").split(".")[1]
+    with pytest.raises(SessionTokenError, match="Invalid"):
+        verify_token(_replace_part(token, 1, forged_payload))
+
+
+def test_tampered_signature_or_version_is_rejected():
+    token = issue_token("alice")
+    signature = token.split(".")[2]
+    with pytest.raises(SessionTokenError, match="Invalid"):
+        verify_token(_replace_part(token, 2, signature[:-1] + ("A" if signature[-1] != "A" else "B")))
+    with pytest.raises(SessionTokenError, match="Invalid"):
+        verify_token(_replace_part(token, 0, "v2"))
+
+
+def test_token_signed_with_another_secret_is_rejected(monkeypatch):
+    monkeypatch.setattr(session_tokens, "SESSION_SECRET", "another-secret")
+    token = issue_token("alice")
+    monkeypatch.undo()
+    with pytest.raises(SessionTokenError, match="Invalid"):
+        verify_token(token)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", "v1.only-two"])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(SessionTokenError, match="Malformed"):
+        verify_token(token)
+
+
+def test_session_user_reads_the_bearer_header():
+    assert session_user("Bearer " + issue_token("alice")) == "alice"
+    with pytest.raises(HTTPException) as failed:
+        session_user("Bearer " + issue_token("alice", ttl=-1))
+    assert failed.value.status_code == 401
+
+
+def test_missing_token_is_rejected_unless_the_fallback_is_enabled(monkeypatch):
+    monkeypatch.setattr(session_tokens, "REQUIRE_SESSION_TOKEN", True)
+    with pytest.raises(HTTPException) as failed:
+        session_user(None)
+    assert failed.value.status_code == 401
+
+    monkeypatch.setattr(session_tokens, "REQUIRE_SESSION_TOKEN", False)
+    assert session_user(None) is None
+    assert resolve_user_id(None, "bob") == "bob"
+
+
+def test_verified_token_wins_over_a_claimed_user_id():
+    assert resolve_user_id(session_user("Bearer " + issue_token("alice")), "bob") == "alice"
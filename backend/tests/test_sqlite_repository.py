@@ -0,0 +1,149 @@
+from decimal import Decimal
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from backend.storage import ConditionFailed, repository
+
+journal_repo = repository("JournalEntries")      # user_id (HASH), timestamp_utc (RANGE)
+habit_repo = repository("HabitFlowProgress")     # streak_due-index: streak_due (HASH)
+tweet_repo = repository("TweetRiskAnalysis")     # user_id-created_at-index: user_id, created_at
+
+
+def _entries(user_id, count):
+    items = [{"user_id": user_id, "timestamp_utc": f"2025-07-{day:02d}T08:00:00", "score": day} for day in range(1, count + 1)]
+    for item in items:
+        journal_repo.put(item)
+    return items
+
+
+# --- Single items ---
+def test_get_returns_what_put_stored_with_decimal_numbers(user_id):
+    journal_repo.put({"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00", "score": 3, "ratio": 0.5, "tags": {"a", "b"}})
+
+    item = journal_repo.get({"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"})
+    assert item["score"] == Decimal("3") and isinstance(item["score"], Decimal)
+    assert item["ratio"] == Decimal("0.5")
+    assert item["tags"] == {"a", "b"}
+    assert journal_repo.get({"user_id": user_id, "timestamp_utc": "2025-07-02T08:00:00"}) is None
+
+
+def test_get_projects_attributes(user_id):
+    journal_repo.put({"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00", "score": 3, "text": "long"})
+
+    assert journal_repo.get({"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}, attributes=["score"]) == {"score": Decimal("3")}
+
+
+def test_put_replaces_the_whole_item(user_id):
+    key = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}
+    journal_repo.put({**key, "score": 1, "text": "first"})
+    journal_repo.put({**key, "score": 2})
+
+    assert journal_repo.get(key) == {**key, "score": Decimal("2")}
+
+
+def test_conditional_put_fails_with_the_stored_item(user_id):
+    item = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00", "score": 1}
+    journal_repo.put(item, condition=Attr("user_id").not_exists())
+
+    with pytest.raises(ConditionFailed) as failed:
+        journal_repo.put({**item, "score": 2}, condition=Attr("user_id").not_exists())
+    assert failed.value.item["score"] == Decimal("1")
+    assert journal_repo.get(item)["score"] == Decimal("1")
+
+
+def test_update_adds_sets_and_removes(user_id):
+    key = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}
+    journal_repo.put({**key, "score": 1, "draft": True})
+
+    item = journal_repo.update(key, add={"score": 2, "views": 1}, set={"text": "hi"}, remove=["draft"])
+    assert item == {**key, "score": Decimal("3"), "views": Decimal("1"), "text": "hi"}
+
+
+def test_conditional_update_leaves_the_item_alone(user_id):
+    key = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}
+    journal_repo.put({**key, "score": 1})
+
+    with pytest.raises(ConditionFailed):
+        journal_repo.update(key, add={"score": 1}, condition=Attr("score").gt(5))
+    assert journal_repo.get(key)["score"] == Decimal("1")
+
+
+# --- Paged queries ---
+def _all_pages(query, **kwargs):
+    pages, start_key = [], None
+    while True:
+        page = query(start_key=start_key, **kwargs)
+        pages.append(page.items)
+        start_key = page.last_key
+        if not start_key:
+            return pages
+
+
+def test_query_pages_through_the_table_in_range_order(user_id):
+    _entries(user_id, 5)
+
+    pages = _all_pages(lambda **kw: journal_repo.query(user_id, limit=2, **kw))
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [i["score"] for p in pages for i in p] == [1, 2, 3, 4, 5]
+
+    pages = _all_pages(lambda **kw: journal_repo.query(user_id, limit=2, descending=True, **kw))
+    assert [i["score"] for p in pages for i in p] == [5, 4, 3, 2, 1]
+
+
+def test_query_range_condition_and_filter(user_id):
+    _entries(user_id, 5)
+
+    page = journal_repo.query(user_id, range_condition=Key("timestamp_utc").between("2025-07-02", "2025-07-04T23"))
+    assert [i["score"] for i in page.items] == [2, 3, 4]
+
+    page = journal_repo.query(user_id, filter=Attr("score").gte(4))
+    assert [i["score"] for i in page.items] == [4, 5]
+
+
+def test_query_index_with_range_key_pages_in_range_order(user_id):
+    for n in range(5):
+        tweet_repo.put({"tweet_id": f"{user_id}-{n}", "user_id": user_id, "created_at": f"2025-07-0{5 - n}T00:00:00Z"})
+    tweet_repo.put({"tweet_id": f"{user_id}-other", "user_id": user_id + "-other", "created_at": "2025-07-03T00:00:00Z"})
+
+    pages = _all_pages(lambda **kw: tweet_repo.query(user_id, index="user_id-created_at-index", limit=2, descending=True, **kw))
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [i["created_at"][:10] for p in pages for i in p] == [f"2025-07-0{d}" for d in (5, 4, 3, 2, 1)]
+
+
+def test_query_hash_only_index_pages_every_item_once(user_id):
+    due = "2025-07-01"
+    ids = [f"{user_id}-{n}" for n in range(5)]
+    for habit_id in ids:
+        habit_repo.put({"user_id": user_id, "habit_id": habit_id, "streak_due": due})
+    habit_repo.put({"user_id": user_id, "habit_id": f"{user_id}-no-due"})  # sparse: not in the index
+
+    pages = _all_pages(lambda **kw: habit_repo.query(due, index="streak_due-index", limit=2, **kw))
+    found = [i["habit_id"] for p in pages for i in p if i["user_id"] == user_id]
+    assert sorted(found) == ids
+
+
+# --- Transactions ---
+def test_transact_applies_every_operation(user_id):
+    key = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}
+    journal_repo.put({**key, "score": 1})
+
+    journal_repo.transact([
+        {"update": key, "add": {"score": 1}},
+        {"put": {"user_id": user_id, "timestamp_utc": "2025-07-02T08:00:00", "score": 7}, "condition": Attr("user_id").not_exists()},
+    ])
+    assert journal_repo.get(key)["score"] == Decimal("2")
+    assert journal_repo.get({"user_id": user_id, "timestamp_utc": "2025-07-02T08:00:00"})["score"] == Decimal("7")
+
+
+def test_transact_rolls_back_when_one_condition_fails(user_id):
+    key = {"user_id": user_id, "timestamp_utc": "2025-07-01T08:00:00"}
+    journal_repo.put({**key, "score": 1})
+
+    with pytest.raises(ConditionFailed) as failed:
+        journal_repo.transact([
+            {"update": key, "add": {"score": 1}},
+            {"put": {"user_id": user_id, "timestamp_utc": "2025-07-02T08:00:00"}},
+            {"delete": key, "condition": Attr("score").gt(5)},
+        ])
+    assert failed.value.reasons == ["None", "None", "ConditionalCheckFailed"]
+    assert journal_repo.get(key)["score"] == Decimal("1")
+    assert journal_repo.get({"user_id": user_id, "timestamp_utc": "2025-07-02T08:00:00"}) is None
@@ -0,0 +1,130 @@
+import importlib
+from decimal import Decimal
+import pytest
+from backend.storage import UnitOfWork, UnprocessedWrites, repository
+from backend.storage import dynamo
+from backend.storage.base import TableSpec
+
+# backend.storage re-exports the unit_of_work dependency under the module's own name
+uow_module = importlib.import_module("backend.storage.unit_of_work")
+
+summary_repo = repository("HabitFlowSummary")    # user_id (HASH)
+habit_repo = repository("HabitFlowProgress")     # user_id (HASH), habit_id (RANGE)
+
+
+# --- Merging ---
+def test_updates_to_one_item_merge_into_one_write(user_id):
+    uow = UnitOfWork()
+    uow.update(summary_repo.name, {"user_id": user_id}, add={"total_streak": Decimal("1")})
+    uow.update(summary_repo.name, {"user_id": user_id}, add={"total_streak": Decimal("2"), "level_1": Decimal("1")})
+    uow.update(summary_repo.name, {"user_id": user_id}, set={"note": "x"})
+
+    result = uow.flush()
+    assert (result["puts"], result["updates"], result["round_trips"]) == (0, 1, 1)
+    assert summary_repo.get({"user_id": user_id}) == {
+        "user_id": user_id, "total_streak": Decimal("3"), "level_1": Decimal("1"), "note": "x"}
+
+
+def test_set_then_add_and_remove_then_add_follow_write_order(user_id):
+    summary_repo.put({"user_id": user_id, "a": Decimal("10"), "b": Decimal("10")})
+    uow = UnitOfWork()
+    uow.update(summary_repo.name, {"user_id": user_id}, set={"a": Decimal("1")})
+    uow.update(summary_repo.name, {"user_id": user_id}, add={"a": Decimal("1")})      # 1 + 1, not 10 + 1
+    uow.update(summary_repo.name, {"user_id": user_id}, remove=["b"])
+    uow.update(summary_repo.name, {"user_id": user_id}, add={"b": Decimal("5")})      # missing counts as 0
+    uow.flush()
+
+    item = summary_repo.get({"user_id": user_id})
+    assert (item["a"], item["b"]) == (Decimal("2"), Decimal("5"))
+
+
+def test_updates_after_a_put_are_applied_to_the_pending_put(user_id):
+    key = {"user_id": user_id, "habit_id": "h1"}
+    uow = UnitOfWork()
+    uow.put(habit_repo.name, {**key, "streak_days": Decimal("1"), "draft": True})
+    uow.update(habit_repo.name, key, add={"streak_days": Decimal("1"), "tags": {"a"}}, remove=["draft"])
+
+    result = uow.flush()
+    assert (result["puts"], result["updates"]) == (1, 0)
+    assert habit_repo.get(key) == {**key, "streak_days": Decimal("2"), "tags": {"a"}}
+
+
+def test_a_put_replaces_queued_updates(user_id):
+    key = {"user_id": user_id, "habit_id": "h1"}
+    uow = UnitOfWork()
+    uow.update(habit_repo.name, key, add={"streak_days": Decimal("5")})
+    uow.put(habit_repo.name, {**key, "streak_days": Decimal("1")})
+
+    assert len(uow) == 1
+    uow.flush()
+    assert habit_repo.get(key)["streak_days"] == Decimal("1")
+
+
+# --- Flushing ---
+def test_flush_writes_everything_across_tables_and_runs_callbacks(user_id):
+    ran = []
+    uow = UnitOfWork()
+    for n in range(3):
+        uow.put(habit_repo.name, {"user_id": user_id, "habit_id": f"h{n}"})
+    uow.update(summary_repo.name, {"user_id": user_id}, add={"active_habits": Decimal("3")})
+    uow.update(summary_repo.name, {"user_id": user_id + "-2"}, add={"active_habits": Decimal("1")})
+    uow.after_flush(lambda: ran.append(len(habit_repo.query_all(user_id))))
+
+    assert not ran and habit_repo.query_all(user_id) == []  # nothing is written before flush()
+    result = uow.flush()
+    assert (result["puts"], result["updates"]) == (3, 2)
+    assert ran == [3]
+    assert summary_repo.get({"user_id": user_id})["active_habits"] == Decimal("3")
+    assert len(uow) == 0 and uow.flush()["round_trips"] == 0
+
+
+def test_context_manager_flushes_on_success_and_discards_on_error(user_id):
+    with UnitOfWork() as uow:
+        uow.put(habit_repo.name, {"user_id": user_id, "habit_id": "kept"})
+
+    with pytest.raises(RuntimeError):
+        with UnitOfWork() as uow:
+            uow.put(habit_repo.name, {"user_id": user_id, "habit_id": "dropped"})
+            raise RuntimeError("handler failed")
+
+    assert [i["habit_id"] for i in habit_repo.query_all(user_id)] == ["kept"]
+
+
+def test_flush_raises_unprocessed_writes_and_skips_callbacks(user_id, monkeypatch):
+    def failing_batch_put(items):
+        raise UnprocessedWrites([item for _, item in items])
+
+    monkeypatch.setattr(uow_module, "batch_put", failing_batch_put)
+    ran = []
+    uow = UnitOfWork()
+    uow.put(habit_repo.name, {"user_id": user_id, "habit_id": "h1"})
+    uow.after_flush(lambda: ran.append(True))
+
+    with pytest.raises(UnprocessedWrites) as failed:
+        uow.flush()
+    assert failed.value.items == [{"user_id": user_id, "habit_id": "h1"}]
+    assert ran == []
+
+
+# --- DynamoDB batch writes give up with UnprocessedWrites ---
+class _ThrottledDynamo:
+    def __init__(self):
+        self.calls = 0
+
+    def batch_write_item(self, RequestItems):
+        self.calls += 1
+        return {"UnprocessedItems": RequestItems}  # never gets anything through
+
+
+def test_dynamo_batch_put_retries_then_raises_unprocessed_writes(monkeypatch):
+    throttled = _ThrottledDynamo()
+    monkeypatch.setattr(dynamo.services, "dynamodb", lambda region=None: throttled)
+    monkeypatch.setattr(dynamo, "BATCH_WRITE_RETRIES", 2)
+    monkeypatch.setattr(dynamo, "BATCH_WRITE_BACKOFF", 0)
+    repo = dynamo.DynamoRepository(TableSpec("HabitFlowSummary", "user_id"))
+
+    items = [{"user_id": f"u{n}"} for n in range(3)]
+    with pytest.raises(UnprocessedWrites) as failed:
+        dynamo.DynamoRepository.put_items([(repo, item) for item in items])
+    assert throttled.calls == 3  # the first call plus two retries
+    assert sorted(i["user_id"] for i in failed.value.items) == ["u0", "u1", "u2"]
@@ -0,0 +1,87 @@
+# alert_hub.py
+
+import asyncio
+import threading
+
+# --- Alert State ---
+# {
+#   "show_popup": False,
+#   "support_message": None,
+#   "risky_tweet_text": None,
+#   "last_checked": None
+# }
+# One state per user plus a version counter. Clients waiting on a user (SSE or
+# long-poll) park a single future here; publish() resolves them from any thread.
+
+ALERT_FIELDS = ("show_popup", "support_message", "risky_tweet_text")
+
+
+def empty_alert_state():
+    return {
+        "show_popup": False,
+        "support_message": None,
+        "risky_tweet_text": None,
+        "last_checked": None
+    }
+
+
+class AlertHub:
+    def __init__(self):
+        self._states = {}    # user_id -> (version, state)
+        self._waiters = {}   # user_id -> set of (loop, future)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str):
+        with self._lock:
+            return self._states.get(user_id, (0, empty_alert_state()))
+
+    # 📣 Called by the scheduler threads. Only alert changes wake waiting clients;
+    # a check that merely refreshes last_checked is stored silently.
+    def publish(self, user_id: str, **changes):
+        with self._lock:
+            version, state = self._states.get(user_id, (0, empty_alert_state()))
+            new_state = {**state, **changes}
+            changed = any(new_state[f] != state[f] for f in ALERT_FIELDS)
+            if changed:
+                version += 1
+            self._states[user_id] = (version, new_state)
+            waiters = self._waiters.pop(user_id, ()) if changed else ()
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, (version, new_state))
+        return version
+
+    async def wait(self, user_id: str, since: int, timeout: float):
+        """Return (version, state) as soon as version > since, or the current state on timeout."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            current = self._states.get(user_id, (0, empty_alert_state()))
+            if current[0] > since:
+                return current
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.setdefault(user_id, set()).add(waiter)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self.get(user_id)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(user_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[user_id]
+
+    def waiting_clients(self) -> int:
+        with self._lock:
+            return sum(len(w) for w in self._waiters.values())
+
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+alert_hub = AlertHub()
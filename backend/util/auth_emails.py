@@ -0,0 +1,25 @@
+# auth_emails.py
+
+from backend.storage import repository
+
+# --- Email -> user index ---
+# UserAuth is keyed by username (a uuid), so email lookups used to be full scans.
+# UserAuthEmails holds one item per normalized email {"email": ..., "username": ...}.
+# Signup writes it in the same transaction as the user, which also makes a second
+# signup with the same email fail atomically. backend/auth_email_backfill.py indexes
+# users created before this table existed.
+
+USER_TABLE = "UserAuth"
+EMAIL_TABLE = "UserAuthEmails"   # email (HASH)
+
+user_repo = repository(USER_TABLE)
+email_repo = repository(EMAIL_TABLE)
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def lookup_username(email: str):
+    item = email_repo.get({"email": normalize_email(email)}, consistent=True)
+    return item["username"] if item else None
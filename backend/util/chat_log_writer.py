@@ -0,0 +1,165 @@
+# chat_log_writer.py
+
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+# --- Log Layout ---
+# chat_log.json                      <- active file, one JSON record per line
+# chat_log.2025-07-20.1.json.gz      <- rotated + gzipped (by size or by day)
+# chat_log.2025-07-21.1.json.gz
+# chat_log.flask.json                <- the Flask app's own log (app.py), rotated the same way
+
+DEFAULT_LOG_PATH = "chat_log.json"
+
+
+class ChatLogWriter:
+    """Buffers chat log records in memory and appends them to disk from a background thread."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOG_PATH,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_daily: bool = True,
+        max_queue: int = 10000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = object()
+
+    # 📝 Called on the request path: never touches the disk
+    def write(self, record: dict) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(self._stop)
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                record = None
+
+            if record is self._stop:
+                self._flush(batch)
+                return
+            if record is not None:
+                batch.append(record)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self._rotate_if_needed()
+            lines = "".join(json.dumps(record, default=str) + "\n" for record in batch)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except Exception as e:
+            print("❌ Chat log flush error:", e)
+
+    # 🔄 Rotate when the active file is too big or was started on a previous day
+    def _rotate_if_needed(self):
+        if not os.path.exists(self.path):
+            return
+        stat = os.stat(self.path)
+        file_day = datetime.utcfromtimestamp(stat.st_mtime).strftime("%Y-%m-%d")
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+
+        too_big = self.max_bytes and stat.st_size >= self.max_bytes
+        new_day = self.rotate_daily and file_day != today
+        if too_big or new_day:
+            self._rotate(file_day)
+
+    def _rotate(self, day: str):
+        stem, ext = os.path.splitext(self.path)
+        n = 1
+        while os.path.exists(f"{stem}.{day}.{n}{ext}.gz"):
+            n += 1
+        target = f"{stem}.{day}.{n}{ext}.gz"
+
+        with open(self.path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        print(f"🗜️ Rotated chat log → {target}")
+
+
+def _rotated_sort_key(path: str):
+    # chat_log.<day>.<n>.json.gz -> (day, n)
+    parts = os.path.basename(path).split(".")
+    try:
+        return parts[-4], int(parts[-3])
+    except (IndexError, ValueError):
+        return parts[0], 0
+
+
+# 📖 Streams records oldest → newest across rotated archives and the active file
+def read_chat_logs(path: str = DEFAULT_LOG_PATH, include_rotated: bool = True):
+    stem, ext = os.path.splitext(path)
+    files = []
+    if include_rotated:
+        files = sorted(glob.glob(f"{glob.escape(stem)}.*{ext}.gz"), key=_rotated_sort_key)
+    if os.path.exists(path):
+        files.append(path)
+
+    for file_path in files:
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+# FastAPI chat log. Rotation renames the active file without any cross-process locking,
+# so every process must write its own path (the Flask app uses FLASK_CHAT_LOG_PATH).
+chat_log_writer = ChatLogWriter(os.getenv("CHAT_LOG_PATH", DEFAULT_LOG_PATH))
@@ -1,11 +1,11 @@
 # goal_manager.py
 
-import boto3
 from datetime import datetime
 from uuid import uuid4
+from boto3.dynamodb.conditions import Attr
+from backend.storage import repository
 
-dynamodb = boto3.resource('dynamodb')
-goal_table = dynamodb.Table('UserGoals')
+goal_repo = repository('UserGoals')
 
 # --- Goal Schema ---
 # {
@@ -29,48 +29,37 @@ def create_goal(user_id: str, goal_type: str):
         "created_at": datetime.utcnow().isoformat(),
         "last_triggered": None
     }
-    goal_table.put_item(Item=goal)
+    goal_repo.put(goal)
     print(f"🎯 Created goal: {goal_type} for {user_id}")
     return goal
 
 
 # 🔍 Get all active goals
 def get_active_goals(user_id: str):
-    response = goal_table.scan()
-    return [
-        item for item in response.get("Items", [])
-        if item.get("user_id") == user_id and item.get("status") == "active"
-    ]
+    return goal_repo.query_all(user_id, filter=Attr("status").eq("active"))
 
 
 # ✅ Mark goal complete
 def complete_goal(user_id: str, goal_type: str):
-    response = goal_table.scan()
-    for item in response.get("Items", []):
-        if item["user_id"] == user_id and item["goal_type"] == goal_type and item["status"] == "active":
-            goal_table.update_item(
-                Key={"user_id": item["user_id"], "goal_id": item["goal_id"]},
-                UpdateExpression="SET #s = :val",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={":val": "completed"}
-            )
-            print(f"🏁 Completed goal: {goal_type}")
-            return True
+    goals = goal_repo.query_all(user_id, filter=Attr("goal_type").eq(goal_type) & Attr("status").eq("active"))
+    for item in goals:
+        goal_repo.update(
+            {"user_id": item["user_id"], "goal_id": item["goal_id"]},
+            set={"status": "completed"},
+            return_values="NONE"
+        )
+        print(f"🏁 Completed goal: {goal_type}")
+        return True
     return False
 
 
 # 📈 Increment progress and auto-complete at threshold
 def increment_goal_progress(user_id: str, goal_id: str, increment: int = 1, complete_at: int = 3):
-    # Increment progress
-    goal_table.update_item(
-        Key={"user_id": user_id, "goal_id": goal_id},
-        UpdateExpression="SET progress = if_not_exists(progress, :zero) + :inc",
-        ExpressionAttributeValues={":inc": increment, ":zero": 0}
-    )
+    # Increment progress; the updated item comes back, so no second read
+    goal = goal_repo.update({"user_id": user_id, "goal_id": goal_id}, add={"progress": increment})
     print(f"📊 Incremented progress for goal {goal_id}")
 
     # Check if completed
-    goal = goal_table.get_item(Key={"user_id": user_id, "goal_id": goal_id}).get("Item")
     if goal and goal.get("progress", 0) >= complete_at:
         complete_goal(user_id, goal.get("goal_type"))
         return "🎉 Goal completed!"
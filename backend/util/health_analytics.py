@@ -0,0 +1,144 @@
+# health_analytics.py
+
+import numpy as np
+
+# --- Health vs mood analytics ---
+# Inputs are plain per-day samples (ISO date strings + floats). Everything is laid out
+# on one continuous daily axis (NaN = no sample) so rollups, rolling means and lagged
+# correlations are whole-array NumPy operations, whatever the history length.
+
+
+def _to_days(dates):
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+def daily_series(dates, values):
+    """Average duplicate days. Returns (unique days, per-day mean)."""
+    if len(dates) == 0:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    days = _to_days(dates)
+    values = np.asarray(values, dtype=float)
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    sums = np.bincount(inverse, weights=np.nan_to_num(values), minlength=len(unique_days))
+    counts = np.bincount(inverse, weights=~np.isnan(values), minlength=len(unique_days))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return unique_days, sums / counts
+
+
+def align(start, end, days, values):
+    """Scatter (days, values) onto the daily axis start..end, NaN where missing."""
+    axis = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    out = np.full(len(axis), np.nan)
+    if len(days):
+        out[(days - start).astype(int)] = values
+    return axis, out
+
+
+def grouped_mean(groups, values):
+    mask = ~np.isnan(values)
+    if not mask.any():
+        return np.array([], dtype=groups.dtype), np.array([])
+    unique_groups, inverse = np.unique(groups[mask], return_inverse=True)
+    sums = np.bincount(inverse, weights=values[mask])
+    counts = np.bincount(inverse)
+    return unique_groups, sums / counts
+
+
+def rollup(axis, values, period: str):
+    """Mean per ISO week (period='W', keyed by Monday) or calendar month ('M')."""
+    if period == "W":
+        # datetime64 day 0 (1970-01-01) is a Thursday; shift so weeks start on Monday
+        ordinals = axis.astype(int)
+        groups = ordinals - (ordinals + 3) % 7
+        keys, means = grouped_mean(groups, values)
+        keys = keys.astype("datetime64[D]")
+    else:
+        keys, means = grouped_mean(axis.astype("datetime64[M]"), values)
+    return keys, means
+
+
+def rolling_mean(values, window: int = 7, min_periods: int = 3):
+    """NaN-aware trailing mean via cumulative sums."""
+    mask = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(mask, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(mask)))
+    idx = np.arange(1, len(values) + 1)
+    lo = np.maximum(idx - window, 0)
+    sums = csum[idx] - csum[lo]
+    counts = ccount[idx] - ccount[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = sums / counts
+    out[counts < min_periods] = np.nan
+    return out
+
+
+def lagged_correlations(x, y, max_lag: int = 7, min_pairs: int = 5):
+    """Pearson r between x[t] and y[t + lag] for lag = 0..max_lag."""
+    results = []
+    n = len(x)
+    for lag in range(max_lag + 1):
+        if lag >= n:
+            break
+        xs, ys = x[:n - lag], y[lag:]
+        mask = ~(np.isnan(xs) | np.isnan(ys))
+        pairs = int(mask.sum())
+        r = None
+        if pairs >= min_pairs:
+            xm, ym = xs[mask], ys[mask]
+            xd, yd = xm - xm.mean(), ym - ym.mean()
+            denom = np.sqrt((xd * xd).sum() * (yd * yd).sum())
+            if denom > 0:
+                r = float((xd * yd).sum() / denom)
+        results.append({"lag_days": lag, "r": None if r is None else round(r, 4), "pairs": pairs})
+    return results
+
+
+def _clean(values):
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def _series_json(keys, values):
+    return [{"period": str(k), "mean": v} for k, v in zip(keys, _clean(values))]
+
+
+def compute_health_mood_insights(health, mood, max_lag: int = 7, window: int = 7):
+    """
+    health: {"dates": [...], "sleep": [...], "hrv": [...]}
+    mood:   {"dates": [...], "risk": [...]}   (journal confidence_score per entry)
+    """
+    sleep_days, sleep = daily_series(health["dates"], health["sleep"])
+    hrv_days, hrv = daily_series(health["dates"], health["hrv"])
+    mood_days, risk = daily_series(mood["dates"], mood["risk"])
+
+    all_days = np.concatenate([sleep_days, mood_days])
+    if len(all_days) == 0:
+        return {"days": 0, "message": "No health or journal data yet."}
+    start, end = all_days.min(), all_days.max()
+
+    axis, sleep_a = align(start, end, sleep_days, sleep)
+    _, hrv_a = align(start, end, hrv_days, hrv)
+    _, risk_a = align(start, end, mood_days, risk)
+
+    metrics = {"sleep": sleep_a, "hrv": hrv_a, "risk": risk_a}
+    rollups = {}
+    for period, name in (("W", "weekly"), ("M", "monthly")):
+        rollups[name] = {metric: _series_json(*rollup(axis, values, period)) for metric, values in metrics.items()}
+
+    recent = slice(max(0, len(axis) - 90), len(axis))
+    return {
+        "start": str(start),
+        "end": str(end),
+        "days": int(len(axis)),
+        "samples": {"health_days": int(len(sleep_days)), "journal_days": int(len(mood_days))},
+        "rollups": rollups,
+        # last 90 days of the trailing mean keeps the payload small for long histories
+        "rolling_mean": {
+            "window_days": window,
+            "dates": [str(d) for d in axis[recent]],
+            **{metric: _clean(rolling_mean(values, window)[recent]) for metric, values in metrics.items()}
+        },
+        "correlations": {
+            "sleep_vs_next_day_risk": lagged_correlations(sleep_a, risk_a, max_lag),
+            "hrv_vs_next_day_risk": lagged_correlations(hrv_a, risk_a, max_lag),
+        }
+    }
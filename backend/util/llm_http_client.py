@@ -0,0 +1,26 @@
+# llm_http_client.py
+
+import httpx
+
+# --- Watsonx-shaped client for a plain HTTP /generate endpoint ---
+# What services.model() hands out when LLM_STUB_URL is set (e.g. benchmarks/llm_stub.py).
+# POST {base_url}/generate {"model_id", "prompt", "max_new_tokens"} -> {"results": [...]}
+
+
+class HttpModelClient:
+    """Mimics ModelInference.generate() against /generate."""
+
+    def __init__(self, base_url: str, model_id: str, max_new_tokens: int):
+        self.model_id = model_id
+        self.max_new_tokens = max_new_tokens
+        self._url = base_url.rstrip("/") + "/generate"
+        self._client = httpx.Client(timeout=90.0)
+
+    def generate(self, prompt: str, params: dict = None):
+        response = self._client.post(self._url, json={
+            "model_id": self.model_id,
+            "prompt": prompt,
+            "max_new_tokens": self.max_new_tokens,
+        })
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,158 @@
+# metrics.py
+
+import bisect
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+# --- Latency histograms, exposed at /metrics in Prometheus text format ---
+#   moodmate_http_request_duration_seconds{method, route, status}      MetricsMiddleware
+#   moodmate_dependency_duration_seconds{dependency, operation, target} every span()
+#   moodmate_http_request_dependency_seconds{route, dependency}        span time per request
+# The last one answers "where did this route's time go": each request sums its spans per
+# dependency (storage, watsonx, rag, twitter, ...) and observes the totals when it ends.
+#
+#   with metrics.span("watsonx", "generate", model_id):
+#       response = model.generate(prompt)
+#
+# A span is two perf_counter() calls, a bisect and a short locked update (1-2µs).
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# {dependency: seconds} for the request being handled, None outside requests. The dict is
+# shared by reference, so spans in run_in_threadpool workers (copied context) add to it.
+_request_spent = ContextVar("request_spent", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple = BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [count per bucket..., count above the last, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, seconds: float):
+        index = bisect.bisect_left(self.buckets, seconds)  # bucket "le" bounds are inclusive
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for label_values, series in sorted(self.snapshot().items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            cumulative += series[-2]
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "moodmate_http_request_duration_seconds",
+    "Time from request start to the end of the response body.",
+    ("method", "route", "status"),
+)
+DEPENDENCY_SECONDS = Histogram(
+    "moodmate_dependency_duration_seconds",
+    "Time spent in one call to a storage backend, model or outbound HTTP API.",
+    ("dependency", "operation", "target"),
+)
+REQUEST_DEPENDENCY_SECONDS = Histogram(
+    "moodmate_http_request_dependency_seconds",
+    "Time one request spent in each dependency (sum of its spans).",
+    ("route", "dependency"),
+)
+HISTOGRAMS = (REQUEST_SECONDS, DEPENDENCY_SECONDS, REQUEST_DEPENDENCY_SECONDS)
+
+
+# ⏱️ Spans ##########################################
+class span:
+    """Times the block as one call to a dependency."""
+
+    __slots__ = ("labels", "start")
+
+    def __init__(self, dependency: str, operation: str, target: str = ""):
+        self.labels = (dependency, operation, target)
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = perf_counter() - self.start
+        DEPENDENCY_SECONDS.observe(self.labels, elapsed)
+        spent = _request_spent.get()
+        if spent is not None:
+            dependency = self.labels[0]
+            spent[dependency] = spent.get(dependency, 0.0) + elapsed
+        return False
+
+
+# 🌐 Timing middleware (plain ASGI, so streamed bodies are timed to their last chunk) ####
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"  # if the app raises before starting a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        spent = {}
+        token = _request_spent.set(spent)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            _request_spent.reset(token)
+            # The matched route's template, not the raw path, keeps label values bounded
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe((scope["method"], route, status), elapsed)
+            for dependency, seconds in spent.items():
+                REQUEST_DEPENDENCY_SECONDS.observe((route, dependency), seconds)
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        histogram.render(lines)
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
@@ -0,0 +1,219 @@
+# monitor_scheduler.py
+
+import bisect
+import hashlib
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- How checks are spread ---
+# Every handle gets a stable offset inside the interval (hash of the handle), plus a
+# little random jitter each round, so N handles tick evenly across the window instead
+# of all firing at once. Handles are split across replicas with a consistent hash ring:
+# a replica only schedules the handles whose ring owner is its own shard index.
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class ShardRing:
+    """Consistent hash ring over shard indexes 0..shard_count-1."""
+
+    def __init__(self, shard_count: int = 1, vnodes: int = 64):
+        self.shard_count = max(1, shard_count)
+        self._ring = sorted(
+            (_hash(f"shard-{shard}#{v}"), shard)
+            for shard in range(self.shard_count)
+            for v in range(vnodes)
+        )
+        self._keys = [k for k, _ in self._ring]
+
+    def shard_for(self, key: str) -> int:
+        if self.shard_count == 1:
+            return 0
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+
+class _Stat:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.last = value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+            "max_seconds": round(self.max, 4),
+            "last_seconds": round(self.last, 4),
+        }
+
+
+class MonitorScheduler:
+    """Runs check_fn(handle) once per interval for every handle this shard owns."""
+
+    def __init__(
+        self,
+        check_fn,
+        load_handles_fn,
+        interval_seconds: float = 17 * 60,
+        jitter_seconds: float = 30,
+        max_workers: int = 8,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        reload_seconds: float = None,
+        on_reload=None,
+    ):
+        self.check_fn = check_fn
+        self.load_handles_fn = load_handles_fn
+        self.on_reload = on_reload
+        self.interval = interval_seconds
+        self.jitter = jitter_seconds
+        self.shard_index = shard_index
+        self.ring = ShardRing(shard_count)
+        self.reload_seconds = reload_seconds or interval_seconds
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tweet-monitor")
+        self._heap = []            # (due_at, handle)
+        self._handles = set()
+        self._tracked = set()      # handles on the heap or currently running
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._next_reload = 0.0
+
+        self._queued = 0
+        self._running = 0
+        self._failures = 0
+        self._lag = _Stat()
+        self._duration = _Stat()
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="tweet-monitor-dispatch", daemon=True)
+        self._thread.start()
+        print(f"📅 Tweet monitor started (shard {self.shard_index}/{self.ring.shard_count})")
+
+    def shutdown(self, wait: bool = False):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._pool.shutdown(wait=wait)
+
+    # ---------- scheduling ----------
+    def owns(self, handle: str) -> bool:
+        return self.ring.shard_for(handle) == self.shard_index
+
+    def _first_due(self, handle: str, now: float) -> float:
+        offset = (_hash(handle) % 10_000) / 10_000 * self.interval
+        return now + offset
+
+    def _next_due(self, previous_due: float, now: float) -> float:
+        due = previous_due + self.interval + random.uniform(-self.jitter, self.jitter)
+        # Never let a slow round push the schedule into a burst of catch-up runs
+        return max(due, now)
+
+    def reload_handles(self):
+        try:
+            handles = {h for h in self.load_handles_fn() if h and self.owns(h)}
+        except Exception as e:
+            print("❌ Tweet monitor could not load handles:", e)
+            return
+
+        now = time.time()
+        with self._lock:
+            added = handles - self._handles
+            self._handles = handles
+            # Removed handles are dropped lazily when they come off the heap
+            for handle in added:
+                if handle not in self._tracked:
+                    self._tracked.add(handle)
+                    heapq.heappush(self._heap, (self._first_due(handle, now), handle))
+        if added:
+            print(f"👥 Tweet monitor: {len(handles)} handles on this shard ({len(added)} new)")
+        if self.on_reload is not None:
+            try:
+                self.on_reload(sorted(handles))
+            except Exception as e:
+                print("❌ Tweet monitor reload hook failed:", e)
+        self._wake.set()
+
+    def _dispatch_loop(self):
+        while not self._stopped.is_set():
+            now = time.time()
+            if now >= self._next_reload:
+                self._next_reload = now + self.reload_seconds
+                self.reload_handles()
+
+            with self._lock:
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due_at, handle = heapq.heappop(self._heap)
+                    if handle in self._handles:
+                        due.append((due_at, handle))
+                    else:
+                        self._tracked.discard(handle)
+                next_due = self._heap[0][0] if self._heap else self._next_reload
+                self._queued += len(due)
+
+            for due_at, handle in due:
+                self._pool.submit(self._run_check, handle, due_at)
+
+            self._wake.wait(timeout=max(0.05, min(next_due, self._next_reload) - time.time()))
+            self._wake.clear()
+
+    def _run_check(self, handle: str, due_at: float):
+        started = time.time()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._lag.add(max(0.0, started - due_at))
+        try:
+            self.check_fn(handle)
+        except Exception as e:
+            print(f"❌ Tweet monitor check failed for {handle}:", e)
+            with self._lock:
+                self._failures += 1
+        finally:
+            finished = time.time()
+            with self._lock:
+                self._running -= 1
+                self._duration.add(finished - started)
+                if handle in self._handles and not self._stopped.is_set():
+                    heapq.heappush(self._heap, (self._next_due(due_at, finished), handle))
+                else:
+                    self._tracked.discard(handle)
+            self._wake.set()
+
+    # ---------- metrics ----------
+    def stats(self):
+        with self._lock:
+            oldest_due = min((d for d, h in self._heap if h in self._handles), default=None)
+            return {
+                "shard_index": self.shard_index,
+                "shard_count": self.ring.shard_count,
+                "handles": len(self._handles),
+                "queued": self._queued,
+                "running": self._running,
+                "failures": self._failures,
+                "overdue_seconds": round(max(0.0, time.time() - oldest_due), 3) if oldest_due else 0.0,
+                "queue_lag": self._lag.as_dict(),
+                "check_duration": self._duration.as_dict(),
+            }
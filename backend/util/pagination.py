@@ -0,0 +1,34 @@
+# pagination.py
+
+import base64
+import json
+from decimal import Decimal
+
+# Opaque cursors for DynamoDB query pages: LastEvaluatedKey <-> urlsafe base64 JSON.
+# Numbers are tagged so Decimal keys survive the round trip.
+
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return {"__n": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and set(value) == {"__n"}:
+        return Decimal(value["__n"])
+    return value
+
+
+def encode_cursor(last_key):
+    if not last_key:
+        return None
+    payload = {k: _encode_value(v) for k, v in last_key.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return {k: _decode_value(v) for k, v in payload.items()}
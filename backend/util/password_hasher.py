@@ -0,0 +1,84 @@
+# password_hasher.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# --- bcrypt off the shared threadpool ---
+# Hashing and verification run on a dedicated, fixed-size executor (bcrypt releases the
+# GIL, so threads scale with cores). At most max_workers + max_queue jobs may be in
+# flight; beyond that callers get PasswordHasherBusy right away (-> 503) instead of
+# queueing behind a login burst and holding FastAPI's threadpool hostage.
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 2)))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", str(4 * BCRYPT_WORKERS)))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def hash_cost(hashed: str):
+    # "$2b$12$<salt+hash>" -> 12
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = BCRYPT_WORKERS, max_queue: int = BCRYPT_MAX_QUEUE):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return asyncio.wrap_future(future)
+
+    # Blocking versions (scripts, benchmarks)
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode("utf-8")
+
+    def verify_sync(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    # Awaitable versions (endpoints)
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self.verify_sync, password, hashed)
+
+    # Only ever upgrades: lowering BCRYPT_ROUNDS must not weaken hashes already stored
+    def needs_rehash(self, hashed: str) -> bool:
+        cost = hash_cost(hashed)
+        return cost is None or cost < self.rounds
+
+    def stats(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
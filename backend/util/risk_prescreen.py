@@ -0,0 +1,108 @@
+# risk_prescreen.py
+
+import os
+import random
+import re
+import threading
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# --- Two-stage risk cascade ---
+# Stage 1 (here): VADER scores every candidate text locally.
+# Stage 2 (caller): only texts that look negative/stressed or hit the risk lexicon
+# are sent to the guardian LLM.
+#
+# RISK_CASCADE_MODE
+#   on      -> cascade, benign texts never reach the LLM (default)
+#   shadow  -> cascade, plus a RISK_CASCADE_SHADOW_RATE sample of benign texts is
+#              sent to the LLM anyway so we can measure how many risky ones we'd miss
+#   off     -> everything goes to the LLM
+
+CASCADE_MODE = os.getenv("RISK_CASCADE_MODE", "on").lower()
+STRESS_THRESHOLD = float(os.getenv("RISK_PRESCREEN_THRESHOLD", "0.55"))
+SHADOW_RATE = float(os.getenv("RISK_CASCADE_SHADOW_RATE", "0.1"))
+
+RISK_LEXICON = [
+    "suicide", "suicidal", "kill myself", "end it all", "self harm", "self-harm",
+    "cutting", "hopeless", "worthless", "no reason to live", "want to die",
+    "can't go on", "can’t go on", "give up", "burden", "overdose", "panic",
+    "overwhelmed", "exhausted", "burnout", "alone", "empty"
+]
+_lexicon_re = re.compile(r"\b(" + "|".join(re.escape(w) for w in RISK_LEXICON) + r")\b", re.IGNORECASE)
+
+analyzer = SentimentIntensityAnalyzer()
+
+cascade_stats = {
+    "screened": 0,
+    "escalated": 0,
+    "skipped": 0,
+    "shadow_sampled": 0,
+    "shadow_llm_risky": 0,    # sampled benign texts the LLM still called risky (misses)
+    "escalated_llm_risky": 0  # escalated texts the LLM called risky (hits)
+}
+_stats_lock = threading.Lock()
+
+
+# Same score as routes/twitter_analyzer: high when negative is high and positive is low
+def stress_score(sentiment: dict) -> float:
+    return max(0, sentiment['neg'] + (1 - sentiment['pos']) / 2)
+
+
+def prescreen_texts(texts):
+    """Score texts locally. Returns one dict per text with stress, lexicon hit and route."""
+    decisions = []
+    for text in texts:
+        sentiment = analyzer.polarity_scores(text or "")
+        score = stress_score(sentiment)
+        lexicon_hit = bool(_lexicon_re.search(text or ""))
+        escalate = CASCADE_MODE == "off" or lexicon_hit or score >= STRESS_THRESHOLD
+        shadow = not escalate and CASCADE_MODE == "shadow" and random.random() < SHADOW_RATE
+        decisions.append({
+            "stress_score": round(score, 3),
+            "compound": sentiment["compound"],
+            "lexicon_hit": lexicon_hit,
+            "escalate": escalate,
+            "shadow": shadow,
+        })
+
+    with _stats_lock:
+        cascade_stats["screened"] += len(decisions)
+        cascade_stats["escalated"] += sum(d["escalate"] for d in decisions)
+        cascade_stats["skipped"] += sum(not d["escalate"] for d in decisions)
+        cascade_stats["shadow_sampled"] += sum(d["shadow"] for d in decisions)
+    return decisions
+
+
+def record_llm_outcome(decision: dict, llm_risky: bool):
+    if not llm_risky:
+        return
+    with _stats_lock:
+        if decision["escalate"]:
+            cascade_stats["escalated_llm_risky"] += 1
+        elif decision["shadow"]:
+            cascade_stats["shadow_llm_risky"] += 1
+
+
+def prescreened_result(text: str, decision: dict) -> dict:
+    return {
+        "text": text,
+        "risk_detected": "No",
+        "confidence": "0.0",
+        "probability_of_risk": 0.0,
+        "explanation": f"Pre-screened as low risk (stress score {decision['stress_score']}, no risk keywords)",
+    }
+
+
+def get_cascade_stats():
+    with _stats_lock:
+        stats = dict(cascade_stats)
+    stats["mode"] = CASCADE_MODE
+    stats["threshold"] = STRESS_THRESHOLD
+    stats["llm_call_reduction"] = round(stats["skipped"] / stats["screened"], 3) if stats["screened"] else 0.0
+    # Shadow samples are a random slice of skipped texts: scale misses back up
+    if stats["shadow_sampled"] and stats["skipped"]:
+        est_missed = stats["shadow_llm_risky"] * stats["skipped"] / stats["shadow_sampled"]
+        hits = stats["escalated_llm_risky"]
+        stats["estimated_recall"] = round(hits / (hits + est_missed), 3) if hits + est_missed else 1.0
+    else:
+        stats["estimated_recall"] = None
+    return stats
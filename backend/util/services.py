@@ -0,0 +1,126 @@
+# services.py
+
+import os
+import threading
+from backend.util import metrics
+
+# --- Shared service registry ---
+# DynamoDB resources/tables and Watsonx model clients are created on first use (or
+# all at once by warm_up() from the FastAPI lifespan) and then reused by every router.
+# Nothing here touches the network or imports the SDKs at import time.
+
+AWS_REGION = os.getenv("AWS_REGION_NAME", "ap-south-1")
+WATSONX_URL = os.getenv("WATSONX_URL", "https://eu-de.ml.cloud.ibm.com")
+WATSONX_PROJECT_ID = os.getenv("WATSONX_PROJECT_ID", "1cb8c38f-d650-41fe-9836-86659006c090")
+LLM_STUB_URL = os.getenv("LLM_STUB_URL")  # benchmarks/llm_stub.py instead of Watsonx
+
+_instances = {}
+_declared = {}   # key -> factory, for everything handed out lazily (used by warm_up)
+_lock = threading.RLock()
+
+
+def get(key, factory):
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            instance = factory()
+            _instances[key] = instance
+        return instance
+
+
+def reset():
+    with _lock:
+        _instances.clear()
+
+
+class LazyService:
+    """Stand-in that builds the real client on first attribute access."""
+
+    def __init__(self, key, factory):
+        self._key = key
+        self._factory = factory
+        with _lock:
+            _declared[key] = factory
+
+    def resolve(self):
+        return get(self._key, self._factory)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+# 🗄️ DynamoDB ##########################################
+def dynamodb(region: str = AWS_REGION):
+    def build():
+        import boto3
+        return boto3.resource("dynamodb", region_name=region) if region else boto3.resource("dynamodb")
+    return get(("dynamodb", region), build)
+
+
+def table(name: str, region: str = AWS_REGION):
+    return get(("table", region, name), lambda: dynamodb(region).Table(name))
+
+
+def lazy_dynamodb(region: str = AWS_REGION):
+    return LazyService(("dynamodb", region), lambda: dynamodb(region))
+
+
+def lazy_table(name: str, region: str = AWS_REGION):
+    return LazyService(("table", region, name), lambda: table(name, region))
+
+
+# 🤖 Watsonx ##########################################
+def watsonx_credentials():
+    def build():
+        from ibm_watsonx_ai import Credentials
+        return Credentials(url=WATSONX_URL, api_key=os.getenv("WATSONX_API_KEY"))
+    return get(("watsonx_credentials",), build)
+
+
+class TimedModel:
+    """Model client whose generate() calls are recorded as "watsonx" metrics spans."""
+
+    def __init__(self, client, model_id: str):
+        self._client = client
+        self._model_id = model_id
+
+    def generate(self, *args, **kwargs):
+        with metrics.span("watsonx", "generate", self._model_id):
+            return self._client.generate(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def model(model_id: str, max_new_tokens: int):
+    def build():
+        if LLM_STUB_URL:
+            from backend.util.llm_http_client import HttpModelClient
+            return TimedModel(HttpModelClient(LLM_STUB_URL, model_id, max_new_tokens), model_id)
+        from ibm_watsonx_ai.foundation_models import ModelInference
+        return TimedModel(ModelInference(
+            model_id=model_id,
+            credentials=watsonx_credentials(),
+            project_id=WATSONX_PROJECT_ID,
+            params={"decoding_method": "greedy", "max_new_tokens": max_new_tokens}
+        ), model_id)
+    return get(("model", model_id, max_new_tokens), build)
+
+
+def lazy_model(model_id: str, max_new_tokens: int):
+    return LazyService(("model", model_id, max_new_tokens), lambda: model(model_id, max_new_tokens))
+
+
+# 🔥 Build everything that was declared lazily (FastAPI lifespan, WARM_SERVICES=1)
+def warm_up():
+    with _lock:
+        declared = list(_declared.items())
+    for key, factory in declared:
+        try:
+            get(key, factory)
+        except Exception as e:
+            print(f"⚠️ Could not warm up {key}:", e)
+    print(f"🔥 Warmed up {len(declared)} services")
@@ -0,0 +1,112 @@
+# session_tokens.py
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Header, HTTPException
+
+# --- Stateless session tokens ---
+# /login issues "v1.<payload>.<signature>" where payload = {"sub", "iat", "exp"} and the
+# signature is HMAC-SHA256 with SESSION_SECRET. Verifying is pure CPU, and verified tokens
+# sit in a small LRU so repeat requests are a dict lookup. No UserAuth read per request.
+#
+# Requests without "Authorization: Bearer <token>" get a 401. REQUIRE_SESSION_TOKEN=0 (local
+# development only) lets them fall back to the user_id they claim (or DEFAULT_USER_ID).
+
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    print("⚠️ SESSION_SECRET not set, using a random per-process secret (tokens die on restart)")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+REQUIRE_SESSION_TOKEN = os.getenv("REQUIRE_SESSION_TOKEN", "1") == "1"
+DEFAULT_USER_ID = "demo_user"
+TOKEN_CACHE_SIZE = 4096
+TOKEN_VERSION = "v1"
+
+_verified = OrderedDict()   # token -> (user_id, exp)
+_verified_lock = threading.Lock()
+
+
+class SessionTokenError(Exception):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(message: str) -> str:
+    return _b64encode(hmac.new(SESSION_SECRET.encode(), message.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user_id: str, ttl: int = SESSION_TTL_SECONDS) -> str:
+    now = int(time.time())
+    payload = _b64encode(json.dumps({"sub": user_id, "iat": now, "exp": now + ttl}, separators=(",", ":")).encode())
+    message = f"{TOKEN_VERSION}.{payload}"
+    return f"{message}.{_sign(message)}"
+
+
+def verify_token(token: str) -> str:
+    """Return the token's user id, or raise SessionTokenError."""
+    now = time.time()
+    with _verified_lock:
+        hit = _verified.get(token)
+        if hit is not None:
+            if hit[1] > now:
+                _verified.move_to_end(token)
+                return hit[0]
+            del _verified[token]
+            raise SessionTokenError("Session expired")
+
+    try:
+        version, payload, signature = token.split(".")
+    except ValueError:
+        raise SessionTokenError("Malformed session token")
+    if version != TOKEN_VERSION or not hmac.compare_digest(signature, _sign(f"{version}.{payload}")):
+        raise SessionTokenError("Invalid session token")
+    try:
+        claims = json.loads(_b64decode(payload))
+        user_id, exp = claims["sub"], claims["exp"]
+    except (ValueError, KeyError, TypeError):
+        raise SessionTokenError("Malformed session token")
+    if exp <= now:
+        raise SessionTokenError("Session expired")
+
+    with _verified_lock:
+        _verified[token] = (user_id, exp)
+        while len(_verified) > TOKEN_CACHE_SIZE:
+            _verified.popitem(last=False)
+    return user_id
+
+
+# 🔐 FastAPI dependency: the token's user id, or None for an anonymous request
+def session_user(authorization: Optional[str] = Header(None)) -> Optional[str]:
+    if authorization and authorization[:7].lower() == "bearer ":
+        try:
+            return verify_token(authorization[7:].strip())
+        except SessionTokenError as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if REQUIRE_SESSION_TOKEN:
+        raise HTTPException(status_code=401, detail="Session token required", headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+
+def resolve_user_id(session_user_id: Optional[str], claimed: Optional[str] = None) -> str:
+    # A verified token always wins over a user_id sent in the request
+    return session_user_id or claimed or DEFAULT_USER_ID
+
+
+def current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    return resolve_user_id(session_user(authorization))
@@ -0,0 +1,165 @@
+# suggestion_cache.py
+
+import difflib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Replacement suggestion cache ---
+# Keys are normalized habit names ("Doom scrolling!!" -> "doomscrolling"), so near
+# identical inputs share one entry. Entries older than refresh_after are still served
+# but get regenerated in the background; entries older than ttl are dropped.
+
+# Spelling and phrasing variants of one habit only. Related but distinct habits
+# ("vaping", "snacking", "social media") keep their own entries and suggestions.
+SYNONYMS = {
+    "doom scrolling": "doomscrolling",
+    "doom-scrolling": "doomscrolling",
+    "cigarettes": "smoking",
+    "smoking cigarettes": "smoking",
+    "eating junk food": "junk food",
+    "junk": "junk food",
+    "junk-food": "junk food",
+    "staying up late": "late nights",
+    "late night": "late nights",
+    "drinking alcohol": "alcohol",
+    "procrastinating": "procrastination",
+    "nail biting": "biting nails",
+    "nail-biting": "biting nails",
+    "overthinking things": "overthinking",
+}
+
+FILLER_WORDS = {"my", "the", "a", "an", "too", "much", "habit", "of", "i", "always", "constant", "constantly"}
+
+# Shipped so common habits answer at cache speed before the LLM warm-up finishes
+PRECOMPUTED_SUGGESTIONS = {
+    "smoking": ["Chew sugar-free gum", "Take a brisk walk", "Practice deep breathing"],
+    "doomscrolling": ["Read a physical book", "Take a mindful walk", "Journal for five minutes"],
+    "junk food": ["Snack on fresh fruit", "Drink a glass of water", "Eat a handful of nuts"],
+    "late nights": ["Set a wind-down alarm", "Read before bed", "Dim screens after 9pm"],
+    "alcohol": ["Try sparkling water", "Call a friend", "Go for an evening walk"],
+    "procrastination": ["Work in 25-minute sprints", "Start with one small task", "Write a short to-do list"],
+    "overthinking": ["Write thoughts down", "Try a 5-minute meditation", "Go for a short walk"],
+    "biting nails": ["Keep hands busy with a stress ball", "Apply bitter nail polish", "Take a breathing break"],
+    "caffeine": ["Switch to herbal tea", "Drink water first", "Take a short walk instead"],
+    "skipping breakfast": ["Prep overnight oats", "Keep fruit by the door", "Eat a yogurt cup"],
+}
+
+
+def normalize_habit(text: str) -> str:
+    key = re.sub(r"[^a-z0-9\s-]", " ", (text or "").lower())
+    key = re.sub(r"\s+", " ", key).strip()
+    if key in SYNONYMS:
+        return SYNONYMS[key]
+    words = [w for w in key.split(" ") if w not in FILLER_WORDS]
+    key = " ".join(words) or key
+    return SYNONYMS.get(key, key)
+
+
+class SuggestionCache:
+    def __init__(self, maxsize: int = 512, ttl: float = 7 * 24 * 3600, refresh_after: float = 24 * 3600, fuzzy_cutoff: float = 0.85):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()   # key -> (suggestions, stored_at)
+        self._buckets = {}              # first character -> keys, the only fuzzy candidates
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="habit-suggestions")
+
+    # 🔍 Fuzzy candidates: same first character, and a length that can still reach the
+    # cutoff (difflib's ratio is at most 2 * shorter / (len(a) + len(b)))
+    def _candidates(self, key: str):
+        n = len(key)
+        return [k for k in self._buckets.get(key[:1], ())
+                if 2 * min(n, len(k)) >= self.fuzzy_cutoff * (n + len(k))]
+
+    def _drop(self, key: str):
+        del self._entries[key]
+        bucket = self._buckets.get(key[:1])
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[key[:1]]
+
+    def get(self, key: str, generate_fn=None):
+        """Return cached suggestions for key (or a close match), or None on a miss."""
+        now = time.time()
+        match, candidates = None, ()
+        with self._lock:
+            if key in self._entries:
+                match = key
+            else:
+                candidates = self._candidates(key)
+
+        # difflib runs outside the lock, so one slow miss never stalls other lookups
+        if match is None and candidates:
+            close = difflib.get_close_matches(key, candidates, n=1, cutoff=self.fuzzy_cutoff)
+            match = close[0] if close else None
+
+        with self._lock:
+            entry = self._entries.get(match) if match is not None else None
+            if entry is None:  # no match, or evicted since the lookup
+                self.misses += 1
+                return None
+            suggestions, stored_at = entry
+            if now - stored_at > self.ttl:
+                self._drop(match)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(match)
+            self.hits += 1
+            stale = now - stored_at > self.refresh_after
+
+        if stale and generate_fn is not None:
+            self.refresh(match, generate_fn)
+        return suggestions
+
+    def put(self, key: str, suggestions, stored_at: float = None):
+        with self._lock:
+            self._entries[key] = (list(suggestions), stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            self._buckets.setdefault(key[:1], set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    # 🔄 Regenerate one entry off the request path; at most one refresh per key at a time
+    def refresh(self, key: str, generate_fn):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.put(key, generate_fn(key))
+            except Exception as e:
+                print(f"⚠️ Suggestion refresh failed for '{key}':", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(run)
+
+    # 🔥 Seed the catalog (served immediately) and regenerate it in the background
+    def warm(self, generate_fn=None, catalog=PRECOMPUTED_SUGGESTIONS):
+        for key, suggestions in catalog.items():
+            # Seeds count as stale so the first warm-up replaces them with fresh output
+            self.put(key, suggestions, stored_at=time.time() - self.refresh_after - 1)
+        if generate_fn is not None:
+            for key in catalog:
+                self.refresh(key, generate_fn)
+        print(f"🔥 Habit suggestion cache warmed with {len(catalog)} habits")
+
+    def shutdown(self):
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "refreshing": len(self._refreshing)}
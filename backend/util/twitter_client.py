@@ -0,0 +1,183 @@
+# twitter_client.py
+
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from . import metrics  # relative: app.py imports this module as util.twitter_client
+
+# --- Twitter v2 fetch client ---
+# * one pooled requests.Session for every call
+# * a token bucket per endpoint, refilled from x-rate-limit-limit/-remaining/-reset
+# * exponential backoff (honouring x-rate-limit-reset) on 429 / 5xx / network errors
+# TWITTER_API_BASE can point at a local stub (see benchmarks/twitter_stub.py).
+
+TWITTER_API_BASE = os.getenv("TWITTER_API_BASE", "https://api.twitter.com/2")
+USERNAMES_PER_LOOKUP = 100  # users/by?usernames= limit
+RESET_MARGIN = 1.0          # x-rate-limit-reset is whole epoch seconds
+
+
+class TwitterRateLimited(Exception):
+    """Raised instead of blocking when the next slot is further away than max_wait."""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"Rate limited on {endpoint}, retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Request budget for one endpoint window, kept in sync with the response headers."""
+
+    def __init__(self, capacity: int = 15, window: float = 15 * 60):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.window = window
+        self.reset_at = time.time() + window
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token if one is free; otherwise return seconds until the window resets."""
+        with self._lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.tokens = float(self.capacity)
+                self.reset_at = now + self.window
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return self.reset_at - now
+
+    def update(self, limit, remaining, reset):
+        with self._lock:
+            if limit is not None:
+                self.capacity = limit
+            if reset is not None:
+                self.reset_at = reset
+            if remaining is not None:
+                self.tokens = float(remaining)
+
+    def drain(self, reset=None):
+        with self._lock:
+            self.tokens = 0.0
+            if reset is not None:
+                self.reset_at = reset
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TwitterClient:
+    def __init__(
+        self,
+        bearer_token: str = None,
+        base_url: str = TWITTER_API_BASE,
+        timeout: float = 10.0,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        max_wait: float = 60.0,
+        pool_size: int = 16,
+    ):
+        self.bearer_token = bearer_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_wait = max_wait
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                bucket = self._buckets[endpoint] = TokenBucket()
+            return bucket
+
+    def _wait_for_slot(self, endpoint: str, bucket: TokenBucket):
+        while True:
+            wait = bucket.reserve()
+            if wait <= 0:
+                return
+            if wait > self.max_wait:
+                raise TwitterRateLimited(endpoint, wait)
+            time.sleep(wait)
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    # endpoint is the rate-limit bucket name, e.g. "users/by" or "users/:id/tweets"
+    def get(self, path: str, endpoint: str, params: dict = None) -> dict:
+        bucket = self._bucket(endpoint)
+        headers = {"Authorization": f"Bearer {self.bearer_token}"}
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(endpoint, bucket)
+            try:
+                with metrics.span("twitter", "GET", endpoint):
+                    response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"⚠️ Twitter request failed ({e}), retrying")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            limit = _header_int(response.headers, "x-rate-limit-limit")
+            remaining = _header_int(response.headers, "x-rate-limit-remaining")
+            reset = _header_int(response.headers, "x-rate-limit-reset")
+            if reset is not None:
+                reset += RESET_MARGIN
+            bucket.update(limit, remaining, reset)
+
+            if response.status_code == 429:
+                bucket.drain(reset)
+                wait = max(reset - time.time(), 0.0) if reset else self._backoff(attempt)
+                if wait > self.max_wait or attempt == self.max_retries:
+                    raise TwitterRateLimited(endpoint, wait)
+                print(f"⏳ Twitter 429 on {endpoint}, waiting {wait:.1f}s")
+                time.sleep(wait)
+                continue
+            if response.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt))
+                continue
+            return response.json()
+
+        raise RuntimeError(f"Twitter request to {endpoint} failed after {self.max_retries} retries")
+
+    # 👥 Resolves up to 100 usernames per call; returns {username_lower: user_id}
+    def users_by_usernames(self, usernames) -> dict:
+        resolved = {}
+        names = list(dict.fromkeys(u.strip().lstrip("@") for u in usernames if u and u.strip()))
+        for i in range(0, len(names), USERNAMES_PER_LOOKUP):
+            chunk = names[i:i + USERNAMES_PER_LOOKUP]
+            resp_json = self.get("users/by", "users/by", params={"usernames": ",".join(chunk)})
+            for user in resp_json.get("data", []):
+                resolved[user["username"].lower()] = user["id"]
+            for error in resp_json.get("errors", []):
+                print("⚠️ Twitter user lookup error:", error.get("detail") or error)
+        return resolved
+
+    def user_tweets(self, user_id: str, max_results: int = 5, since_id: str = None, pagination_token: str = None) -> dict:
+        params = {
+            "max_results": max_results,
+            "tweet.fields": "created_at,text",
+        }
+        if since_id:
+            params["since_id"] = since_id
+        if pagination_token:
+            params["pagination_token"] = pagination_token
+        return self.get(f"users/{user_id}/tweets", "users/:id/tweets", params=params)
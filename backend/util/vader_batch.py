@@ -0,0 +1,69 @@
+# vader_batch.py
+
+import string
+from functools import lru_cache
+import numpy as np
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# --- Batch VADER scoring ---
+# polarity_scores() walks every token with context rules, but only tokens found in the
+# lexicon can ever carry valence. So:
+#   * each distinct token's lexicon membership is memoized (lowercase + punctuation-stripped,
+#     a superset of what VADER itself looks up)
+#   * texts with no lexicon token and no emoji get VADER's neutral result without the walk
+#   * everything else goes through polarity_scores, memoized per distinct text
+# Scores are identical to calling polarity_scores directly.
+
+analyzer = SentimentIntensityAnalyzer()
+
+NEUTRAL = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+EMPTY = {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+
+@lru_cache(maxsize=200_000)
+def _token_in_lexicon(token: str) -> bool:
+    lower = token.lower()
+    return lower in analyzer.lexicon or lower.strip(string.punctuation) in analyzer.lexicon
+
+
+def _has_emoji(text: str) -> bool:
+    return not text.isascii() and any(ch in analyzer.emojis for ch in text)
+
+
+@lru_cache(maxsize=50_000)
+def polarity(text: str) -> dict:
+    tokens = text.split()
+    if not tokens:
+        return EMPTY
+    if not _has_emoji(text) and not any(_token_in_lexicon(t) for t in tokens):
+        return NEUTRAL
+    return analyzer.polarity_scores(text)
+
+
+def score_texts(texts):
+    """Returns (neg, pos, compound) arrays, one entry per text."""
+    scores = [polarity(text or "") for text in texts]
+    neg = np.fromiter((s["neg"] for s in scores), dtype=float, count=len(scores))
+    pos = np.fromiter((s["pos"] for s in scores), dtype=float, count=len(scores))
+    compound = np.fromiter((s["compound"] for s in scores), dtype=float, count=len(scores))
+    return neg, pos, compound
+
+
+# High when negative is high and positive is low (same formula as risk_prescreen.stress_score)
+def stress_scores(neg, pos):
+    return np.maximum(0, neg + (1 - pos) / 2)
+
+
+def grouped_stress(texts, groups, group_count: int):
+    """Mean stress per group; texts[i] belongs to group groups[i]. Empty groups are NaN."""
+    neg, pos, _ = score_texts(texts)
+    stress = stress_scores(neg, pos)
+    groups = np.asarray(groups, dtype=int)
+    sums = np.bincount(groups, weights=stress, minlength=group_count)
+    counts = np.bincount(groups, minlength=group_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts, counts
+
+
+def cache_info():
+    return {"texts": polarity.cache_info()._asdict(), "tokens": _token_in_lexicon.cache_info()._asdict()}
@@ -36,32 +36,41 @@ const AppLayout = () => {
   const hideSidebarRoutes = ['/', '/login', '/signup'];
   const showSidebar = !hideSidebarRoutes.includes(location.pathname);
 
-  // 🧠 Polling logic (force popup to remount every time)
+  // 🔐 Read on every render so logging in (a route change) picks up the new token
+  const sessionToken = localStorage.getItem("sessionToken");
+
+  // 🧠 Push logic: the server sends the current alert on connect and again on every change
   useEffect(() => {
-    const fetchPopup = async () => {
-      try {
-        const res = await fetch("http://localhost:8002/api/trigger_check");
-        if (!res.ok) throw new Error("Failed to fetch");
+    if (!sessionToken) return;  // alerts are per user: nothing to stream before login
 
-        const data = await res.json();
-        if (data.show_popup) {
-          setPopupData({
-            message: data.support_message || "Keep going. You've got this 💙",
-            triggerId: Date.now()  // 👈 unique key on every poll
-          });
-        } else {
-          setPopupData(null);
-        }
-      } catch (err) {
-        console.error("🚨 Popup fetch error:", err);
+    const showAlert = (data, version) => {
+      if (data.show_popup) {
+        setPopupData({
+          message: data.support_message || "Keep going. You've got this 💙",
+          triggerId: version  // 👈 alert version: the same alert never re-pops
+        });
+      } else {
+        setPopupData(null);
       }
     };
 
-    fetchPopup(); // Run once immediately
-    const interval = setInterval(fetchPopup, 15 * 60 * 1000); // Poll every 1 min
+    // EventSource cannot send headers, so the token goes in the query string
+    const source = new EventSource(
+      `http://localhost:8002/api/alerts/stream?token=${encodeURIComponent(sessionToken)}`
+    );
+    source.onmessage = (event) => {
+      try {
+        showAlert(JSON.parse(event.data), event.lastEventId);
+      } catch (err) {
+        console.error("🚨 Popup stream error:", err);
+      }
+    };
+    // EventSource reconnects on its own after network errors (sending Last-Event-ID,
+    // so the server skips what was already shown); a 401/404 closes it for good
+    source.onerror = (err) => console.error("🚨 Popup stream error:", err);
 
-    return () => clearInterval(interval);
-  }, [location.pathname]);
+    return () => source.close();
+  }, [sessionToken]);  // one connection per login, not per page
 
   return (
     <div className="flex">
@@ -2,6 +2,7 @@ import React, { useState, useRef, useEffect } from "react";
 import botAvatar from "../assets/bot-avatar.png";
 import userAvatar from "../assets/user-avatar.png";
 import FaceDetector from "../components/FaceDetector";
+import { apiFetch } from "../utils/apiFetch";
 
 const API_URL = "http://localhost:8001/chat";
 
@@ -63,7 +64,7 @@ function ChatInterface() {
     setLoading(true);
 
     try {
-      const res = await fetch(API_URL, {
+      const res = await apiFetch(API_URL, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ user_input: textToSend }),
@@ -155,10 +156,9 @@ function ChatInterface() {
     const resetUrl = API_URL.replace("/chat", "/reset-memory");
     setLoading(true);
     try {
-      const res = await fetch(resetUrl, {
+      const res = await apiFetch(resetUrl, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        // body: JSON.stringify({ user_id: "demo_user" }) // optional
       });
       if (!res.ok) throw new Error("Reset failed");
       // clear chat UI and cancel any speech
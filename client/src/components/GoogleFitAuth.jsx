@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import { apiFetch } from '../utils/apiFetch';
 
 const CLIENT_ID = "627671962369-t1kbnpv6e502iqlr8fgpl41ss5gvr43q.apps.googleusercontent.com";
 const SCOPES = [
@@ -31,14 +32,13 @@ function GoogleFitAuth({ onDataFetched }) {
 
   const handleSaveToDynamoDB = async (data) => {
     const payload = {
-      user_id: localStorage.getItem("user_id") || "test_user",  // Replace with real auth
       date: selectedDate,
       sleep: data.sleep,
       hrv: data.hrv
     };
 
     try {
-      const res = await fetch("http://localhost:8001/save-health-data", {
+      const res = await apiFetch("http://localhost:8001/save-health-data", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload)
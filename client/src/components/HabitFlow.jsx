@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import { v4 as uuidv4 } from "uuid";
+import { apiFetch, authHeaders } from "../utils/apiFetch";
 
 
 export default function HabitFlowDashboard() {
@@ -21,7 +22,7 @@ export default function HabitFlowDashboard() {
   // 🧠 Fetch habit streaks
   const fetchHabits = async () => {
     try {
-      const res = await fetch("http://localhost:8001/habitflow/get-progress?user_id=demo_user");
+      const res = await apiFetch("http://localhost:8001/habitflow/get-progress");
       const data = await res.json();
       setHabits(data.habits || []);
     } catch (err) {
@@ -31,10 +32,10 @@ export default function HabitFlowDashboard() {
 
   // ➕ Increment streak
   const incrementStreak = async (habitId) => {
-    await fetch("http://localhost:8001/habitflow/increment-streak", {
+    await apiFetch("http://localhost:8001/habitflow/increment-streak", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ user_id: "demo_user", habit_id: habitId })
+      body: JSON.stringify({ habit_id: habitId })
     });
     fetchHabits(); // refresh UI
   };
@@ -55,10 +56,9 @@ export default function HabitFlowDashboard() {
   const saveProgress = async () => {
     try {
       await axios.post("http://localhost:8001/habitflow/save-progress", {
-        user_id: "demo_user",
         habit_id: uuidv4(),
         ...newHabit,
-      });
+      }, { headers: authHeaders() });
       alert("✅ Progress saved!");
       fetchHabits();
     } catch (e) {
@@ -149,14 +149,13 @@ export default function HabitFlowDashboard() {
               <button
                 onClick={async () => {
                   await axios.post("http://localhost:8007/habitflow/save-progress", {
-                    user_id: "demo_user",
                     habit_id: selectedHabit.habit_id, // ✅ Add this field
                     habit_name: selectedHabit.bad_habit,
                     replacement_habit: selectedHabit.replacement_habit,
                     streak: selectedHabit.streak_days, // ✅ Renamed to match FastAPI's expected field
                     level: selectedHabit.level,
                     last_completed: selectedHabit.last_completed,
-                  });
+                  }, { headers: authHeaders() });
                   alert("🎉 Progress saved!");
                   fetchHabits();
                   setSelectedHabit(null);
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import Calendar from "react-calendar";
 import "react-calendar/dist/Calendar.css";
 import { parseISO } from "date-fns";
+import { apiFetch } from "../utils/apiFetch";
 import { Zap, TrendingUp, ShieldCheck, Heart, Sparkles, CalendarCheck } from 'lucide-react';
 
 const BASE_URL = "http://localhost:8001";
@@ -36,7 +37,7 @@ const JournalDashboard = () => {
 
     useEffect(() => {
         // Fetch all analysis items
-        fetch(`${BASE_URL}/journal-entries`)
+        apiFetch(`${BASE_URL}/journal-entries`)
             .then((res) => res.json())
             .then((data) => {
                 if (Array.isArray(data)) {
@@ -59,7 +60,7 @@ const JournalDashboard = () => {
         const url = `${BASE_URL}/journal-entry`;
 
         try {
-            const response = await fetch(url, {
+            const response = await apiFetch(url, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({
@@ -118,7 +119,7 @@ const JournalDashboard = () => {
 
         try {
             // newjournal.py expects ?date=YYYY-MM-DD as the query name
-            const res = await fetch(`${BASE_URL}/journal-entry/by-date?date=${formattedDate}`);
+            const res = await apiFetch(`${BASE_URL}/journal-entry/by-date?date=${formattedDate}`);
 
             if (!res.ok) {
                 // No entry found; clear local state
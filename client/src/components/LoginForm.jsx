@@ -27,7 +27,8 @@ function LoginForm() {
       const data = await res.json();
 
       if (res.ok) {
-        localStorage.setItem("userId", data.id); // 💾 Save session
+        localStorage.setItem("userId", data.username); // 💾 Save session
+        localStorage.setItem("sessionToken", data.token); // 🔐 utils/apiFetch.js sends it as "Authorization: Bearer ..."
         navigate("/dashboard"); // 🎉 Go to dashboard
       } else {
         setMessage(`❌ ${data.detail || "Login failed"}`);
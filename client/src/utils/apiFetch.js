@@ -0,0 +1,12 @@
+// 🔐 Every call to the MoodMate API sends the session token saved at login
+// ("Authorization: Bearer <token>"); the server takes the user from it.
+
+export function authHeaders(headers = {}) {
+  const token = localStorage.getItem("sessionToken");
+  return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+}
+
+// Drop-in fetch() with the session header added
+export function apiFetch(url, options = {}) {
+  return fetch(url, { ...options, headers: authHeaders(options.headers) });
+}
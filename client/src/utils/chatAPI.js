@@ -1,6 +1,8 @@
+import { apiFetch } from './apiFetch';
+
 export async function sendChatToFastAPI(userInput) {
   try {
-    const response = await fetch('http://localhost:8000/chat', {
+    const response = await apiFetch('http://localhost:8000/chat', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ user_input: userInput }),